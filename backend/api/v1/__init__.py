@@ -3,6 +3,9 @@
 from fastapi import APIRouter
 from .events import router as events_router
 from .auth import router as auth_router
+from .jobs import router as jobs_router
+from .stream import router as stream_router
+from .subscriptions import router as subscriptions_router
 
 # Create main API router
 api_router = APIRouter(prefix="/api/v1")
@@ -10,5 +13,8 @@ api_router = APIRouter(prefix="/api/v1")
 # Include sub-routers
 api_router.include_router(auth_router)
 api_router.include_router(events_router)
+api_router.include_router(jobs_router)
+api_router.include_router(stream_router)
+api_router.include_router(subscriptions_router)
 
 __all__ = ['api_router']
\ No newline at end of file
@@ -3,11 +3,12 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
-import bcrypt
 from datetime import datetime, timedelta
 
-from shared.middleware.auth import AuthMiddleware
+from shared.middleware.auth import AuthMiddleware, TokenRevocations
 from shared.utils.logger import get_logger
+from shared.utils.passwords import HasherBusy, PasswordHasher
+from config.redis import stream_manager
 from config.settings import settings
 
 logger = get_logger()
@@ -17,6 +18,13 @@ security = HTTPBearer()
 # Initialize auth middleware
 auth = AuthMiddleware(secret_key=settings.jwt_secret_key)
 
+# bcrypt runs on its own thread pool, never on the event loop
+password_hasher = PasswordHasher(
+    rounds=settings.password_bcrypt_rounds,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending
+)
+
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -39,7 +47,8 @@ class TokenResponse(BaseModel):
 async def login(request: LoginRequest):
     """User login"""
     try:
-        # TODO: Verify against database
+        # TODO: Verify against database with
+        # `await password_hasher.verify(request.password, stored_hash)`
         # For demo, accept any login
         if len(request.password) < 6:
             raise HTTPException(
@@ -74,8 +83,7 @@ async def register(request: RegisterRequest):
             )
         
         # Hash password
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(request.password.encode('utf-8'), salt)
+        hashed_password = await password_hasher.hash(request.password)
         
         # TODO: Save to database
         # For now, just create token
@@ -88,6 +96,9 @@ async def register(request: RegisterRequest):
         
     except HTTPException:
         raise
+    except HasherBusy as e:
+        logger.error("Registration shed, password hashing saturated", error=str(e))
+        raise HTTPException(status_code=503, detail="Server busy, try again", headers={"Retry-After": "1"})
     except Exception as e:
         logger.error("Registration failed", error=str(e))
         raise HTTPException(status_code=500, detail="Registration failed")
@@ -117,6 +128,20 @@ async def refresh_token(
         raise HTTPException(status_code=500, detail="Token refresh failed")
 
 
+@router.post("/logout")
+async def logout(
+    user_data: dict = Depends(auth.verify_token)
+):
+    """Revoke the current token on every worker"""
+    try:
+        revoked = await TokenRevocations(stream_manager.redis).revoke(user_data)
+        return {"revoked": revoked}
+        
+    except Exception as e:
+        logger.error("Logout failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Logout failed")
+
+
 @router.get("/me")
 async def get_current_user(
     user_data: dict = Depends(auth.verify_token)
@@ -1,12 +1,20 @@
 """Event API routes"""
 
 from typing import List, Optional
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from datetime import datetime
 
 from shared.models.event import EventModel, ProcessedEvent, EventFilter, AlertEvent
 from shared.middleware.auth import AuthMiddleware
+from shared.streams import PARTITION_KEY_FIELD
 from shared.utils.logger import get_logger
+from services.alert_service import AlertFeed
+from services.analysis_worker import URGENCY_FIELD, event_message
+from services.ingestion_service.dedup import EventDeduplicator
+from services.event_store import EventStore, ALERT_SEVERITIES, MAX_PAGE_SIZE, processed_event_json
+from config.database import database
 from config.redis import stream_manager
 from config.settings import settings
 
@@ -16,32 +24,64 @@ router = APIRouter(prefix="/events", tags=["events"])
 # Initialize auth
 auth = AuthMiddleware(secret_key=settings.jwt_secret_key)
 
+# Ingest dedup (per process, bounded memory)
+deduplicator = EventDeduplicator(
+    window_seconds=settings.dedup_window_seconds,
+    max_distance=settings.dedup_max_distance
+)
+
+# Postgres-backed event listing (engine is connected in the app lifespan)
+event_store = EventStore(database)
+
+
+def _alert_feed() -> AlertFeed:
+    """Redis alert index on the shared stream connection"""
+    return AlertFeed(
+        stream_manager.redis,
+        retention_seconds=settings.alert_feed_retention_days * 86400,
+        max_per_severity=settings.alert_feed_max_per_severity
+    )
+
+
+async def _stream_page(query, limit: int, shape) -> StreamingResponse:
+    """Stream a keyset page as a JSON array; the next page's cursor goes in
+    the X-Next-Cursor header"""
+    rows, next_cursor = await event_store.page(query, limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return StreamingResponse(
+        event_store.iter_json(rows, shape),
+        media_type="application/json",
+        headers=headers
+    )
+
 
 @router.get("/", response_model=List[ProcessedEvent])
 async def list_events(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
     source: Optional[str] = None,
     severity: Optional[str] = None,
+    asset: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     user_data: dict = Depends(auth.verify_token)
 ):
-    """List events with filtering"""
+    """List events with filtering, newest first"""
+    try:
+        query = event_store.listing_query(
+            limit,
+            cursor=cursor,
+            sources=[source] if source else None,
+            severities=[severity] if severity else None,
+            asset=asset,
+            start_date=start_date,
+            end_date=end_date
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     try:
-        # TODO: Implement database query
-        # For now, return mock data
-        return [
-            ProcessedEvent(
-                id="550e8400-e29b-41d4-a716-446655440000",
-                source="twitter",
-                content={"text": "Major crypto exchange halts withdrawals"},
-                sentiment_score=-0.8,
-                relevance_score=0.9,
-                entities=["Binance", "BTC"],
-                topics=["exchange", "liquidity"]
-            )
-        ]
+        return await _stream_page(query, limit, processed_event_json)
     except Exception as e:
         logger.error("Failed to fetch events", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to fetch events")
@@ -49,30 +89,33 @@ async def list_events(
 
 @router.get("/alerts", response_model=List[AlertEvent])
 async def list_alerts(
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     limit: int = Query(50, ge=1, le=100),
     severity: Optional[List[str]] = Query(None),
     unread_only: bool = Query(False),
     user_data: dict = Depends(auth.verify_token)
 ):
-    """List alert events"""
+    """List alert events, newest first, from the Redis alert index"""
     try:
-        # TODO: Implement database query
-        return [
-            AlertEvent(
-                id="660e8400-e29b-41d4-a716-446655440001",
-                source="analysis",
-                content={"title": "Critical Market Event Detected"},
-                severity="high",
-                confidence=0.85,
-                risk_factors=["Exchange liquidity", "Market panic"],
-                recommended_actions=["Monitor positions", "Consider hedging"],
-                affected_assets=["BTC", "ETH"]
-            )
-        ]
+        alerts, next_cursor = await _alert_feed().latest(
+            user_data["sub"],
+            limit,
+            severities=severity or list(ALERT_SEVERITIES),
+            cursor=cursor,
+            unread_only=unread_only
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error("Failed to fetch alerts", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to fetch alerts")
+    
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return Response(
+        content=b"[" + b",".join(alerts) + b"]",
+        media_type="application/json",
+        headers=headers
+    )
 
 
 @router.get("/{event_id}", response_model=ProcessedEvent)
@@ -82,11 +125,16 @@ async def get_event(
 ):
     """Get specific event by ID"""
     try:
-        # TODO: Implement database query
+        row = await event_store.get(UUID(event_id))
+    except ValueError:
         raise HTTPException(status_code=404, detail="Event not found")
     except Exception as e:
         logger.error("Failed to fetch event", error=str(e), event_id=event_id)
         raise HTTPException(status_code=500, detail="Failed to fetch event")
+    
+    if row is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return processed_event_json(row)
 
 
 @router.post("/{event_id}/acknowledge")
@@ -96,11 +144,14 @@ async def acknowledge_event(
 ):
     """Mark event as acknowledged/read"""
     try:
-        # TODO: Update database
-        return {"status": "acknowledged", "event_id": event_id}
+        found = await _alert_feed().mark_read(user_data["sub"], event_id)
     except Exception as e:
         logger.error("Failed to acknowledge event", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to acknowledge event")
+    
+    if not found:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return {"status": "acknowledged", "event_id": event_id}
 
 
 @router.post("/stream")
@@ -110,11 +161,32 @@ async def create_event_stream(
 ):
     """Create new event in the stream (internal use)"""
     try:
-        # Publish to Redis stream
+        # Replays and near-identical reposts are counted against the
+        # canonical event instead of flowing through the pipeline again
+        dedup = deduplicator.check(event)
+        if dedup.is_duplicate:
+            # One counter per canonical event, kept as long as it can still
+            # collect duplicates
+            key = f"{stream_manager.config.duplicate_counts_prefix}:{dedup.canonical_id}"
+            pipe = stream_manager.redis.pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, int(settings.dedup_window_seconds))
+            await pipe.execute()
+            return {
+                "status": "duplicate",
+                "event_id": str(event.id),
+                "canonical_event_id": dedup.canonical_id,
+                "duplicate_type": dedup.kind
+            }
+        
+        # Publish to the event's events:raw partition
+        message = event_message(event)
         await stream_manager.publish_event(
-            stream_manager.config.event_stream_key,
-            event.model_dump()
+            stream_manager.event_stream_for(message[PARTITION_KEY_FIELD], message[URGENCY_FIELD]),
+            message
         )
+        # Only a published event counts as seen, so a failed publish can be retried
+        deduplicator.record(event, dedup)
         return {"status": "published", "event_id": str(event.id)}
     except Exception as e:
         logger.error("Failed to publish event", error=str(e))
@@ -0,0 +1,30 @@
+"""Asynchronous analysis job routes"""
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from services.analysis_worker import JobStore
+from shared.middleware.auth import AuthMiddleware
+from shared.utils.logger import get_logger
+from config.redis import stream_manager
+from config.settings import settings
+
+logger = get_logger()
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Initialize auth
+auth = AuthMiddleware(secret_key=settings.jwt_secret_key)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, user_data: dict = Depends(auth.verify_token)):
+    """Status (and result, once completed) of an async analysis job"""
+    try:
+        job = await JobStore(stream_manager.redis).get(job_id)
+    except Exception as e:
+        logger.error("Failed to fetch job", error=str(e), job_id=job_id)
+        raise HTTPException(status_code=500, detail="Failed to fetch job")
+    
+    # Other users' jobs are indistinguishable from missing ones
+    if job is None or job.pop("owner", None) != user_data.get("sub"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""Server-push routes: live analyzed events and alerts over WebSocket or SSE"""
+
+import asyncio
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from services.push_gateway import Frame, PushHub, Subscriber, push_subscribers
+from shared.middleware.auth import AuthMiddleware
+from shared.utils.logger import get_logger
+from config.settings import settings
+
+logger = get_logger()
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+# Initialize auth
+auth = AuthMiddleware(secret_key=settings.jwt_secret_key)
+
+KEEPALIVE_SECONDS = 15.0
+SUBSCRIBE_TIMEOUT = 10.0
+
+
+def _hub(app) -> PushHub:
+    return app.state.push_hub
+
+
+def _channels(value: Optional[str]) -> List[str]:
+    return [channel for channel in (value or "").split(",") if channel]
+
+
+def _subscriber_options() -> dict:
+    return {"max_pending": settings.push_max_pending, "drop_policy": settings.push_drop_policy}
+
+
+def _ws_message(frames: List[Frame], dropped: int) -> bytes:
+    """One coalesced WebSocket message; payloads are embedded pre-encoded"""
+    events = b",".join(
+        b'{"channel":"%s","id":"%s","data":%s}' % (channel.encode(), message_id.encode(), payload)
+        for message_id, channel, payload in frames
+    )
+    return b'{"type":"events","dropped":%d,"events":[%s]}' % (dropped, events)
+
+
+def _sse_chunk(frames: List[Frame], dropped: int) -> bytes:
+    parts = [b'event: gap\ndata: {"dropped":%d}\n\n' % dropped] if dropped else []
+    parts.extend(
+        b"id: %s\nevent: %s\ndata: %s\n\n" % (message_id.encode(), channel.encode(), payload)
+        for message_id, channel, payload in frames
+    )
+    return b"".join(parts)
+
+
+@router.websocket("/ws")
+async def websocket_stream(
+    websocket: WebSocket,
+    token: str = Query(...),
+    channels: Optional[str] = Query(None, description="Comma-separated channels"),
+    last_id: Optional[str] = Query(None, description="Resume after this stream ID")
+):
+    """Push channel messages over a WebSocket.
+
+    Channels come from the query string or a first
+    ``{"type": "subscribe", "channels": [...], "last_id": ...}`` message.
+    Each outgoing message batches every frame pending for the connection.
+    """
+    try:
+        auth.decode_token(token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+
+    try:
+        requested = _channels(channels)
+        if not requested:
+            message = await asyncio.wait_for(websocket.receive_json(), SUBSCRIBE_TIMEOUT)
+            requested, last_id = message.get("channels") or [], message.get("last_id", last_id)
+        subscriber = await _hub(websocket.app).subscribe(requested, last_id=last_id, **_subscriber_options())
+    except (ValueError, AttributeError, asyncio.TimeoutError) as e:
+        await websocket.send_json({"type": "error", "detail": str(e) or "Subscribe timed out"})
+        await websocket.close(code=1008)
+        return
+    except WebSocketDisconnect:
+        return
+
+    await websocket.send_json({"type": "subscribed", "channels": sorted(subscriber.channels)})
+    push_subscribers.labels(transport="websocket").inc()
+    reader = asyncio.create_task(_read_client(websocket, subscriber))
+    try:
+        while not subscriber.closed:
+            frames, dropped = await subscriber.next_batch(timeout=KEEPALIVE_SECONDS)
+            if frames or dropped:
+                await websocket.send_text(_ws_message(frames, dropped).decode())
+            elif not subscriber.closed:
+                await websocket.send_text('{"type":"ping"}')
+        if subscriber.overflowed:
+            # Too far behind: the client reconnects with its last ID
+            await websocket.close(code=1013)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        reader.cancel()
+        _hub(websocket.app).unsubscribe(subscriber)
+        push_subscribers.labels(transport="websocket").dec()
+
+
+async def _read_client(websocket: WebSocket, subscriber: Subscriber) -> None:
+    """Drain client messages (pongs) and notice disconnects"""
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except Exception:
+        pass
+    finally:
+        subscriber.close()
+
+
+@router.get("/sse")
+async def sse_stream(
+    request: Request,
+    token: str = Query(..., description="EventSource cannot send an Authorization header"),
+    channels: str = Query("events:analyzed", description="Comma-separated channels"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """Push channel messages as server-sent events; browsers resume from
+    Last-Event-ID automatically on reconnect"""
+    auth.decode_token(token)
+    hub = _hub(request.app)
+    try:
+        subscriber = await hub.subscribe(_channels(channels), last_id=last_event_id, **_subscriber_options())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events() -> AsyncIterator[bytes]:
+        push_subscribers.labels(transport="sse").inc()
+        try:
+            while not subscriber.closed:
+                frames, dropped = await subscriber.next_batch(timeout=KEEPALIVE_SECONDS)
+                yield _sse_chunk(frames, dropped) if frames or dropped else b": keepalive\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+            push_subscribers.labels(transport="sse").dec()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
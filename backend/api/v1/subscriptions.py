@@ -0,0 +1,82 @@
+"""Alert subscription routes: per-user alert rules"""
+
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from services.alert_service import Subscription, SubscriptionStore
+from shared.models.event import EventFilter
+from shared.middleware.auth import AuthMiddleware
+from shared.utils.logger import get_logger
+from config.redis import stream_manager
+from config.settings import settings
+
+logger = get_logger()
+router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
+
+# Initialize auth
+auth = AuthMiddleware(secret_key=settings.jwt_secret_key)
+
+MAX_RULES_PER_USER = 50
+
+
+class SubscriptionRequest(BaseModel):
+    filter: EventFilter
+    channels: List[str] = Field(default_factory=lambda: ["in_app"], min_length=1)
+
+
+class SubscriptionResponse(SubscriptionRequest):
+    id: str
+
+
+def _response(subscription: Subscription) -> SubscriptionResponse:
+    return SubscriptionResponse(id=subscription.id, filter=subscription.filter, channels=subscription.channels)
+
+
+@router.get("/", response_model=List[SubscriptionResponse])
+async def list_subscriptions(user_data: dict = Depends(auth.verify_token)):
+    """The caller's alert rules"""
+    try:
+        rules = await SubscriptionStore(stream_manager.redis).for_user(user_data["sub"])
+    except Exception as e:
+        logger.error("Failed to fetch subscriptions", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to fetch subscriptions")
+    return [_response(rule) for rule in rules]
+
+
+@router.post("/", response_model=SubscriptionResponse, status_code=201)
+async def create_subscription(
+    request: SubscriptionRequest,
+    user_data: dict = Depends(auth.verify_token)
+):
+    """Add an alert rule; matching events are dispatched to its channels"""
+    store = SubscriptionStore(stream_manager.redis)
+    subscription = Subscription(user_id=user_data["sub"], filter=request.filter, channels=request.channels)
+    try:
+        if len(await store.for_user(subscription.user_id)) >= MAX_RULES_PER_USER:
+            raise HTTPException(status_code=409, detail=f"At most {MAX_RULES_PER_USER} subscriptions per user")
+        await store.save(subscription)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to create subscription", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to create subscription")
+    return _response(subscription)
+
+
+@router.delete("/{subscription_id}")
+async def delete_subscription(
+    subscription_id: str,
+    user_data: dict = Depends(auth.verify_token)
+):
+    """Remove one of the caller's alert rules"""
+    try:
+        deleted = await SubscriptionStore(stream_manager.redis).delete(user_data["sub"], subscription_id)
+    except Exception as e:
+        logger.error("Failed to delete subscription", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to delete subscription")
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Subscription not found")
+    return {"status": "deleted", "subscription_id": subscription_id}
\ No newline at end of file
@@ -0,0 +1 @@
+"""Performance benchmarks"""
\ No newline at end of file
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark admission control under overload: latency and throughput with and without it
+
+A simulated downstream (LLM + vector store) serves ``--capacity`` calls at
+``--service-ms`` and slows down linearly beyond that, as a saturated
+provider does. Requests arrive at ``--rate`` per second for ``--seconds``.
+Without admission every request runs at once and everyone waits; with it
+the limit settles near capacity, excess requests get a fast 429/503, and
+admitted requests keep near-baseline latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_admission
+    python -m benchmarks.bench_admission --capacity 20 --rate 600 --seconds 8
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.report import print_table
+from shared.middleware.admission import AdmissionController, AdmissionRejected, GradientLimit
+
+
+class Downstream:
+    def __init__(self, capacity: int, service_ms: float):
+        self.capacity = capacity
+        self.service_ms = service_ms
+        self.active = 0
+
+    async def call(self) -> None:
+        self.active += 1
+        try:
+            slowdown = max(1.0, self.active / self.capacity)
+            await asyncio.sleep(self.service_ms / 1000 * slowdown * random.uniform(0.9, 1.1))
+        finally:
+            self.active -= 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+async def run(args, admission: Optional[AdmissionController]) -> Dict:
+    downstream = Downstream(args.capacity, args.service_ms)
+    latencies: List[float] = []
+    rejected = {"429": 0, "503": 0}
+    limits: List[int] = []
+
+    async def request() -> None:
+        started = time.perf_counter()
+        if admission is None:
+            await downstream.call()
+        else:
+            try:
+                async with admission.slot():
+                    called = time.perf_counter()
+                    await downstream.call()
+                    admission.observe(time.perf_counter() - called)
+            except AdmissionRejected as e:
+                rejected[str(e.status_code)] += 1
+                return
+            limits.append(admission.limit)
+        latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    started = time.perf_counter()
+    tick = 0.01
+    while time.perf_counter() - started < args.seconds:
+        for _ in range(int(args.rate * tick)):
+            tasks.append(asyncio.create_task(request()))
+        await asyncio.sleep(tick)
+    await asyncio.gather(*tasks)
+
+    latencies.sort()
+    return {
+        "admission": "on" if admission else "off",
+        "served/s": round(len(latencies) / args.seconds),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000),
+        "429": rejected["429"],
+        "503": rejected["503"],
+        "limit_p50": percentile(sorted(limits), 0.5) if limits else "-"
+    }
+
+
+async def main_async(args) -> list:
+    return [
+        await run(args, None),
+        await run(args, AdmissionController(
+            limit=GradientLimit(initial=16, max_limit=512),
+            max_queue=args.max_queue,
+            max_wait=args.max_wait
+        ))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capacity", type=int, default=20, help="downstream concurrency before it slows down")
+    parser.add_argument("--service-ms", type=float, default=50.0)
+    parser.add_argument("--rate", type=float, default=600.0, help="arrivals per second")
+    parser.add_argument("--seconds", type=float, default=8.0)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--max-wait", type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
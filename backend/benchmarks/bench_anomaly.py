@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark the streaming anomaly detector: events/s per event and in batches
+
+Usage (from backend/):
+    python -m benchmarks.bench_anomaly
+    python -m benchmarks.bench_anomaly --events 500000 --assets 6 50 500
+"""
+
+import argparse
+import time
+from typing import Dict
+
+import numpy as np
+
+from benchmarks.report import print_table
+from services.risk_engine.anomaly import AnomalyDetector
+
+
+def synthetic_stream(n: int, assets: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    names = [f"ASSET{i}" for i in rng.integers(0, assets, n)]
+    timestamps = np.cumsum(rng.exponential(0.05, n))
+    sentiments = rng.normal(0, 0.3, n)
+    sentiments[rng.random(n) < 0.2] = np.nan  # not every event carries a sentiment
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return names, timestamps, sentiments, prices
+
+
+def bench(n: int, assets: int, batch_size: int) -> Dict:
+    names, timestamps, sentiments, prices = synthetic_stream(n, assets)
+
+    detector = AnomalyDetector()
+    started = time.perf_counter()
+    for i, name in enumerate(names):
+        detector._step_one(detector._row(name), timestamps[i], sentiments[i], prices[i])
+    per_event = n / (time.perf_counter() - started)
+
+    detector = AnomalyDetector()
+    escalated = 0
+    started = time.perf_counter()
+    for start in range(0, n, batch_size):
+        end = start + batch_size
+        scores, _ = detector.update(names[start:end], timestamps[start:end], sentiments[start:end], prices[start:end])
+        escalated += int((scores >= detector.escalation_score).sum())
+    batched = n / (time.perf_counter() - started)
+
+    return {
+        "assets": assets,
+        "per_event/s": f"{per_event:,.0f}",
+        f"batch{batch_size}/s": f"{batched:,.0f}",
+        "escalated": f"{escalated / n:.2%}"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--assets", type=int, nargs="+", default=[6, 50, 500])
+    parser.add_argument("--batch-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    results = [bench(args.events, assets, args.batch_size) for assets in args.assets]
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Benchmark token verification: jwt.decode on every request vs the verified-token cache
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --requests 200000 --tokens 1000
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List
+
+import jwt
+
+from benchmarks.report import print_table
+from shared.middleware.auth import AuthMiddleware, TokenCache
+
+
+def uncached_decode(secret: str) -> Callable[[str], dict]:
+    """The previous path: verify, then re-check exp by hand"""
+    from datetime import datetime, timezone
+
+    def decode(token: str) -> dict:
+        payload = jwt.decode(token, secret, algorithms=["HS256"])
+        if payload.get("exp", 0) < datetime.now(timezone.utc).timestamp():
+            raise ValueError("expired")
+        return payload
+    return decode
+
+
+def time_calls(fn: Callable[[str], dict], tokens: List[str], n: int) -> Dict:
+    rng = random.Random(0)
+    sequence = [rng.choice(tokens) for _ in range(n)]
+    started = time.perf_counter()
+    for token in sequence:
+        fn(token)
+    elapsed = time.perf_counter() - started
+    return {"us/request": round(elapsed / n * 1e6, 2), "requests/s": f"{n / elapsed:,.0f}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--tokens", type=int, default=500, help="distinct tokens (dashboard sessions)")
+    args = parser.parse_args()
+
+    secret = "bench-secret"
+    cache = TokenCache()
+    auth = AuthMiddleware(secret, cache=cache)
+    tokens = [auth.create_access_token(f"user{i}") for i in range(args.tokens)]
+
+    results = [
+        {"path": "jwt.decode", **time_calls(uncached_decode(secret), tokens, args.requests)},
+        {"path": "cold cache", **time_calls(AuthMiddleware(secret, cache=TokenCache(max_entries=0)).decode_token, tokens, args.requests)},
+    ]
+    hits, misses = cache._hits._value.get(), cache._misses._value.get()
+    results.append({"path": "token cache", **time_calls(auth.decode_token, tokens, args.requests)})
+    hits, misses = cache._hits._value.get() - hits, cache._misses._value.get() - misses
+    print(f"cache hit rate: {hits / (hits + misses):.4f}")
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark the payload codec against the JSON it replaces, on real payloads
+
+Payloads: an events:raw event (fixture text with typical metadata), a
+multi-agent analysis as stored on a job, and the published market snapshot
+for a few dozen assets. "before" is the code path each one used before the
+codec (pydantic JSON for models, stdlib json for the snapshot); encode and
+decode include building and validating the model where the caller does.
+
+Usage (from backend/):
+    python -m benchmarks.bench_codec
+    python -m benchmarks.bench_codec --iterations 20000 --threshold 512
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.bench_serialization import sample_analysis
+from benchmarks.report import print_table
+from services.market_data.feeds import Tick
+from services.market_data.service import MarketDataService
+from shared.models.event import EventModel
+from shared.utils.codec import Codec
+
+FIXTURE = Path(__file__).parent / "fixtures" / "encoder_corpus.jsonl"
+
+
+def sample_event() -> EventModel:
+    texts = [json.loads(line)["text"] for line in FIXTURE.read_text().splitlines()[:3]]
+    return EventModel(
+        source="news",
+        content={"title": texts[0], "text": " ".join(texts), "url": "https://example.com/markets/exchange-halt"},
+        metadata={"relevance_score": 0.87, "author": "newsdesk", "tags": ["exchange", "withdrawals", "BTC"]}
+    )
+
+
+def sample_snapshot(assets: int = 40, window: int = 60) -> Dict:
+    service = MarketDataService(feed=None, window=window)
+    for t in range(window):
+        for i in range(assets):
+            service.ingest(Tick(f"ASSET{i}", 100.0 + i + t * 0.37, 1000.0 + t * 13.1, 1.7e9 + t * 60))
+    return {**service.snapshot(), "published_at": time.time()}
+
+
+def time_calls(fn: Callable[[], object], n: int) -> float:
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def bench(name: str, encode: Callable, decode: Callable, n: int) -> Dict:
+    data = encode()
+    decode(data)
+    return {
+        "payload": name.split(" ")[0],
+        "format": name.split(" ", 1)[1],
+        "bytes": len(data),
+        "encode_us": round(time_calls(encode, n), 1),
+        "decode_us": round(time_calls(lambda: decode(data), n), 1)
+    }
+
+
+def run(n: int, threshold: int) -> List[Dict]:
+    codecs = {
+        "codec json": Codec(write_format="json"),
+        "msgpack": Codec(compress_threshold=0),
+        "msgpack+zstd": Codec(compress_threshold=threshold)
+    }
+    event, analysis, snapshot = sample_event(), sample_analysis(), sample_snapshot()
+
+    results = [
+        bench("event before", event.model_dump_json, EventModel.model_validate_json, n),
+        bench("analysis before", analysis.model_dump_json, json.loads, n),
+        bench("snapshot before", lambda: json.dumps(snapshot), json.loads, n)
+    ]
+    for label, codec in codecs.items():
+        results.append(bench(
+            f"event {label}",
+            lambda: codec.encode(event.model_dump()),
+            lambda data: EventModel.model_validate(codec.decode(data)),
+            n
+        ))
+        results.append(bench(f"analysis {label}", lambda: codec.encode(analysis.model_dump()), codec.decode, n))
+        results.append(bench(f"snapshot {label}", lambda: codec.encode(snapshot), codec.decode, n))
+    return sorted(results, key=lambda row: row["payload"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--threshold", type=int, default=1024, help="zstd compression threshold (bytes)")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.threshold)
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Benchmark encoder backends: throughput, memory and retrieval recall
+
+Usage (from backend/):
+    python -m benchmarks.bench_encoders
+    python -m benchmarks.bench_encoders --model /models/all-MiniLM-L6-v2 --projection pca256.npz
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+import numpy as np
+import psutil
+
+from benchmarks.report import print_table
+from services.llm_orchestrator.encoders import (
+    DEFAULT_MODEL,
+    Encoder,
+    HashingEncoder,
+    ProjectedEncoder,
+    SentenceTransformerEncoder,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "encoder_corpus.jsonl")
+
+
+def load_corpus(path: str) -> Tuple[List[str], List[str]]:
+    texts, groups = [], []
+    with open(path) as f:
+        for line in f:
+            row = json.loads(line)
+            texts.append(row["text"])
+            groups.append(row["group"])
+    return texts, groups
+
+
+def recall_at_k(vectors: np.ndarray, groups: List[str]) -> float:
+    """Mean fraction of same-story neighbours retrieved in the top k,
+    where k is the size of the story minus the query itself"""
+    labels = np.array(groups)
+    scores = vectors @ vectors.T
+    np.fill_diagonal(scores, -np.inf)
+    recalls = []
+    for i in range(len(groups)):
+        relevant = labels == labels[i]
+        relevant[i] = False
+        k = int(relevant.sum())
+        if k == 0:
+            continue
+        top = np.argpartition(-scores[i], k)[:k]
+        recalls.append(relevant[top].sum() / k)
+    return float(np.mean(recalls))
+
+
+def bench(encoder: Encoder, texts: List[str], groups: List[str], repeat: int) -> Dict:
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    encoder.encode(texts[:1])  # include lazy model load in load_s
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        vectors = encoder.encode(texts)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "encoder": encoder.name,
+        "dim": encoder.dimension,
+        "load_s": round(load_s, 3),
+        "encodes_per_s": round(len(texts) * repeat / elapsed, 1),
+        "rss_mb": round((process.memory_info().rss - rss_before) / 1e6, 1),
+        "py_peak_mb": round(peak / 1e6, 1),
+        "recall": round(recall_at_k(vectors, groups), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=FIXTURE)
+    parser.add_argument("--model", action="append", default=[],
+                        help="sentence-transformers model name or local path (repeatable)")
+    parser.add_argument("--projection", help="PCA projection .npz applied to each --model")
+    parser.add_argument("--hashing-dim", type=int, action="append", default=[])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts, groups = load_corpus(args.corpus)
+
+    encoders: List[Encoder] = [HashingEncoder(d) for d in (args.hashing_dim or [256, 768])]
+    for model in args.model or [DEFAULT_MODEL]:
+        try:
+            base = SentenceTransformerEncoder(model)
+            base.dimension
+        except Exception as e:
+            print(f"skipping {model}: {e}")
+            continue
+        encoders.append(base)
+        if args.projection:
+            encoders.append(ProjectedEncoder(base, args.projection))
+
+    results = [bench(encoder, texts, groups, args.repeat) for encoder in encoders]
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Benchmark event listing on a large synthetic table: keyset cursor vs OFFSET
+
+Loads N synthetic events (default 10M) with COPY, then times first pages,
+deep pages and filtered pages through EventStore. Point DATABASE_URL at a
+scratch database: the events table there is dropped and recreated.
+
+Usage (from backend/):
+    DATABASE_URL=postgresql://localhost/blackswan_bench python -m benchmarks.bench_event_store
+    DATABASE_URL=... python -m benchmarks.bench_event_store --rows 1000000 --skip-load
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from benchmarks.report import print_table
+from config.database import Database, DatabaseConfig
+from services.event_store import EventStore, MAX_PAGE_SIZE, encode_cursor
+from services.event_store.tables import events
+
+SOURCES = ["twitter", "reddit", "news", "telegram", "onchain"]
+ASSETS = ["BTC", "ETH", "SOL", "AVAX", "MATIC", "DOT", None]
+# Most events are never escalated; alerts are the rare tail
+SEVERITIES = [None] * 60 + ["low"] * 25 + ["medium"] * 10 + ["high"] * 4 + ["critical"]
+COPY_CHUNK = 50_000
+
+
+def synthetic_rows(start: int, count: int, origin: datetime):
+    rng = random.Random(start)
+    for i in range(start, start + count):
+        severity = rng.choice(SEVERITIES)
+        yield (
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            origin + timedelta(seconds=i * 0.3),
+            rng.choice(SOURCES),
+            rng.choice(ASSETS),
+            json.dumps({"text": f"synthetic event {i}"}),
+            "{}", None, "[]", "[]",
+            origin + timedelta(seconds=i * 0.3 + 2) if severity else None,
+            severity,
+            rng.random() if severity else None,
+            "[]", "[]", None
+        )
+
+
+async def load(database: Database, store: EventStore, rows: int) -> None:
+    async with database.engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS events"))
+        await conn.run_sync(events.metadata.create_all)
+
+    # COPY without indexes, then build them once
+    async with database.engine.begin() as conn:
+        for index in events.indexes:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+    origin = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    columns = [column.name for column in events.columns]
+    started = time.perf_counter()
+    async with database.engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        for start in range(0, rows, COPY_CHUNK):
+            await driver.copy_records_to_table(
+                "events", records=synthetic_rows(start, min(COPY_CHUNK, rows - start), origin), columns=columns
+            )
+            print(f"\rloaded {min(start + COPY_CHUNK, rows):,} rows", end="", flush=True)
+    print(f" in {time.perf_counter() - started:.0f}s")
+
+    started = time.perf_counter()
+    async with database.engine.begin() as conn:
+        for index in events.indexes:
+            await conn.run_sync(lambda sync_conn, index=index: index.create(sync_conn))
+        await conn.execute(text("ANALYZE events"))
+    print(f"built indexes in {time.perf_counter() - started:.0f}s")
+
+
+async def time_page(store: EventStore, limit: int, repeat: int, **filters) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query = store.listing_query(limit, **filters)
+        rows, _ = await store.page(query, limit)
+        for _ in store.iter_json(rows, dict):
+            pass
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def time_offset(database: Database, offset: int, limit: int, repeat: int) -> List[float]:
+    """The previous skip/limit style for comparison"""
+    statement = text(
+        "SELECT * FROM events ORDER BY timestamp DESC, id DESC OFFSET :offset LIMIT :limit"
+    )
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        async with database.engine.connect() as conn:
+            (await conn.execute(statement, {"offset": offset, "limit": limit})).all()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def cursor_at_depth(database: Database, depth: int) -> Optional[str]:
+    async with database.engine.connect() as conn:
+        row = (await conn.execute(
+            text("SELECT timestamp, id FROM events ORDER BY timestamp DESC, id DESC OFFSET :depth LIMIT 1"),
+            {"depth": depth - 1}
+        )).first()
+    return encode_cursor(row.timestamp, row.id) if row else None
+
+
+def summarize(name: str, samples: List[float]) -> Dict:
+    samples = sorted(samples)
+    return {
+        "query": name,
+        "p50_ms": round(statistics.median(samples) * 1000, 2),
+        "p95_ms": round(samples[int(len(samples) * 0.95)] * 1000, 2)
+    }
+
+
+async def main_async(args) -> List[Dict]:
+    # Index builds and deep OFFSET scans outlast the service statement timeout
+    database = Database(DatabaseConfig(statement_timeout_ms=0))
+    await database.connect()
+    store = EventStore(database)
+    try:
+        if not args.skip_load:
+            await load(database, store, args.rows)
+
+        limit, repeat = args.limit, args.repeat
+        results = [
+            summarize("keyset first page", await time_page(store, limit, repeat)),
+            summarize("source=twitter", await time_page(store, limit, repeat, sources=["twitter"])),
+            summarize("asset=SOL", await time_page(store, limit, repeat, asset="SOL")),
+            summarize("severity high|critical", await time_page(store, limit, repeat, severities=["high", "critical"])),
+        ]
+        for depth in (10_000, 1_000_000, args.rows // 2):
+            if depth >= args.rows:
+                continue
+            cursor = await cursor_at_depth(database, depth)
+            results.append(summarize(f"keyset at {depth:,}", await time_page(store, limit, repeat, cursor=cursor)))
+            results.append(summarize(f"OFFSET {depth:,}", await time_offset(database, depth, limit, max(3, repeat // 5))))
+        return results
+    finally:
+        await database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--limit", type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-load", action="store_true", help="reuse the table from a previous run")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
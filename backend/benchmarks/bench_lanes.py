@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark urgency lanes: per-lane throughput and critical drain time, plain vs weighted reads
+
+Every lane starts with the same backlog and one in-process StreamConsumer
+with bounded concurrency and a fixed per-event handling time drains them
+for ``--seconds``. Plain reads split the slots evenly across lanes;
+weighted reads split them by lane weight, so a critical backlog clears
+that many times faster without idling when other lanes are empty.
+Needs a Redis server (REDIS_URL, default redis://localhost:6379).
+
+Usage (from backend/):
+    python -m benchmarks.bench_lanes
+    python -m benchmarks.bench_lanes --backlog 5000 --concurrency 32 --handle-ms 10
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict
+
+from redis import asyncio as aioredis
+
+from benchmarks.report import print_table
+from shared.streams import DEFAULT_LANE_WEIGHTS, LANES, StreamConsumer, lane_of, lane_streams
+
+BASE = "bench:lanes"
+GROUP = "bench-analysis"
+
+
+async def run(redis: aioredis.Redis, weighted: bool, backlog: int, seconds: float,
+              concurrency: int, handle_ms: float) -> Dict:
+    streams = lane_streams(BASE)
+    await redis.delete(*streams)
+    pipe = redis.pipeline(transaction=False)
+    for stream in streams:
+        for _ in range(backlog):
+            pipe.xadd(stream, {"n": "0"})
+    await pipe.execute()
+
+    handled = {lane: 0 for lane in LANES}
+    started = time.perf_counter()
+    critical_drained = None
+
+    async def handler(stream, message_id, fields):
+        nonlocal critical_drained
+        lane = lane_of(BASE, stream)
+        await asyncio.sleep(handle_ms / 1000)
+        handled[lane] += 1
+        if lane == "critical" and handled[lane] == backlog:
+            critical_drained = time.perf_counter() - started
+
+    consumer = StreamConsumer(
+        redis, streams, GROUP, handler,
+        concurrency=concurrency,
+        min_batch=1,
+        max_batch=concurrency,
+        weights={stream: DEFAULT_LANE_WEIGHTS[lane_of(BASE, stream)] for stream in streams} if weighted else None
+    )
+    task = asyncio.create_task(consumer.run())
+    await asyncio.sleep(seconds)
+    consumer.stop()
+    await task
+    await redis.delete(*streams)
+
+    return {
+        "reads": "weighted" if weighted else "plain",
+        **{lane: handled[lane] for lane in LANES},
+        "events/s": round(sum(handled.values()) / seconds),
+        "critical_s": round(critical_drained, 2) if critical_drained else f">{seconds:g}"
+    }
+
+
+async def main_async(args) -> list:
+    redis = aioredis.from_url(args.redis_url, decode_responses=True)
+    results = [
+        await run(redis, weighted, args.backlog, args.seconds, args.concurrency, args.handle_ms)
+        for weighted in (False, True)
+    ]
+    await redis.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backlog", type=int, default=2000, help="entries per lane")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight events")
+    parser.add_argument("--handle-ms", type=float, default=10.0, help="simulated analysis time per event")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
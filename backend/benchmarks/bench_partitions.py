@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark partitioned events:raw: throughput vs worker count, with per-asset order checked
+
+Workers are simulated in-process: each is a StreamConsumer + PartitionAssigner
+with bounded concurrency and a fixed per-event handling time, so adding
+workers adds capacity the way adding analysis worker processes does.
+Needs a Redis server (REDIS_URL, default redis://localhost:6379).
+
+Usage (from backend/):
+    python -m benchmarks.bench_partitions
+    python -m benchmarks.bench_partitions --workers 1 2 4 8 --partitions 16 --events 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+from redis import asyncio as aioredis
+
+from benchmarks.report import print_table
+from shared.streams import PartitionAssigner, StreamConsumer, partition_streams, stream_for
+
+BASE = "bench:raw"
+GROUP = "bench-analysis"
+
+
+async def reset(redis: aioredis.Redis, partitions: int) -> None:
+    streams = partition_streams(BASE, partitions)
+    await redis.delete(*streams, *[f"{s}:lease" for s in streams], *[f"{s}:dead" for s in streams], f"{BASE}:members")
+
+
+async def run(redis: aioredis.Redis, workers: int, partitions: int, events: int, assets: int,
+              concurrency: int, handle_ms: float) -> Dict:
+    await reset(redis, partitions)
+    seen: Dict[str, List[int]] = {}
+    done = asyncio.Event()
+    handled = 0
+
+    async def handler(stream, message_id, fields):
+        nonlocal handled
+        await asyncio.sleep(handle_ms / 1000)
+        seen.setdefault(fields["key"], []).append(int(fields["seq"]))
+        handled += 1
+        if handled >= events:
+            done.set()
+
+    pool = []
+    for i in range(workers):
+        consumer = StreamConsumer(redis, [], GROUP, handler, consumer_name=f"w{i}", concurrency=concurrency,
+                                  block_ms=100, order_key=lambda fields: fields.get("key"))
+        assigner = PartitionAssigner(redis, consumer, BASE, partitions, heartbeat_interval=0.5, member_ttl=5.0)
+        pool.append((consumer, assigner, asyncio.create_task(consumer.run()), asyncio.create_task(assigner.run())))
+    # Let membership settle so the run measures steady state
+    while sum(len(assigner.owned) for _, assigner, _, _ in pool) < partitions:
+        await asyncio.sleep(0.1)
+
+    started = time.perf_counter()
+    for start in range(0, events, 2000):
+        pipe = redis.pipeline(transaction=False)
+        for i in range(start, min(events, start + 2000)):
+            asset = f"ASSET{i % assets}"
+            pipe.xadd(stream_for(BASE, asset, partitions), {"key": asset, "seq": str(i)})
+        await pipe.execute()
+    await done.wait()
+    elapsed = time.perf_counter() - started
+
+    for consumer, assigner, consuming, assigning in pool:
+        assigner.stop()
+    for consumer, assigner, consuming, assigning in pool:
+        await assigning
+        consumer.stop()
+        await consuming
+    await reset(redis, partitions)
+    return {
+        "workers": workers,
+        "events/s": f"{events / elapsed:,.0f}",
+        "in order": all(sequence == sorted(sequence) for sequence in seen.values())
+    }
+
+
+async def main_async(args) -> List[Dict]:
+    redis = aioredis.from_url(args.redis_url, decode_responses=True)
+    results = [
+        await run(redis, workers, args.partitions, args.events, args.assets, args.concurrency, args.handle_ms)
+        for workers in args.workers
+    ]
+    await redis.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight events per worker")
+    parser.add_argument("--handle-ms", type=float, default=20.0, help="simulated analysis time per event")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
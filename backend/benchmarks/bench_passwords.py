@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark event-loop stall from password hashing: inline bcrypt vs PasswordHasher
+
+A 5 ms ticker stands in for the other requests on the worker; its worst
+and p99 lag show how long they would have been held up.
+
+Usage (from backend/):
+    python -m benchmarks.bench_passwords
+    python -m benchmarks.bench_passwords --registrations 50 --rounds 12 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+import bcrypt
+
+from benchmarks.report import print_table
+from shared.utils.passwords import HasherBusy, PasswordHasher
+
+TICK = 0.005
+
+
+async def measure(register: Callable[[], Awaitable[None]], n: int, concurrency: int) -> Dict:
+    lags: List[float] = []
+
+    async def ticker():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - started - TICK)
+
+    shed = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal shed
+        async with semaphore:
+            try:
+                await register()
+            except HasherBusy:
+                shed += 1
+
+    task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    elapsed = time.perf_counter() - started
+    task.cancel()
+    lags.sort()
+    return {
+        "registrations/s": round((n - shed) / elapsed, 1),
+        "shed": shed,
+        "loop lag p99 ms": round(lags[int(len(lags) * 0.99)] * 1000, 1) if lags else None,
+        "loop lag max ms": round(lags[-1] * 1000, 1) if lags else None
+    }
+
+
+async def main_async(n: int, rounds: int, concurrency: int, workers: int) -> List[Dict]:
+    async def inline():
+        # The previous register path: bcrypt directly inside the coroutine
+        bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds))
+        await asyncio.sleep(0)
+
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=n)
+    bounded = PasswordHasher(rounds=rounds, workers=workers, max_pending=workers * 2)
+    results = [
+        {"path": "inline bcrypt", **await measure(inline, n, concurrency)},
+        {"path": "hash pool", **await measure(lambda: hasher.hash("password123"), n, concurrency)},
+        {"path": f"hash pool, max {workers * 2}", **await measure(lambda: bounded.hash("password123"), n, concurrency)},
+    ]
+    hasher.close()
+    bounded.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--registrations", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args.registrations, args.rounds, args.concurrency, args.workers))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Benchmark push hub fan-out: connections held, messages/s and delivery lag
+
+Simulates N connections as writer tasks draining their outboxes (a fraction
+of them slow), publishes a burst of events:analyzed messages and reports
+fan-out throughput, delivery lag and memory per connection. No Redis needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_push_gateway
+    python -m benchmarks.bench_push_gateway --connections 10000 50000 --messages 5000 --batch-size 1
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List
+
+from benchmarks.report import print_table
+from services.push_gateway import CHANNELS, PushHub, Subscriber
+
+SEVERITIES = ["low"] * 6 + ["medium"] * 3 + ["high", "critical"]
+
+
+async def consume(subscriber: Subscriber, slow: bool, lags: List[float], received: List[int]) -> None:
+    while not subscriber.closed:
+        frames, _ = await subscriber.next_batch()
+        if frames:
+            received[0] += len(frames)
+            lags.append(time.perf_counter() - float(frames[-1][0].split("-")[1]) / 1e6)
+        # A slow client: its socket takes a while to drain each write
+        await asyncio.sleep(0.05 if slow else 0)
+
+
+async def bench(connections: int, messages: int, batch_size: int, slow_fraction: float) -> Dict:
+    rng = random.Random(0)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    hub = PushHub(redis=None)
+    channels = list(CHANNELS)
+    subscribers = [
+        await hub.subscribe(rng.sample(channels, rng.randint(1, 2)), max_pending=256)
+        for _ in range(connections)
+    ]
+    per_connection = (tracemalloc.get_traced_memory()[0] - baseline) / connections
+    tracemalloc.stop()
+
+    lags: List[float] = []
+    received = [0]
+    tasks = [
+        asyncio.create_task(consume(subscriber, rng.random() < slow_fraction, lags, received))
+        for subscriber in subscribers
+    ]
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    publish_time = 0.0
+    for start in range(0, messages, batch_size):
+        # Stream IDs carry the publish time so consumers can measure lag;
+        # batches stand in for one XREAD reply
+        now = int(time.perf_counter() * 1e6)
+        batch = [
+            (f"0-{now}", {"event_id": str(i), "severity": rng.choice(SEVERITIES), "confidence": "0.7"})
+            for i in range(start, min(start + batch_size, messages))
+        ]
+        publish_started = time.perf_counter()
+        hub.publish_many(batch)
+        publish_time += time.perf_counter() - publish_started
+        await asyncio.sleep(0)  # let writers run between batches
+    await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - started
+
+    await hub.stop()
+    await asyncio.gather(*tasks)
+    lags.sort()
+    return {
+        "connections": connections,
+        "msg/s (fan-out)": f"{messages / publish_time:,.0f}",
+        "frames delivered/s": f"{received[0] / elapsed:,.0f}",
+        "lag p50 ms": round(statistics.median(lags) * 1000, 1) if lags else None,
+        "lag p99 ms": round(lags[int(len(lags) * 0.99)] * 1000, 1) if lags else None,
+        "bytes/conn": f"{per_connection:,.0f}"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50, help="messages per XREAD reply")
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    args = parser.parse_args()
+
+    results = [asyncio.run(bench(n, args.messages, args.batch_size, args.slow_fraction)) for n in args.connections]
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Benchmark rate limiting overhead: no limiter, per-request sliding window, pooled GCRA
+
+Needs a Redis server (REDIS_URL, default redis://localhost:6379).
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit
+    python -m benchmarks.bench_rate_limit --requests 20000 --clients 1000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+from redis import asyncio as aioredis
+
+from benchmarks.report import print_table
+from shared.middleware.rate_limit import RateLimitMiddleware
+
+
+class SlidingWindowMiddleware:
+    """The previous approach: a new Redis connection and a four-command
+    sorted-set transaction per request"""
+
+    def __init__(self, app, redis_url: str, limit: int, window: int):
+        self.app = app
+        self.redis_url = redis_url
+        self.limit = limit
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        redis = await aioredis.from_url(self.redis_url)
+        try:
+            key = f"bench:sliding:{scope['client'][0]}"
+            now = time.time()
+            pipe = redis.pipeline()
+            pipe.zremrangebyscore(key, 0, now - self.window)
+            pipe.zadd(key, {str(now): now})
+            pipe.zcount(key, now - self.window, now)
+            pipe.expire(key, self.window + 1)
+            results = await pipe.execute()
+        finally:
+            await redis.close()
+        if results[2] > self.limit:
+            await send({"type": "http.response.start", "status": 429, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await self.app(scope, receive, send)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/events")
+    async def events():
+        return Response(content=b"[]", media_type="application/json")
+
+    return app
+
+
+def scope_for(client: int) -> Dict:
+    path = "/api/v1/events"
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "client": (f"10.0.{client // 256}.{client % 256}", 0),
+        "server": ("bench", 80)
+    }
+
+
+async def drive(app, n: int, clients: int, concurrency: int) -> Dict:
+    """n requests spread over ``clients`` addresses, ``concurrency`` in flight"""
+    scopes = [scope_for(i) for i in range(clients)]
+    statuses: Dict[int, int] = {}
+    samples: List[float] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses[message["status"]] = statuses.get(message["status"], 0) + 1
+
+    async def worker(offset: int):
+        for i in range(offset, n, concurrency):
+            started = time.perf_counter()
+            await app(scopes[i % clients], receive, send)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        "req/s": f"{n / elapsed:,.0f}",
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+        "p99_us": round(samples[int(len(samples) * 0.99)] * 1e6, 1),
+        "429s": statuses.get(429, 0)
+    }
+
+
+async def main_async(n: int, clients: int, concurrency: int, redis_url: str) -> List[Dict]:
+    redis = aioredis.from_url(redis_url)
+    await redis.ping()
+    results = []
+
+    generous = {"api": (10 ** 9, 60)}
+    tight = {"api": (10, 60)}
+    cases = [
+        ("no limiter", build_app()),
+        ("sliding window", SlidingWindowMiddleware(build_app(), redis_url, 10 ** 9, 60)),
+        ("gcra, allowed", RateLimitMiddleware(build_app(), redis_url, limits=generous, max_connections=concurrency)),
+        ("gcra, over limit", RateLimitMiddleware(build_app(), redis_url, limits=tight, max_connections=concurrency)),
+    ]
+    for name, app in cases:
+        for key in [k async for k in redis.scan_iter("rate_limit:*")] + [k async for k in redis.scan_iter("bench:*")]:
+            await redis.delete(key)
+        await drive(app, min(n, 500), clients, concurrency)  # warm up
+        results.append({"path": name, **await drive(app, n, clients, concurrency)})
+
+    for key in [k async for k in redis.scan_iter("rate_limit:*")] + [k async for k in redis.scan_iter("bench:*")]:
+        await redis.delete(key)
+    await redis.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args.requests, args.clients, args.concurrency, args.redis_url))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
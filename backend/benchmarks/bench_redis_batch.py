@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark the auto-batching Redis client against plain pooled calls
+
+Each round issues ``concurrency`` commands at once (as that many concurrent
+requests on the analyze path would) and waits for all of them; the mix is
+the XADD/INCR/GET traffic the API and workers send. The plain client needs
+a pool connection per concurrent command (and fails past the pool size);
+the batched one sends each round as a single pipeline.
+Needs a Redis server (REDIS_URL, default redis://localhost:6379).
+
+Usage (from backend/):
+    python -m benchmarks.bench_redis_batch
+    python -m benchmarks.bench_redis_batch --concurrency 1 10 100 500 --commands 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict
+
+from redis import asyncio as aioredis
+
+from benchmarks.report import print_table
+from shared.utils.redis_batch import AutoBatchingRedis, pipeline_size
+
+KEY = "bench:autobatch"
+
+
+def command(client, i: int):
+    kind = i % 3
+    if kind == 0:
+        return client.xadd(f"{KEY}:stream", {"event_id": str(i), "severity": "low"}, maxlen=10000)
+    if kind == 1:
+        return client.incr(f"{KEY}:counter")
+    return client.get(f"{KEY}:counter")
+
+
+async def run(client, label: str, concurrency: int, commands: int) -> Dict:
+    rounds = max(1, commands // concurrency)
+    pipelines_before = sum(bucket.get() for bucket in pipeline_size._buckets)
+    started = time.perf_counter()
+    try:
+        for r in range(rounds):
+            await asyncio.gather(*[command(client, r * concurrency + i) for i in range(concurrency)])
+    except aioredis.ConnectionError as e:
+        return {"client": label, "concurrency": concurrency, "cmds/s": f"error: {e}", "round_trips": "-"}
+    elapsed = time.perf_counter() - started
+    round_trips = rounds * concurrency
+    if isinstance(client, AutoBatchingRedis):
+        round_trips = int(sum(bucket.get() for bucket in pipeline_size._buckets) - pipelines_before)
+    return {
+        "client": label,
+        "concurrency": concurrency,
+        "cmds/s": round(rounds * concurrency / elapsed),
+        "round_trips": round_trips
+    }
+
+
+async def main_async(args) -> list:
+    plain = aioredis.from_url(args.redis_url, decode_responses=True, max_connections=args.max_connections)
+    batched = AutoBatchingRedis(
+        aioredis.from_url(args.redis_url, decode_responses=True, max_connections=args.max_connections)
+    )
+    results = []
+    for concurrency in args.concurrency:
+        results.append(await run(plain, "plain", concurrency, args.commands))
+        results.append(await run(batched, "batched", concurrency, args.commands))
+    await plain.delete(f"{KEY}:stream", f"{KEY}:counter")
+    await plain.close()
+    await batched.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--commands", type=int, default=20000)
+    parser.add_argument("--max-connections", type=int, default=50, help="pool size (RedisConfig default)")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark stream consumption: count=10 read + per-message XACK vs StreamConsumer
+
+Needs a Redis server (REDIS_URL, default redis://localhost:6379). Uses
+throwaway bench:* streams.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stream_consumer
+    python -m benchmarks.bench_stream_consumer --messages 500000 --streams 4
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+from redis import asyncio as aioredis
+
+from benchmarks.report import print_table
+from shared.streams import StreamConsumer
+
+GROUP = "bench-consumers"
+FIELDS = {"event_id": "6f1c2a9e-0d7b-4a53-9d6e-2f3b8c1e4a10", "source": "twitter", "content": "x" * 200}
+
+
+async def fill(redis: aioredis.Redis, streams: List[str], n: int) -> None:
+    for stream in streams:
+        await redis.delete(stream, f"{stream}:dead")
+        await redis.xgroup_create(stream, GROUP, id="0", mkstream=True)
+    for start in range(0, n, 5000):
+        pipe = redis.pipeline(transaction=False)
+        for i in range(start, min(n, start + 5000)):
+            pipe.xadd(streams[i % len(streams)], FIELDS)
+        await pipe.execute()
+
+
+async def legacy(redis: aioredis.Redis, streams: List[str], n: int) -> float:
+    """The old loop: count=10 from the first stream, one XACK per message"""
+    handled = 0
+    started = time.perf_counter()
+    while handled < n:
+        result = await redis.xreadgroup(GROUP, "legacy", {streams[0]: ">"}, count=10, block=100)
+        if not result:
+            break
+        for message_id, _ in result[0][1]:
+            await redis.xack(streams[0], GROUP, message_id)
+            handled += 1
+    return handled / (time.perf_counter() - started)
+
+
+async def batched(redis: aioredis.Redis, streams: List[str], n: int, concurrency: int) -> float:
+    handled = 0
+    done = asyncio.Event()
+
+    async def handler(stream, message_id, fields):
+        nonlocal handled
+        handled += 1
+        if handled >= n:
+            done.set()
+
+    consumer = StreamConsumer(redis, streams, GROUP, handler, consumer_name="batched", concurrency=concurrency)
+    started = time.perf_counter()
+    task = asyncio.create_task(consumer.run())
+    await done.wait()
+    consumer.stop()
+    await task
+    elapsed = time.perf_counter() - started
+    pending = sum([(await redis.xpending(stream, GROUP))["pending"] for stream in streams])
+    assert pending == 0, f"{pending} entries left unacked"
+    return handled / elapsed
+
+
+async def main_async(n: int, streams: int, concurrency: int, redis_url: str) -> List[Dict]:
+    redis = aioredis.from_url(redis_url, decode_responses=True, max_connections=8)
+    keys = [f"bench:stream:{i}" for i in range(streams)]
+    results = []
+
+    legacy_n = min(n, 50_000)
+    await fill(redis, keys[:1], legacy_n)
+    results.append({"path": "count=10 + XACK each", "messages": legacy_n, "msgs/s": f"{await legacy(redis, keys[:1], legacy_n):,.0f}"})
+
+    await fill(redis, keys, n)
+    results.append({"path": f"StreamConsumer x{streams}", "messages": n, "msgs/s": f"{await batched(redis, keys, n, concurrency):,.0f}"})
+
+    await redis.delete(*keys, *[f"{key}:dead" for key in keys])
+    await redis.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--streams", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=2000)
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args.messages, args.streams, args.concurrency, args.redis_url))
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmark alert rule matching: compiled SubscriptionIndex vs a per-rule loop
+
+Usage (from backend/):
+    python -m benchmarks.bench_subscriptions
+    python -m benchmarks.bench_subscriptions --subscriptions 10000 100000 1000000 --events 2000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.report import print_table
+from services.alert_service import Subscription, SubscriptionIndex
+from shared.models.event import EventFilter
+
+SEVERITIES = ["low", "medium", "high", "critical"]
+SOURCES = ["twitter", "reddit", "news", "telegram", "onchain"]
+ASSETS = ["BTC", "ETH", "SOL"] + [f"ALT{i}" for i in range(47)]
+
+
+def random_filter(rng: random.Random) -> EventFilter:
+    roll = rng.random()
+    severity = ["high", "critical"] if roll < 0.6 else ["critical"] if roll < 0.8 else None
+    assets = None if rng.random() < 0.3 else rng.sample(ASSETS[:10] if rng.random() < 0.7 else ASSETS, rng.randint(1, 3))
+    sources = None if rng.random() < 0.7 else rng.sample(SOURCES, rng.randint(1, 2))
+    min_confidence = None if rng.random() < 0.4 else round(rng.uniform(0, 0.9), 2)
+    return EventFilter(severity=severity, assets=assets, sources=sources, min_confidence=min_confidence)
+
+
+def random_event(rng: random.Random) -> Dict:
+    return {
+        "severity": rng.choices(SEVERITIES, weights=[50, 30, 15, 5])[0],
+        "source": rng.choice(SOURCES),
+        "asset": rng.choice(ASSETS[:10]) if rng.random() < 0.8 else None,
+        "confidence": rng.random(),
+        "timestamp": datetime.now(timezone.utc)
+    }
+
+
+def naive_match(rules: List[Subscription], event: Dict) -> List[Subscription]:
+    """The O(rules) loop the index replaces"""
+    matched = []
+    for rule in rules:
+        f = rule.filter
+        if f.severity and event["severity"] not in f.severity:
+            continue
+        if f.sources and event["source"] not in f.sources:
+            continue
+        if f.assets and event["asset"] not in f.assets:
+            continue
+        if f.min_confidence is not None and event["confidence"] < f.min_confidence:
+            continue
+        matched.append(rule)
+    return matched
+
+
+def bench(subscriptions: int, events: int) -> Dict:
+    rng = random.Random(0)
+    rules = [Subscription(user_id=f"user{i}", filter=random_filter(rng)) for i in range(subscriptions)]
+    stream = [random_event(rng) for _ in range(events)]
+
+    started = time.perf_counter()
+    index = SubscriptionIndex()
+    for rule in rules:
+        index.add(rule)
+    build = time.perf_counter() - started
+
+    matches = 0
+    started = time.perf_counter()
+    for event in stream:
+        matches += len(index.match(**event))
+    indexed = (time.perf_counter() - started) / events
+
+    sample = stream[:max(1, min(events, 200_000 // max(1, subscriptions // 100)))]
+    started = time.perf_counter()
+    for event in sample:
+        expected = naive_match(rules, event)
+    naive = (time.perf_counter() - started) / len(sample)
+    assert {rule.id for rule in index.match(**sample[-1])} == {rule.id for rule in expected}
+
+    return {
+        "subscriptions": subscriptions,
+        "build s": round(build, 2),
+        "matches/event": round(matches / events, 1),
+        "index µs/event": round(indexed * 1e6, 1),
+        "loop µs/event": round(naive * 1e6, 1),
+        "speedup": f"{naive / indexed:,.0f}x"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--events", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = [bench(n, args.events) for n in args.subscriptions]
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
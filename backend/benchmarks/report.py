@@ -0,0 +1,17 @@
+"""Result tables for the benchmark scripts"""
+
+from typing import Dict, List, Optional
+
+
+def print_table(results: List[Dict], width: Optional[int] = None) -> None:
+    """One row per result dict, columns in the first result's key order,
+    right-aligned to ``width`` (default: the widest header or value)"""
+    if not results:
+        return
+    columns = list(results[0].keys())
+    cells = [[str(row[c]) for c in columns] for row in results]
+    if width is None:
+        width = max(len(cell) for cell in columns + [cell for row in cells for cell in row])
+    print(" | ".join(f"{c:>{width}}" for c in columns))
+    for row in cells:
+        print(" | ".join(f"{cell:>{width}}" for cell in row))
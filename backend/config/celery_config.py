@@ -3,10 +3,26 @@
 import os
 from celery import Celery
 from kombu import Exchange, Queue
+from kombu.serialization import register
+
+from config.redis import payload_codec
 
 # Redis URL
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+# Task and result messages go through the shared payload codec; JSON stays
+# accepted so messages queued by not-yet-upgraded producers still run
+CODEC_SERIALIZER = "blackswan-codec"
+register(
+    CODEC_SERIALIZER,
+    payload_codec.encode,
+    payload_codec.decode,
+    content_type="application/x-blackswan-codec",
+    content_encoding="binary"
+)
+# While writers still emit JSON, old workers must be able to read our tasks
+SERIALIZER = "json" if payload_codec.write_format == "json" else CODEC_SERIALIZER
+
 # Create Celery instance
 celery_app = Celery(
     "blackswan",
@@ -23,9 +39,10 @@ celery_app = Celery(
 # Celery configuration
 celery_app.conf.update(
     # Task settings
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=SERIALIZER,
+    accept_content=[CODEC_SERIALIZER, "json"],
+    result_serializer=SERIALIZER,
+    result_accept_content=[CODEC_SERIALIZER, "json"],
     timezone="UTC",
     enable_utc=True,
     
@@ -1,17 +1,32 @@
 """Redis configuration for event streaming"""
 
 import os
-from typing import Optional
+from typing import List, Optional, Sequence
 from redis import asyncio as aioredis
 from dataclasses import dataclass
 
+from shared.streams import LANES, StreamConsumer, lane_of, lane_stream, partition_streams, stream_for
+from shared.utils.codec import Codec
+from shared.utils.redis_batch import AutoBatchingRedis
+
 @dataclass
 class RedisConfig:
     """Redis configuration settings"""
     url: str = os.getenv("REDIS_URL", "redis://localhost:6379")
-    max_connections: int = 50
+    max_connections: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    # Concurrent XADD/INCR/GET/... within this window (0 = the same event-loop
+    # iteration) share one pipeline
+    autobatch_enabled: bool = os.getenv("REDIS_AUTOBATCH_ENABLED", "true").lower() == "true"
+    autobatch_window_ms: float = float(os.getenv("REDIS_AUTOBATCH_WINDOW_MS", "0"))
     decode_responses: bool = True
     encoding: str = "utf-8"
+    # Codec payloads are binary: surrogateescape lets them round-trip through
+    # the decoded (str) responses unchanged
+    encoding_errors: str = "surrogateescape"
+    # Payload codec: "json" keeps writing the legacy format during a rolling
+    # upgrade; msgpack bodies of at least this many bytes are zstd-compressed
+    codec_write_format: str = os.getenv("CODEC_WRITE_FORMAT", "msgpack")
+    codec_compress_threshold: int = int(os.getenv("CODEC_COMPRESS_THRESHOLD", "1024"))
     
     # Stream settings
     stream_max_len: int = 10000  # Max events per stream
@@ -19,25 +34,49 @@ class RedisConfig:
     
     # Key prefixes
     event_stream_key: str = "events:raw"
+    # events:raw is split into this many streams by asset (1 = unpartitioned)
+    event_partitions: int = int(os.getenv("EVENT_STREAM_PARTITIONS", "1"))
+    # Each urgency lane is its own stream (events:raw:critical, ...), so a
+    # flood of low-priority events cannot trim critical ones away. The
+    # critical lane is trimmed only past this length (0 = never)
+    critical_stream_max_len: int = int(os.getenv("CRITICAL_STREAM_MAX_LEN", "0"))
     analyzed_stream_key: str = "events:analyzed"
     alert_stream_key: str = "alerts:dispatch"
+    duplicate_counts_prefix: str = "events:duplicates"  # {prefix}:{canonical event ID} -> duplicate count
 
 
 class RedisStreamManager:
-    """Manages Redis Streams for event processing"""
+    """Manages Redis Streams for event processing
+    
+    Owns the process's one pooled Redis client (``client``), shared by the
+    API, middleware and services; it is created on first use and closed by
+    ``close``.
+    """
     
     def __init__(self, config: RedisConfig):
         self.config = config
         self.redis: Optional[aioredis.Redis] = None
+        self.codec = Codec(config.codec_write_format, config.codec_compress_threshold)
+    
+    @property
+    def client(self) -> aioredis.Redis:
+        """The shared client (connections are opened lazily by the pool)"""
+        if self.redis is None:
+            client = aioredis.from_url(
+                self.config.url,
+                max_connections=self.config.max_connections,
+                decode_responses=self.config.decode_responses,
+                encoding=self.config.encoding,
+                encoding_errors=self.config.encoding_errors
+            )
+            if self.config.autobatch_enabled:
+                client = AutoBatchingRedis(client, window=self.config.autobatch_window_ms / 1000)
+            self.redis = client
+        return self.redis
     
     async def connect(self):
         """Establish Redis connection"""
-        self.redis = await aioredis.from_url(
-            self.config.url,
-            max_connections=self.config.max_connections,
-            decode_responses=self.config.decode_responses,
-            encoding=self.config.encoding
-        )
+        await self.client.initialize()
         
         # Create consumer groups if they don't exist
         await self._create_consumer_groups()
@@ -45,7 +84,7 @@ class RedisStreamManager:
     async def _create_consumer_groups(self):
         """Create consumer groups for streams"""
         streams = [
-            self.config.event_stream_key,
+            *self.event_streams,
             self.config.analyzed_stream_key,
             self.config.alert_stream_key
         ]
@@ -62,12 +101,42 @@ class RedisStreamManager:
                 # Group already exists
                 pass
     
+    @property
+    def event_streams(self) -> List[str]:
+        """All events:raw partitions of every urgency lane"""
+        return [
+            stream
+            for lane in LANES
+            for stream in partition_streams(lane_stream(self.config.event_stream_key, lane), self.config.event_partitions)
+        ]
+    
+    def event_stream_for(self, partition_key: str, urgency: str = "normal") -> str:
+        """events:raw partition for an asset (or source) in an urgency lane"""
+        return stream_for(
+            lane_stream(self.config.event_stream_key, urgency),
+            partition_key,
+            self.config.event_partitions
+        )
+    
+    def max_len_for(self, stream_key: str) -> Optional[int]:
+        if lane_of(self.config.event_stream_key, stream_key) == "critical":
+            return self.config.critical_stream_max_len or None
+        return self.config.stream_max_len
+    
+    def encode_fields(self, data: dict) -> dict:
+        """Stream values must be flat: anything but str/bytes/numbers goes
+        through the payload codec"""
+        return {
+            key: value if isinstance(value, (str, bytes, int, float)) else self.codec.encode(value)
+            for key, value in data.items()
+        }
+    
     async def publish_event(self, stream_key: str, data: dict) -> str:
         """Publish event to stream"""
         event_id = await self.redis.xadd(
             stream_key,
-            data,
-            maxlen=self.config.stream_max_len,
+            self.encode_fields(data),
+            maxlen=self.max_len_for(stream_key),
             approximate=True
         )
         return event_id
@@ -88,25 +157,39 @@ class RedisStreamManager:
             block=block
         )
         
-        if result:
-            stream, messages = result[0]
-            return messages
-        return []
-    
-    async def ack_message(self, stream_key: str, message_id: str):
-        """Acknowledge message processing"""
-        await self.redis.xack(
-            stream_key,
-            self.config.consumer_group,
-            message_id
+        messages = []
+        for _, entries in result or []:
+            messages.extend(entries)
+        return messages
+    
+    async def ack_message(self, stream_key: str, *message_ids: str):
+        """Acknowledge message processing (any number of IDs, one round trip)"""
+        if message_ids:
+            await self.redis.xack(
+                stream_key,
+                self.config.consumer_group,
+                *message_ids
+            )
+    
+    def consumer(self, streams: Sequence[str], handler, group: Optional[str] = None, **options) -> StreamConsumer:
+        """Batched, reclaiming consumer on this connection pool; ``options``
+        go to StreamConsumer"""
+        return StreamConsumer(
+            self.redis,
+            streams,
+            group or self.config.consumer_group,
+            handler,
+            **options
         )
     
     async def close(self):
         """Close Redis connection"""
         if self.redis:
             await self.redis.close()
+            self.redis = None
 
 
 # Global instance
 redis_config = RedisConfig()
-stream_manager = RedisStreamManager(redis_config)
\ No newline at end of file
+stream_manager = RedisStreamManager(redis_config)
+payload_codec = stream_manager.codec
\ No newline at end of file
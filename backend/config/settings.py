@@ -35,8 +35,93 @@ class Settings(BaseSettings):
     pinecone_api_key: Optional[str] = os.getenv("PINECONE_API_KEY")
     pinecone_env: str = os.getenv("PINECONE_ENV", "us-east-1")
     
-    # Rate Limiting
-    rate_limit_enabled: bool = True
+    # Embeddings ("sentence-transformers" or "hashing")
+    encoder_backend: str = os.getenv("ENCODER_BACKEND", "sentence-transformers")
+    encoder_model: str = os.getenv("ENCODER_MODEL", "sentence-transformers/all-mpnet-base-v2")
+    encoder_projection_path: Optional[str] = os.getenv("ENCODER_PROJECTION_PATH")
+    encoder_hashing_dimension: int = int(os.getenv("ENCODER_HASHING_DIMENSION", "768"))
+    # Fall back to hashing (in a separate namespace) instead of refusing to start
+    encoder_allow_fallback: bool = os.getenv("ENCODER_ALLOW_FALLBACK", "false").lower() == "true"
+    
+    # Ingest dedup
+    dedup_window_seconds: float = float(os.getenv("DEDUP_WINDOW_SECONDS", "900"))
+    dedup_max_distance: int = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+    
+    # Story clustering (analysis debouncing)
+    story_similarity_threshold: float = float(os.getenv("STORY_SIMILARITY_THRESHOLD", "0.8"))
+    story_half_life_seconds: float = float(os.getenv("STORY_HALF_LIFE_SECONDS", "1800"))
+    story_min_reanalysis_seconds: float = float(os.getenv("STORY_MIN_REANALYSIS_SECONDS", "120"))
+    story_failure_retry_seconds: float = float(os.getenv("STORY_FAILURE_RETRY_SECONDS", "30"))
+    
+    # Admission control for analyses run in the API (adaptive concurrency limit)
+    admission_enabled: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    admission_initial_limit: int = int(os.getenv("ADMISSION_INITIAL_LIMIT", "16"))
+    admission_min_limit: int = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+    admission_max_limit: int = int(os.getenv("ADMISSION_MAX_LIMIT", "128"))
+    admission_max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    admission_max_wait_seconds: float = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "5"))
+    
+    # Batch analysis
+    batch_analyze_concurrency: int = int(os.getenv("BATCH_ANALYZE_CONCURRENCY", "16"))
+    batch_analyze_max_events: int = int(os.getenv("BATCH_ANALYZE_MAX_EVENTS", "1000"))
+    
+    # Off-critical-path persistence (vector store upserts, stream publishing)
+    persistence_queue_workers: int = int(os.getenv("PERSISTENCE_QUEUE_WORKERS", "4"))
+    persistence_queue_max_depth: int = int(os.getenv("PERSISTENCE_QUEUE_MAX_DEPTH", "1000"))
+    
+    # Analysis workers
+    analysis_worker_concurrency: int = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", "8"))
+    analysis_worker_claim_idle_seconds: float = float(os.getenv("ANALYSIS_WORKER_CLAIM_IDLE_SECONDS", "300"))
+    analysis_worker_max_deliveries: int = int(os.getenv("ANALYSIS_WORKER_MAX_DELIVERIES", "3"))
+    # Urgency lanes: read weights, and "<lane>:<degrade after s>:<sample after s>"
+    # lag thresholds past which events are scored locally, then sampled
+    event_lane_weights: str = os.getenv("EVENT_LANE_WEIGHTS", "critical:8,high:4,normal:2,low:1")
+    load_shed_enabled: bool = os.getenv("LOAD_SHED_ENABLED", "true").lower() == "true"
+    load_shed_thresholds: str = os.getenv("LOAD_SHED_THRESHOLDS", "low:30:120,normal:120:600")
+    load_shed_sample_rate: float = float(os.getenv("LOAD_SHED_SAMPLE_RATE", "0.1"))
+    
+    # Market data ("coingecko", "replay" or "none")
+    market_feed: str = os.getenv("MARKET_FEED", "coingecko")
+    market_assets: str = os.getenv("MARKET_ASSETS", "BTC:bitcoin,ETH:ethereum,SOL:solana")
+    market_poll_seconds: float = float(os.getenv("MARKET_POLL_SECONDS", "30"))
+    market_replay_path: Optional[str] = os.getenv("MARKET_REPLAY_PATH")
+    market_replay_speed: float = float(os.getenv("MARKET_REPLAY_SPEED", "1.0"))
+    market_window_ticks: int = int(os.getenv("MARKET_WINDOW_TICKS", "2880"))  # 24h at 30s polling
+    market_stale_seconds: float = float(os.getenv("MARKET_STALE_SECONDS", "300"))
+    
+    # Event store (batched Postgres writes from the analysis path)
+    event_store_batch_size: int = int(os.getenv("EVENT_STORE_BATCH_SIZE", "500"))
+    event_store_flush_seconds: float = float(os.getenv("EVENT_STORE_FLUSH_SECONDS", "0.5"))
+    
+    # Alert feed (Redis index of analyzed alerts and per-user read state)
+    alert_feed_retention_days: int = int(os.getenv("ALERT_FEED_RETENTION_DAYS", "30"))
+    alert_feed_max_per_severity: int = int(os.getenv("ALERT_FEED_MAX_PER_SEVERITY", "100000"))
+    
+    # Alert dispatch (digests to external channels; local sinks when unset)
+    alert_webhook_url: Optional[str] = os.getenv("ALERT_WEBHOOK_URL")
+    alert_sink_path: Optional[str] = os.getenv("ALERT_SINK_PATH")
+    alert_dedup_seconds: float = float(os.getenv("ALERT_DEDUP_SECONDS", "600"))
+    
+    # Push gateway (WebSocket/SSE fan-out of events:analyzed)
+    push_max_pending: int = int(os.getenv("PUSH_MAX_PENDING", "256"))
+    push_drop_policy: str = os.getenv("PUSH_DROP_POLICY", "drop_oldest")  # or "disconnect"
+    push_resume_limit: int = int(os.getenv("PUSH_RESUME_LIMIT", "1000"))
+    
+    # Anomaly detection (gates deep LLM analysis)
+    anomaly_z_threshold: float = float(os.getenv("ANOMALY_Z_THRESHOLD", "3.0"))
+    anomaly_cusum_threshold: float = float(os.getenv("ANOMALY_CUSUM_THRESHOLD", "5.0"))
+    anomaly_escalation_score: float = float(os.getenv("ANOMALY_ESCALATION_SCORE", "1.0"))
+    
+    # Password hashing (bcrypt on a bounded thread pool)
+    password_bcrypt_rounds: int = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    password_hash_max_pending: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    
+    # Rate Limiting ("<requests>/<seconds>" per client and tier)
+    rate_limit_enabled: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    rate_limit_api: str = os.getenv("RATE_LIMIT_API", "100/60")
+    rate_limit_llm: str = os.getenv("RATE_LIMIT_LLM", "10/60")
+    rate_limit_trading: str = os.getenv("RATE_LIMIT_TRADING", "5/60")
     
     class Config:
         env_file = ".env"
@@ -1,55 +1,181 @@
 """Main FastAPI application for Black Swan Event Detection System"""
 
+import asyncio
+import hashlib
+import json
+import time
 from contextlib import asynccontextmanager
-from typing import Dict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
 from prometheus_client import make_asgi_app
 import structlog
-from redis import asyncio as aioredis
 
-from services.llm_orchestrator import LLMOrchestrator, EventVectorStore
+from services.llm_orchestrator import LLMOrchestrator, EventVectorStore, StoryClusterer
+from services.llm_orchestrator.migration import VersionRegistry, sync_versions
+from services.llm_orchestrator.pipeline import AnalysisPipeline
+from services.alert_service import AlertFeed
+from services.analysis_worker import URGENCY_FIELD, JobStore, event_message
+from services.market_data import MarketDataService, build_feed
+from services.event_store import EventStore, EventWriter
+from services.push_gateway import PushHub
+from services.risk_engine import AnomalyDetector
 from shared.models.event import EventModel
 from shared.models.analysis import AnalysisResult
+from shared.middleware.admission import AdmissionController, AdmissionRejected, GradientLimit
+from shared.middleware.auth import AuthMiddleware, TokenRevocations
+from shared.middleware.rate_limit import RateLimitMiddleware, parse_limit
+from shared.streams import PARTITION_KEY_FIELD
+from shared.utils.background import BackgroundTaskQueue
 from shared.utils.logger import setup_logger
 from api.v1 import api_router
+from config.database import database
+from config.redis import stream_manager
 from config.settings import settings
 
 # Setup structured logging
 logger = setup_logger()
 
+# Token verification for the rate limiter and async analysis jobs
+auth = AuthMiddleware(secret_key=settings.jwt_secret_key)
+
 # Global instances
 redis_client = None
 llm_orchestrator = None
 vector_store = None
+story_clusterer = None
+analysis_pipeline = None
+job_store = None
+persistence_queue = None
+market_data = None
+event_writer = None
+admission = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle"""
-    global redis_client, llm_orchestrator, vector_store
+    global redis_client, llm_orchestrator, vector_store, story_clusterer, analysis_pipeline, job_store
+    global persistence_queue, market_data, event_writer, admission
     
     # Startup
     logger.info("Starting Black Swan Detection System")
     
-    # Initialize Redis (Railway provides REDIS_URL automatically)
-    redis_client = await aioredis.from_url(
-        settings.redis_url,
-        encoding="utf-8",
-        decode_responses=True
-    )
+    # One pooled, auto-batching Redis client for the whole process (Railway
+    # provides REDIS_URL automatically); also backs event ingest and jobs
+    await stream_manager.connect()
+    redis_client = stream_manager.client
+    job_store = JobStore(redis_client)
     
     # Initialize services
     llm_orchestrator = LLMOrchestrator()
     vector_store = EventVectorStore()
+    story_clusterer = StoryClusterer(
+        similarity_threshold=settings.story_similarity_threshold,
+        half_life_seconds=settings.story_half_life_seconds,
+        min_reanalysis_interval=settings.story_min_reanalysis_seconds,
+        failure_retry_interval=settings.story_failure_retry_seconds
+    )
+    persistence_queue = BackgroundTaskQueue(
+        "persistence",
+        workers=settings.persistence_queue_workers,
+        max_depth=settings.persistence_queue_max_depth
+    )
+    await persistence_queue.start()
+    market_data = MarketDataService(
+        build_feed(
+            settings.market_feed,
+            assets=settings.market_assets,
+            interval=settings.market_poll_seconds,
+            replay_path=settings.market_replay_path,
+            replay_speed=settings.market_replay_speed
+        ),
+        window=settings.market_window_ticks,
+        redis=redis_client
+    )
+    await market_data.start()
+    
+    # Postgres event store, fed in batches from the analysis path. Analysis
+    # keeps running without it; the schema comes from `alembic upgrade head`
+    await database.connect()
+    event_store = EventStore(database)
+    if await event_store.available():
+        event_writer = EventWriter(
+            event_store,
+            batch_size=settings.event_store_batch_size,
+            flush_interval=settings.event_store_flush_seconds
+        )
+        await event_writer.start()
+    else:
+        logger.warning("Event store unavailable, events will not be persisted to Postgres")
+    
+    # Bounds concurrent analyses by what the LLM and vector store sustain
+    admission = AdmissionController(
+        "analyze",
+        limit=GradientLimit(
+            initial=settings.admission_initial_limit,
+            min_limit=settings.admission_min_limit,
+            max_limit=settings.admission_max_limit
+        ),
+        max_queue=settings.admission_max_queue,
+        max_wait=settings.admission_max_wait_seconds
+    ) if settings.admission_enabled else None
+    
+    analysis_pipeline = AnalysisPipeline(
+        orchestrator=llm_orchestrator,
+        vector_store=vector_store,
+        story_clusterer=story_clusterer,
+        redis=redis_client,
+        background=persistence_queue,
+        market_data=market_data,
+        anomaly_detector=AnomalyDetector(
+            z_threshold=settings.anomaly_z_threshold,
+            cusum_threshold=settings.anomaly_cusum_threshold,
+            escalation_score=settings.anomaly_escalation_score
+        ),
+        event_writer=event_writer,
+        alert_feed=AlertFeed(
+            redis_client,
+            retention_seconds=settings.alert_feed_retention_days * 86400,
+            max_per_severity=settings.alert_feed_max_per_severity
+        ),
+        latency_observer=admission.observe if admission is not None else None
+    )
+    
+    # One events:analyzed reader per process fans out to push connections
+    push_hub = PushHub(
+        redis_client,
+        stream_key=stream_manager.config.analyzed_stream_key,
+        resume_limit=settings.push_resume_limit
+    )
+    await push_hub.start()
+    app.state.push_hub = push_hub
+    
+    # Follow index migrations (dual-write and promotion) started by any node
+    version_sync = asyncio.create_task(
+        sync_versions(vector_store, VersionRegistry(redis_client))
+    )
+    
+    # Keep this process's verified-token cache in step with revocations
+    revocation_sync = asyncio.create_task(TokenRevocations(redis_client).run())
     
     logger.info("All services initialized successfully")
     
     yield
     
     # Shutdown
-    await redis_client.close()
+    version_sync.cancel()
+    revocation_sync.cancel()
+    await push_hub.stop()
+    await market_data.stop()
+    await persistence_queue.stop()
+    if event_writer is not None:
+        await event_writer.stop()
+    await database.close()
+    await stream_manager.close()
     logger.info("Shutting down Black Swan Detection System")
 
 
@@ -58,7 +184,21 @@ app = FastAPI(
     title="Black Swan Event Detection API",
     description="Real-time crypto market black swan event detection and analysis",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# Rate limiting (added first so CORS headers wrap its 429s)
+app.add_middleware(
+    RateLimitMiddleware,
+    redis=stream_manager.client,
+    auth=auth,
+    enabled=settings.rate_limit_enabled,
+    limits={
+        "api": parse_limit(settings.rate_limit_api),
+        "llm": parse_limit(settings.rate_limit_llm),
+        "trading": parse_limit(settings.rate_limit_trading),
+    }
 )
 
 # CORS middleware
@@ -91,55 +231,171 @@ async def health_check() -> Dict[str, str]:
 
 
 @app.post("/api/v1/analyze", response_model=AnalysisResult)
-async def analyze_event(event: EventModel) -> AnalysisResult:
-    """Analyze a potential black swan event"""
+async def analyze_event(
+    event: EventModel,
+    async_mode: bool = Query(False, alias="async"),
+    user_data: Optional[dict] = Depends(auth.optional_token)
+) -> AnalysisResult:
+    """Analyze a potential black swan event
+    
+    With ``?async=true`` (authenticated) the event is queued on events:raw
+    for the analysis workers and a job ID is returned immediately (202);
+    only the submitter can read the job.
+    """
+    if async_mode and user_data is None:
+        raise HTTPException(status_code=401, detail="Authentication required for async analysis")
     try:
-        logger.info("Analyzing event", event_id=str(event.id), source=event.source)
-        
-        # Find similar historical events
-        similar_events = await vector_store.find_similar_events(event)
-        
-        # Get current market data (mock for now)
-        market_data = {
-            "btc_price": 45000,
-            "total_market_cap": 1.7e12,
-            "fear_greed_index": 35
-        }
-        
-        # Run LLM analysis
-        analysis = await llm_orchestrator.analyze_event(
-            event_data=event.model_dump(),
-            market_data=market_data,
-            similar_events=similar_events
-        )
+        if async_mode:
+            job_id = await job_store.create(event, owner=user_data["sub"])
+            message = event_message(event, job_id=job_id)
+            await stream_manager.publish_event(
+                stream_manager.event_stream_for(message[PARTITION_KEY_FIELD], message[URGENCY_FIELD]),
+                message
+            )
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "job_id": job_id,
+                    "event_id": str(event.id),
+                    "status": "queued",
+                    "status_url": f"/api/v1/jobs/{job_id}"
+                }
+            )
         
-        # Store event and analysis for future reference
-        await vector_store.store_event(event, analysis.model_dump())
-        
-        # Publish to Redis stream for real-time subscribers
-        await redis_client.xadd(
-            "events:analyzed",
-            {
-                "event_id": str(event.id),
-                "severity": analysis.severity,
-                "confidence": str(analysis.confidence_score)
-            }
-        )
-        
-        logger.info(
-            "Event analysis complete",
-            event_id=str(event.id),
-            severity=analysis.severity,
-            confidence=analysis.confidence_score
-        )
-        
-        return analysis
+        # Cache hits are sent as the stored bytes, skipping model validation
+        # and response_model serialization
+        cached = await analysis_pipeline.cached_result(event)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
         
+        return await _run_admitted(event)
+    except AdmissionRejected as e:
+        logger.error("Analysis shed by admission control", reason=e.reason, event_id=str(event.id))
+        raise HTTPException(status_code=e.status_code, detail="Analysis capacity exceeded, try again", headers=e.headers)
     except Exception as e:
         logger.error("Analysis failed", error=str(e), event_id=str(event.id))
         raise HTTPException(status_code=500, detail="Analysis failed")
 
 
+async def _run_admitted(event: EventModel) -> AnalysisResult:
+    """Run the pipeline inside an admission slot (when admission control is on)"""
+    if admission is None:
+        return await analysis_pipeline.run(event)
+    async with admission.slot():
+        return await analysis_pipeline.run(event)
+
+
+async def _iter_batch_events(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (index, EventModel or error) from a JSON array or NDJSON body.
+    
+    NDJSON bodies are parsed line by line as they arrive, so analysis of the
+    first events starts before the upload finishes.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        index, buffer = 0, b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_batch_item(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_batch_item(buffer)
+        return
+    
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    for index, item in enumerate(items):
+        yield index, _parse_batch_item(item)
+
+
+def _parse_batch_item(item: Any) -> Any:
+    try:
+        if isinstance(item, (bytes, str)):
+            return EventModel.model_validate_json(item)
+        return EventModel.model_validate(item)
+    except ValidationError as e:
+        return e
+
+
+def _batch_fingerprint(event: EventModel) -> str:
+    return hashlib.sha1(
+        json.dumps([event.source, event.content], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+@app.post("/api/v1/analyze/batch")
+async def analyze_batch(request: Request) -> StreamingResponse:
+    """Analyze many events; results stream back as NDJSON in completion order"""
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(settings.batch_analyze_concurrency)
+    completed: asyncio.Queue = asyncio.Queue()
+    tasks: List[asyncio.Task] = []
+    summary = {"received": 0, "duplicates": 0, "invalid": 0, "succeeded": 0, "failed": 0}
+    seen_ids, seen_content = set(), set()
+    
+    async def analyze_one(index: int, event: EventModel) -> None:
+        async with semaphore:
+            try:
+                analysis = await _run_admitted(event)
+                line = analysis.model_dump_json()
+                summary["succeeded"] += 1
+            except AdmissionRejected:
+                line = json.dumps({"index": index, "event_id": str(event.id), "error": "Analysis capacity exceeded"})
+                summary["failed"] += 1
+            except Exception as e:
+                logger.error("Batch analysis failed", error=str(e), event_id=str(event.id))
+                line = json.dumps({"index": index, "event_id": str(event.id), "error": "Analysis failed"})
+                summary["failed"] += 1
+        await completed.put(line)
+    
+    # Read the whole body before responding: the response stream and the
+    # request stream share the ASGI receive channel. Analyses start as soon as
+    # each event is parsed.
+    async for index, item in _iter_batch_events(request):
+        summary["received"] += 1
+        if summary["received"] > settings.batch_analyze_max_events:
+            for task in tasks:
+                task.cancel()
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch exceeds {settings.batch_analyze_max_events} events"
+            )
+        if isinstance(item, ValidationError):
+            summary["invalid"] += 1
+            await completed.put(json.dumps({"index": index, "error": "Invalid event", "details": item.errors()}, default=str))
+            continue
+        
+        # Within-batch dedup on ID and on (source, content)
+        fingerprint = _batch_fingerprint(item)
+        if item.id in seen_ids or fingerprint in seen_content:
+            summary["duplicates"] += 1
+            continue
+        seen_ids.add(item.id)
+        seen_content.add(fingerprint)
+        tasks.append(asyncio.create_task(analyze_one(index, item)))
+    
+    async def stream_results() -> AsyncIterator[str]:
+        pending = len(tasks) + summary["invalid"]
+        try:
+            for _ in range(pending):
+                yield await completed.get() + "\n"
+        finally:
+            # Client went away: don't keep spending LLM calls on its batch
+            for task in tasks:
+                task.cancel()
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        yield json.dumps({"summary": summary}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 @app.get("/api/v1/events/similar/{event_id}")
 async def get_similar_events(event_id: str, limit: int = 10):
     """Get similar historical events"""
@@ -0,0 +1,47 @@
+"""Create the events table and its keyset listing indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases created by the old create_all at startup already match this
+revision: adopt them with ``alembic stamp 0001`` instead of upgrading.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "events",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("source", sa.String(64), nullable=False),
+        sa.Column("asset", sa.String(16)),
+        sa.Column("content", postgresql.JSONB, nullable=False),
+        sa.Column("metadata", postgresql.JSONB, nullable=False, server_default="{}"),
+        sa.Column("sentiment_score", sa.Float),
+        sa.Column("entities", postgresql.JSONB, nullable=False, server_default="[]"),
+        sa.Column("topics", postgresql.JSONB, nullable=False, server_default="[]"),
+        sa.Column("processed_at", sa.DateTime(timezone=True)),
+        sa.Column("severity", sa.String(16)),
+        sa.Column("confidence", sa.Float),
+        sa.Column("risk_factors", postgresql.JSONB, nullable=False, server_default="[]"),
+        sa.Column("recommended_actions", postgresql.JSONB, nullable=False, server_default="[]"),
+        sa.Column("analysis", postgresql.JSONB)
+    )
+    op.create_index("ix_events_timestamp_id", "events", ["timestamp", "id"])
+    op.create_index("ix_events_source_timestamp", "events", ["source", "timestamp", "id"])
+    op.create_index("ix_events_severity_timestamp", "events", ["severity", "timestamp", "id"])
+    op.create_index("ix_events_asset_timestamp", "events", ["asset", "timestamp", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("events")
@@ -0,0 +1,24 @@
+"""Alert Service: Redis-indexed alert feed, per-user read state, alert rule matching and dispatch"""
+
+from .channels import AlertChannel, Digest, FileChannel, LogChannel, WebhookChannel, build_channels
+from .dispatcher import AlertDispatcher
+from .feed import AlertFeed, decode_feed_cursor, encode_feed_cursor
+from .matcher import AlertMatcher
+from .subscriptions import Subscription, SubscriptionIndex, SubscriptionStore
+
+__all__ = [
+    'AlertChannel',
+    'AlertDispatcher',
+    'AlertFeed',
+    'AlertMatcher',
+    'Digest',
+    'FileChannel',
+    'LogChannel',
+    'Subscription',
+    'SubscriptionIndex',
+    'SubscriptionStore',
+    'WebhookChannel',
+    'build_channels',
+    'decode_feed_cursor',
+    'encode_feed_cursor'
+]
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Run alert matching and dispatch: python -m services.alert_service"""
+
+import asyncio
+import signal
+
+from config.redis import stream_manager
+from config.settings import settings
+from shared.utils.logger import setup_logger
+from .channels import build_channels
+from .dispatcher import AlertDispatcher
+from .matcher import AlertMatcher
+from .subscriptions import SubscriptionStore
+
+
+async def main():
+    setup_logger()
+    await stream_manager.connect()
+    matcher = AlertMatcher(
+        stream_manager.redis,
+        SubscriptionStore(stream_manager.redis),
+        analyzed_stream_key=stream_manager.config.analyzed_stream_key,
+        dispatch_stream_key=stream_manager.config.alert_stream_key
+    )
+    dispatcher = AlertDispatcher(
+        stream_manager.redis,
+        build_channels(webhook_url=settings.alert_webhook_url, sink_path=settings.alert_sink_path),
+        stream_key=stream_manager.config.alert_stream_key,
+        dedup_seconds=settings.alert_dedup_seconds
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        # One handler per signal: a second add_signal_handler would replace the first
+        loop.add_signal_handler(sig, lambda: (matcher.stop(), dispatcher.stop()))
+
+    try:
+        await asyncio.gather(matcher.run(), dispatcher.run())
+    finally:
+        await stream_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,131 @@
+# services/alert_service/channels.py
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import orjson
+
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+@dataclass
+class Digest:
+    """Alerts for one user on one channel, delivered together"""
+    user_id: str
+    channel: str
+    # Story (or event) key -> latest alert fields for it
+    alerts: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    # Repeats folded into each story's entry
+    repeats: Dict[str, int] = field(default_factory=dict)
+    message_ids: List[str] = field(default_factory=list)
+    opened_at: float = field(default_factory=time.monotonic)
+    deadline: float = float("inf")
+    attempts: int = 0
+
+    @property
+    def severity(self) -> str:
+        return max((alert["severity"] for alert in self.alerts.values()), key=lambda s: SEVERITY_RANK.get(s, -1))
+
+    def to_json(self) -> bytes:
+        return orjson.dumps({
+            "user_id": self.user_id,
+            "channel": self.channel,
+            "severity": self.severity,
+            "alerts": [
+                {**alert, "repeats": self.repeats.get(key, 0)}
+                for key, alert in self.alerts.items()
+            ]
+        })
+
+
+class AlertChannel(ABC):
+    """Delivery channel for alert digests.
+
+    ``concurrency`` bounds in-flight sends; the dispatcher holds a slot
+    while calling ``send``. ``send`` raises on failure so the digest is
+    retried.
+    """
+
+    concurrency: int = 10
+
+    @abstractmethod
+    async def send(self, digest: Digest) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class WebhookChannel(AlertChannel):
+    """POSTs each digest as JSON to a webhook over a pooled HTTP client"""
+
+    def __init__(self, url: str, concurrency: int = 20, timeout: float = 10.0):
+        self.url = url
+        self.concurrency = concurrency
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        )
+
+    async def send(self, digest: Digest) -> None:
+        response = await self.client.post(
+            self.url,
+            content=digest.to_json(),
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class LogChannel(AlertChannel):
+    """Local stand-in: logs digests instead of delivering them"""
+
+    async def send(self, digest: Digest) -> None:
+        logger.info(
+            "Alert digest",
+            user_id=digest.user_id,
+            channel=digest.channel,
+            severity=digest.severity,
+            alerts=len(digest.alerts)
+        )
+
+
+class FileChannel(AlertChannel):
+    """Local stand-in: appends digests to a JSONL file"""
+
+    concurrency = 1
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    async def send(self, digest: Digest) -> None:
+        line = digest.to_json() + b"\n"
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: bytes) -> None:
+        with self.path.open("ab") as f:
+            f.write(line)
+
+
+def build_channels(webhook_url: Optional[str] = None, sink_path: Optional[str] = None) -> Dict[str, AlertChannel]:
+    """Channel name -> channel. Without a webhook URL, external channels go
+    to a local JSONL sink (or the log)."""
+    local: AlertChannel = FileChannel(sink_path) if sink_path else LogChannel()
+    external: AlertChannel = WebhookChannel(webhook_url) if webhook_url else local
+    return {
+        "in_app": LogChannel(),
+        "webhook": external,
+        "email": external,
+        "telegram": external
+    }
\ No newline at end of file
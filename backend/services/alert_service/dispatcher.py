@@ -0,0 +1,289 @@
+# services/alert_service/dispatcher.py
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import socket
+import time
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from redis import asyncio as aioredis
+
+from shared.monitoring.prometheus import alerts_sent
+from shared.utils.logger import get_logger
+from .channels import SEVERITY_RANK, AlertChannel, Digest
+
+logger = get_logger()
+
+# Metrics
+delivery_latency = Histogram(
+    'alert_delivery_seconds', 'Analysis completion to channel delivery', ['severity'],
+    buckets=(0.25, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+)
+digests_sent = Counter('alert_digests_total', 'Alert digests by outcome', ['channel', 'status'])
+alerts_deduplicated = Counter('alerts_deduplicated_total', 'Alerts folded into an earlier alert for the same story')
+digests_pending = Gauge('alert_digests_pending', 'Digests open or waiting for retry')
+
+# How long a digest stays open, by the most severe alert in it
+DIGEST_WINDOWS = {"critical": 0.5, "high": 2.0, "medium": 10.0, "low": 30.0}
+
+
+def analyzed_at(fields: Mapping) -> Optional[float]:
+    """Wall-clock analysis time, from the events:analyzed message ID"""
+    message_id = fields.get("analyzed_id")
+    if not message_id:
+        return None
+    return int(message_id.split("-")[0]) / 1000
+
+
+class AlertDispatcher:
+    """Delivers alerts:dispatch entries as per-user, per-channel digests.
+
+    Entries are read in batches and folded into an open digest for their
+    (user, channel); repeats about the same story inside the digest, or
+    within ``dedup_seconds`` of a delivery without a severity increase, are
+    dropped. A digest is sent when the window of its most severe alert
+    runs out. Failed sends go to a retry heap with jittered exponential
+    backoff; after ``max_attempts`` the digest is moved to a dead-letter
+    stream. Entries are acknowledged once their digest is settled.
+
+    Open digests and the retry heap live in memory, but their entries stay
+    pending until settled. At startup and every ``claim_interval`` the
+    dispatcher XAUTOCLAIMs entries idle for ``claim_idle_ms``: those a
+    stopped or crashed dispatcher held are folded into digests again, and
+    claiming its own held entries keeps them from looking abandoned to
+    other dispatchers.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        channels: Dict[str, AlertChannel],
+        stream_key: str = "alerts:dispatch",
+        group: str = "alert-dispatchers",
+        consumer_name: Optional[str] = None,
+        batch_size: int = 500,
+        windows: Optional[Dict[str, float]] = None,
+        dedup_seconds: float = 600.0,
+        max_attempts: int = 5,
+        retry_base: float = 1.0,
+        claim_idle_ms: int = 60_000,
+        claim_interval: float = 20.0
+    ):
+        self.redis = redis
+        self.channels = channels
+        self.stream_key = stream_key
+        self.dead_letter_key = f"{stream_key}:dead"
+        self.group = group
+        self.consumer_name = consumer_name or f"dispatcher-{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.windows = windows or DIGEST_WINDOWS
+        self.dedup_seconds = dedup_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self._open: Dict[Tuple[str, str], Digest] = {}
+        self._retries: List[Tuple[float, int, Digest]] = []
+        self._retry_order = itertools.count()
+        # (user, channel, story) -> (severity rank, delivered at)
+        self._delivered: Dict[Tuple[str, str, str], Tuple[int, float]] = {}
+        # Entry ID -> digests still holding it (an entry can fan out to
+        # several channels and is acked when the last one settles)
+        self._holders: Dict[str, int] = {}
+        self._slots = {name: asyncio.Semaphore(channel.concurrency) for name, channel in channels.items()}
+        self._sending: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def add(self, message_id: str, fields: Mapping) -> List[str]:
+        """Fold one dispatch entry into the open digests; returns entry IDs
+        that need no delivery (already covered) so they can be acked"""
+        severity = fields.get("severity", "low")
+        rank = SEVERITY_RANK.get(severity, 0)
+        story = fields.get("story_id") or fields.get("event_id", message_id)
+        now = time.monotonic()
+        covered = True
+
+        for channel in filter(None, fields.get("channels", "").split(",")):
+            if channel not in self.channels:
+                logger.warning("Unknown alert channel", channel=channel, user_id=fields.get("user_id"))
+                continue
+            delivered = self._delivered.get((fields["user_id"], channel, story))
+            if delivered is not None and now - delivered[1] < self.dedup_seconds and rank <= delivered[0]:
+                alerts_deduplicated.inc()
+                continue
+
+            key = (fields["user_id"], channel)
+            digest = self._open.get(key)
+            if digest is None:
+                digest = self._open[key] = Digest(user_id=key[0], channel=channel, opened_at=now)
+            previous = digest.alerts.get(story)
+            if previous is not None:
+                alerts_deduplicated.inc()
+                digest.repeats[story] = digest.repeats.get(story, 0) + 1
+                if SEVERITY_RANK.get(previous["severity"], 0) > rank:
+                    digest.message_ids.append(message_id)
+                    self._holders[message_id] = self._holders.get(message_id, 0) + 1
+                    covered = False
+                    continue
+            digest.alerts[story] = dict(fields)
+            digest.message_ids.append(message_id)
+            self._holders[message_id] = self._holders.get(message_id, 0) + 1
+            digest.deadline = min(digest.deadline, digest.opened_at + self.windows.get(severity, 10.0))
+            covered = False
+        return [message_id] if covered else []
+
+    def due(self, now: Optional[float] = None, flush_all: bool = False) -> List[Digest]:
+        """Open digests whose window has run out, and retries that are due"""
+        now = time.monotonic() if now is None else now
+        ready = [key for key, digest in self._open.items() if flush_all or digest.deadline <= now]
+        digests = [self._open.pop(key) for key in ready]
+        while self._retries and (flush_all or self._retries[0][0] <= now):
+            digests.append(heapq.heappop(self._retries)[2])
+        digests_pending.set(len(self._open) + len(self._retries))
+        return digests
+
+    def next_deadline(self) -> float:
+        deadlines = [digest.deadline for digest in self._open.values()]
+        if self._retries:
+            deadlines.append(self._retries[0][0])
+        return min(deadlines, default=float("inf"))
+
+    async def _send(self, digest: Digest) -> None:
+        channel = self.channels[digest.channel]
+        digest.attempts += 1
+        try:
+            async with self._slots[digest.channel]:
+                await channel.send(digest)
+        except Exception as e:
+            if digest.attempts < self.max_attempts:
+                delay = self.retry_base * 2 ** (digest.attempts - 1) * random.uniform(0.8, 1.2)
+                heapq.heappush(self._retries, (time.monotonic() + delay, next(self._retry_order), digest))
+                digests_sent.labels(channel=digest.channel, status="retry").inc()
+                logger.warning("Alert digest failed, retrying", channel=digest.channel, attempt=digest.attempts, error=str(e))
+                return
+            logger.error("Alert digest undeliverable", channel=digest.channel, user_id=digest.user_id, error=str(e))
+            digests_sent.labels(channel=digest.channel, status="failed").inc()
+            await self.redis.xadd(self.dead_letter_key, {"digest": digest.to_json()}, maxlen=10000, approximate=True)
+        else:
+            self._record_delivery(digest)
+        await self._settle(digest.message_ids)
+
+    async def _settle(self, message_ids: List[str]) -> None:
+        done = []
+        for message_id in message_ids:
+            remaining = self._holders.pop(message_id, 1) - 1
+            if remaining > 0:
+                self._holders[message_id] = remaining
+            else:
+                done.append(message_id)
+        if done:
+            await self.redis.xack(self.stream_key, self.group, *done)
+
+    async def reclaim(self) -> int:
+        """Take over idle pending entries and fold in the ones no digest here
+        holds; returns the number folded in"""
+        claimed, start = 0, "0-0"
+        while True:
+            response = await self.redis.xautoclaim(
+                self.stream_key,
+                self.group,
+                self.consumer_name,
+                min_idle_time=self.claim_idle_ms,
+                start_id=start,
+                count=self.batch_size
+            )
+            start, settled = response[0], []
+            for message_id, fields in response[1]:
+                if message_id is None or message_id in self._holders:
+                    continue  # trimmed (Redis 6.2), or already in a digest here
+                if fields is None:
+                    settled.append(message_id)
+                    continue
+                claimed += 1
+                settled.extend(self.add(message_id, fields))
+            if settled:
+                await self.redis.xack(self.stream_key, self.group, *settled)
+            if start in ("0-0", b"0-0"):
+                break
+        if claimed:
+            logger.info("Reclaimed pending alert entries", consumer=self.consumer_name, count=claimed)
+        return claimed
+
+    def _record_delivery(self, digest: Digest) -> None:
+        digests_sent.labels(channel=digest.channel, status="sent").inc()
+        now, wall = time.monotonic(), time.time()
+        for story, alert in digest.alerts.items():
+            severity = alert.get("severity", "low")
+            alerts_sent.labels(severity=severity, channel=digest.channel).inc()
+            started = analyzed_at(alert)
+            if started is not None:
+                delivery_latency.labels(severity=severity).observe(max(0.0, wall - started))
+            self._delivered[(digest.user_id, digest.channel, story)] = (SEVERITY_RANK.get(severity, 0), now)
+
+    def _prune_delivered(self) -> None:
+        cutoff = time.monotonic() - self.dedup_seconds
+        self._delivered = {key: value for key, value in self._delivered.items() if value[1] >= cutoff}
+
+    def _launch(self, digests: List[Digest]) -> None:
+        for digest in digests:
+            task = asyncio.create_task(self._send(digest))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def run(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except aioredis.ResponseError:
+            pass  # group exists
+        logger.info("Alert dispatcher started", consumer=self.consumer_name, channels=sorted(self.channels))
+        pruned_at = time.monotonic()
+        claimed_at = float("-inf")
+
+        while not self._stopping.is_set():
+            if time.monotonic() - claimed_at >= self.claim_interval:
+                claimed_at = time.monotonic()
+                try:
+                    await self.reclaim()
+                except Exception as e:
+                    logger.error("Failed to reclaim pending alert entries", error=str(e))
+
+            wait = self.next_deadline() - time.monotonic()
+            block = int(min(max(wait, 0.01), 1.0) * 1000)
+            try:
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer_name,
+                    {self.stream_key: ">"},
+                    count=self.batch_size,
+                    block=block
+                )
+            except Exception as e:
+                logger.error("Failed to read alert dispatch stream", error=str(e))
+                await asyncio.sleep(1)
+                continue
+
+            settled: List[str] = []
+            for _, messages in response or []:
+                for message_id, fields in messages:
+                    settled.extend(self.add(message_id, fields))
+            if settled:
+                await self.redis.xack(self.stream_key, self.group, *settled)
+            self._launch(self.due())
+
+            if time.monotonic() - pruned_at > self.dedup_seconds:
+                self._prune_delivered()
+                pruned_at = time.monotonic()
+
+        # Deliver what is open (one attempt each) before exiting
+        self._launch(self.due(flush_all=True))
+        if self._sending:
+            await asyncio.wait(self._sending)
+        for channel in set(self.channels.values()):
+            await channel.close()
+        logger.info("Alert dispatcher stopped", consumer=self.consumer_name)
\ No newline at end of file
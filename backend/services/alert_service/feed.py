@@ -0,0 +1,229 @@
+# services/alert_service/feed.py
+import base64
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+from prometheus_client import Counter, Histogram
+from redis import asyncio as aioredis
+
+from services.event_store import ALERT_SEVERITIES, alert_json
+from services.event_store.store import event_row
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+# Metrics
+alerts_indexed = Counter('alert_feed_indexed_total', 'Alerts added to the Redis alert index', ['severity'])
+feed_rounds = Histogram(
+    'alert_feed_query_rounds', 'Pipelined round trips per alert feed query',
+    buckets=(1, 2, 3, 4, 6, 8)
+)
+
+SEVERITIES = ("low", "medium", "high", "critical")
+# Read-state bitmaps are split into fixed-size containers (8 KiB each) so a
+# user's read state only occupies the ranges of alerts they have read, and
+# containers for expired alerts expire with them
+READ_CHUNK_BITS = 1 << 16
+# Scores are timestamp_ms * 1000 + (seq % 1000): unique per alert, still
+# time-ordered, and exact in a double up to the year 2255
+SEQ_SLOTS = 1000
+
+
+def alert_score(timestamp: datetime, seq: int) -> int:
+    return int(timestamp.timestamp() * 1000) * SEQ_SLOTS + seq % SEQ_SLOTS
+
+
+def encode_feed_cursor(score: int) -> str:
+    return base64.urlsafe_b64encode(str(score).encode()).decode().rstrip("=")
+
+
+def decode_feed_cursor(cursor: str) -> int:
+    """Inverse of encode_feed_cursor; ValueError if the cursor is malformed"""
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def read_position(seq: int) -> Tuple[int, int]:
+    """(container, bit offset) of an alert's read flag"""
+    return divmod(seq, READ_CHUNK_BITS)
+
+
+def merge_heads(heads: Iterable[Sequence[Tuple[str, float]]]) -> List[Tuple[int, int]]:
+    """Merge per-severity ZREVRANGEBYSCORE results into one (score, seq) list,
+    newest first"""
+    parsed = [[(int(score), int(member)) for member, score in head] for head in heads]
+    return list(heapq.merge(*parsed, reverse=True))
+
+
+class AlertFeed:
+    """Redis index of analyzed alerts with per-user read state.
+
+    Each severity has a sorted set of alert sequence numbers scored by time,
+    and each alert's payload is stored pre-serialized. Users' read flags are
+    bits at the alert's sequence number. A page of (unread) alerts is one
+    pipelined batch of ZREVRANGEBYSCORE per severity, one pipelined batch of
+    BITFIELD reads, and one MGET, independent of how many alerts exist.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        prefix: str = "alerts:index",
+        retention_seconds: int = 30 * 86400,
+        max_per_severity: int = 100_000,
+        max_rounds: int = 6
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.retention_seconds = retention_seconds
+        self.max_per_severity = max_per_severity
+        self.max_rounds = max_rounds
+
+    def _severity_key(self, severity: str) -> str:
+        return f"{self.prefix}:{severity}"
+
+    def _data_key(self, seq: int) -> str:
+        return f"{self.prefix}:data:{seq}"
+
+    def _id_key(self, event_id: str) -> str:
+        return f"{self.prefix}:id:{event_id}"
+
+    def _read_key(self, user_id: str, container: int) -> str:
+        return f"{self.prefix}:read:{user_id}:{container}"
+
+    async def _sequence(self, event_id: str) -> int:
+        """Stable sequence number for an event (re-analysis keeps its slot)"""
+        key = self._id_key(event_id)
+        existing = await self.redis.get(key)
+        if existing is not None:
+            return int(existing)
+        seq = await self.redis.incr(f"{self.prefix}:seq")
+        if await self.redis.set(key, seq, nx=True, ex=self.retention_seconds):
+            return seq
+        return int(await self.redis.get(key))
+
+    async def add(self, event: EventModel, analysis: AnalysisResult, asset: Optional[str] = None) -> int:
+        """Index an analyzed event; returns its sequence number"""
+        seq = await self._sequence(str(event.id))
+        score = alert_score(event.timestamp, seq)
+        cutoff = (time.time() - self.retention_seconds) * 1000 * SEQ_SLOTS
+        payload = orjson.dumps(alert_json(event_row(event, analysis, asset)))
+
+        pipe = self.redis.pipeline(transaction=True)
+        # A re-analysis may move the alert to another severity
+        for severity in SEVERITIES:
+            if severity != analysis.severity:
+                pipe.zrem(self._severity_key(severity), seq)
+        key = self._severity_key(analysis.severity)
+        pipe.set(self._data_key(seq), payload, ex=self.retention_seconds)
+        pipe.zadd(key, {seq: score})
+        pipe.zremrangebyscore(key, "-inf", cutoff)
+        pipe.zremrangebyrank(key, 0, -self.max_per_severity - 1)
+        await pipe.execute()
+        alerts_indexed.labels(severity=analysis.severity).inc()
+        return seq
+
+    async def mark_read(self, user_id: str, event_id: str) -> bool:
+        """Set the user's read flag for an alert; False if it is not indexed"""
+        seq = await self.redis.get(self._id_key(event_id))
+        if seq is None:
+            return False
+        container, bit = read_position(int(seq))
+        key = self._read_key(user_id, container)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.setbit(key, bit, 1)
+        pipe.expire(key, self.retention_seconds)
+        await pipe.execute()
+        return True
+
+    async def _unread(self, user_id: str, seqs: Sequence[int]) -> List[bool]:
+        by_container: Dict[int, List[Tuple[int, int]]] = {}
+        for index, seq in enumerate(seqs):
+            container, bit = read_position(seq)
+            by_container.setdefault(container, []).append((index, bit))
+
+        pipe = self.redis.pipeline(transaction=False)
+        for container, positions in by_container.items():
+            bitfield = pipe.bitfield(self._read_key(user_id, container))
+            for _, bit in positions:
+                bitfield.get("u1", bit)
+            bitfield.execute()
+        replies = await pipe.execute()
+
+        unread = [True] * len(seqs)
+        for positions, flags in zip(by_container.values(), replies):
+            for (index, _), flag in zip(positions, flags):
+                unread[index] = not flag
+        return unread
+
+    async def latest(
+        self,
+        user_id: str,
+        limit: int,
+        severities: Optional[Sequence[str]] = None,
+        cursor: Optional[str] = None,
+        unread_only: bool = False
+    ) -> Tuple[List[bytes], Optional[str]]:
+        """Newest alerts (optionally only the user's unread ones) before ``cursor``.
+
+        Returns the serialized alerts and the cursor for the next page (None
+        when there are no more). When filtering unread alerts the window is
+        read in growing rounds until the page fills or the index runs out.
+        """
+        severities = list(severities or ALERT_SEVERITIES)
+        max_score = f"({decode_feed_cursor(cursor)}" if cursor else "+inf"
+        min_score = (time.time() - self.retention_seconds) * 1000 * SEQ_SLOTS
+        window = limit + 1 if not unread_only else limit * 2
+        selected: List[Tuple[int, int]] = []
+        scanned_to: Optional[int] = None
+        exhausted = False
+
+        rounds = 0
+        while len(selected) <= limit and not exhausted and rounds < self.max_rounds:
+            rounds += 1
+            pipe = self.redis.pipeline(transaction=False)
+            for severity in severities:
+                pipe.zrevrangebyscore(
+                    self._severity_key(severity), max_score, min_score,
+                    start=0, num=window, withscores=True
+                )
+            heads = await pipe.execute()
+            merged = merge_heads(heads)
+            exhausted = len(merged) <= window and all(len(head) < window for head in heads)
+            # Only the first `window` merged entries are guaranteed contiguous
+            candidates = merged[:window]
+            if not candidates:
+                break
+            scanned_to = candidates[-1][0]
+            max_score = f"({scanned_to}"
+
+            if unread_only:
+                flags = await self._unread(user_id, [seq for _, seq in candidates])
+                candidates = [candidate for candidate, unread in zip(candidates, flags) if unread]
+            selected.extend(candidates)
+            window *= 2
+        feed_rounds.observe(rounds)
+
+        page = selected[:limit]
+        if len(selected) > limit:
+            next_cursor = encode_feed_cursor(page[-1][0])
+        elif not exhausted and scanned_to is not None:
+            # Out of rounds: resume after what was scanned (all of it read)
+            next_cursor = encode_feed_cursor(scanned_to)
+        else:
+            next_cursor = None
+        if not page:
+            return [], next_cursor
+        payloads = await self.redis.mget([self._data_key(seq) for _, seq in page])
+        alerts = [
+            payload if isinstance(payload, bytes) else payload.encode()
+            for payload in payloads if payload is not None
+        ]
+        return alerts, next_cursor
\ No newline at end of file
@@ -0,0 +1,174 @@
+# services/alert_service/matcher.py
+import asyncio
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from redis import asyncio as aioredis
+
+from shared.utils.logger import get_logger
+from .subscriptions import Subscription, SubscriptionIndex, SubscriptionStore
+
+logger = get_logger()
+
+# Metrics
+subscriptions_active = Gauge('alert_subscriptions_active', 'Alert rules loaded into the matching index')
+subscription_matches = Counter('alert_subscription_matches_total', 'Rule matches pushed to alerts:dispatch', ['severity'])
+match_latency = Histogram('alert_match_seconds', 'Time to match one analyzed event against all rules')
+
+
+def dispatch_entry(message_id: str, fields: Dict, subscription: Subscription) -> Dict[str, str]:
+    """alerts:dispatch fields for one (event, rule) match"""
+    return {
+        "subscription_id": subscription.id,
+        "user_id": subscription.user_id,
+        "channels": ",".join(subscription.channels),
+        "event_id": fields.get("event_id", ""),
+        "severity": fields.get("severity", ""),
+        "confidence": fields.get("confidence", ""),
+        "source": fields.get("source", ""),
+        "asset": fields.get("asset", ""),
+        "story_id": fields.get("story_id", ""),
+        # The analyzed message ID doubles as the analysis completion time
+        "analyzed_id": message_id
+    }
+
+
+class AlertMatcher:
+    """Matches events:analyzed against every user's alert rules.
+
+    Rules are compiled into a SubscriptionIndex, rebuilt whenever the
+    store's version changes. Matches are pushed to alerts:dispatch (one
+    entry per rule) in a pipelined batch per read, and the analyzed
+    messages are acknowledged once their matches are queued.
+
+    Consumer names are per process, so entries a stopped or crashed matcher
+    read but never acknowledged would stay pending forever. At startup and
+    every ``claim_interval`` the matcher XAUTOCLAIMs entries idle for
+    ``claim_idle_ms`` and matches them again.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        store: SubscriptionStore,
+        analyzed_stream_key: str = "events:analyzed",
+        dispatch_stream_key: str = "alerts:dispatch",
+        group: str = "alert-matchers",
+        consumer_name: Optional[str] = None,
+        batch_size: int = 100,
+        refresh_interval: float = 5.0,
+        dispatch_max_len: int = 100_000,
+        claim_idle_ms: int = 60_000,
+        claim_interval: float = 30.0
+    ):
+        self.redis = redis
+        self.store = store
+        self.analyzed_stream_key = analyzed_stream_key
+        self.dispatch_stream_key = dispatch_stream_key
+        self.group = group
+        self.consumer_name = consumer_name or f"matcher-{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.dispatch_max_len = dispatch_max_len
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.index = SubscriptionIndex()
+        self.version: Optional[int] = None
+        self._refreshed_at = 0.0
+        self._claimed_at = float("-inf")
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def refresh(self, force: bool = False) -> None:
+        """Rebuild the index if rules changed since the last load"""
+        self._refreshed_at = time.monotonic()
+        version = await self.store.version()
+        if not force and version == self.version:
+            return
+        version, rules = await self.store.load()
+        index = SubscriptionIndex()
+        for rule in rules:
+            index.add(rule)
+        self.index, self.version = index, version
+        subscriptions_active.set(len(index))
+        logger.info("Alert rules loaded", rules=len(index), version=version)
+
+    def match(self, messages: List[Tuple[str, Dict]]) -> List[Dict[str, str]]:
+        entries = []
+        for message_id, fields in messages:
+            with match_latency.time():
+                matched = self.index.match_message(fields)
+            subscription_matches.labels(severity=fields.get("severity", "")).inc(len(matched))
+            entries.extend(dispatch_entry(message_id, fields, subscription) for subscription in matched)
+        return entries
+
+    async def _push(self, entries: List[Dict[str, str]]) -> None:
+        for start in range(0, len(entries), 1000):
+            pipe = self.redis.pipeline(transaction=False)
+            for entry in entries[start:start + 1000]:
+                pipe.xadd(self.dispatch_stream_key, entry, maxlen=self.dispatch_max_len, approximate=True)
+            await pipe.execute()
+
+    async def _process(self, messages: List[Tuple[str, Dict]]) -> None:
+        """Queue the matches for a batch of analyzed messages, then ack it"""
+        await self._push(self.match([(message_id, fields) for message_id, fields in messages if fields]))
+        await self.redis.xack(self.analyzed_stream_key, self.group, *[message_id for message_id, _ in messages])
+
+    async def reclaim(self) -> int:
+        """Take over analyzed entries left pending by other (dead) matchers
+        and match them; returns the number claimed"""
+        self._claimed_at = time.monotonic()
+        claimed, start = 0, "0-0"
+        while True:
+            response = await self.redis.xautoclaim(
+                self.analyzed_stream_key,
+                self.group,
+                self.consumer_name,
+                min_idle_time=self.claim_idle_ms,
+                start_id=start,
+                count=self.batch_size
+            )
+            start = response[0]
+            # Redis 6.2 returns entries trimmed while pending as (None, None)
+            messages = [(message_id, fields) for message_id, fields in response[1] if message_id is not None]
+            if messages:
+                claimed += len(messages)
+                await self._process(messages)
+            if start in ("0-0", b"0-0"):
+                break
+        if claimed:
+            logger.info("Reclaimed pending analyzed events", consumer=self.consumer_name, count=claimed)
+        return claimed
+
+    async def run(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.analyzed_stream_key, self.group, id="$", mkstream=True)
+        except aioredis.ResponseError:
+            pass  # group exists
+        await self.refresh(force=True)
+        logger.info("Alert matcher started", consumer=self.consumer_name)
+
+        while not self._stopping.is_set():
+            try:
+                if time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                    await self.refresh()
+                if time.monotonic() - self._claimed_at >= self.claim_interval:
+                    await self.reclaim()
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer_name,
+                    {self.analyzed_stream_key: ">"},
+                    count=self.batch_size,
+                    block=1000
+                )
+                for _, messages in response or []:
+                    await self._process(messages)
+            except Exception as e:
+                logger.error("Alert matching failed", error=str(e))
+                await asyncio.sleep(1)
+        logger.info("Alert matcher stopped", consumer=self.consumer_name)
\ No newline at end of file
@@ -0,0 +1,227 @@
+# services/alert_service/subscriptions.py
+import bisect
+import itertools
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import orjson
+from redis import asyncio as aioredis
+
+from shared.models.event import EventFilter
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+ANY = "*"
+DEFAULT_CHANNELS = ("in_app",)
+
+# (severity, source, asset) with ANY for unconstrained dimensions
+BucketKey = Tuple[str, str, str]
+
+
+@dataclass
+class Subscription:
+    """A user's alert rule"""
+    user_id: str
+    filter: EventFilter
+    channels: List[str] = field(default_factory=lambda: list(DEFAULT_CHANNELS))
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def to_json(self) -> bytes:
+        return orjson.dumps({
+            "id": self.id,
+            "user_id": self.user_id,
+            "filter": self.filter.model_dump(mode="json"),
+            "channels": self.channels
+        })
+
+    @classmethod
+    def from_json(cls, raw) -> "Subscription":
+        data = orjson.loads(raw)
+        return cls(
+            user_id=data["user_id"],
+            filter=EventFilter.model_validate(data["filter"]),
+            channels=data["channels"],
+            id=data["id"]
+        )
+
+    def bucket_keys(self) -> List[BucketKey]:
+        """Every distinct (severity, source, asset) combination this rule
+        matches; repeated filter values would add the rule to a bucket twice"""
+        f = self.filter
+        return list(itertools.product(
+            dict.fromkeys(f.severity or [ANY]),
+            dict.fromkeys(f.sources or [ANY]),
+            dict.fromkeys(asset.upper() for asset in f.assets) if f.assets else [ANY]
+        ))
+
+
+class _Bucket:
+    """Subscriptions sharing a bucket key, sorted by min_confidence so the
+    matches for a confidence are a prefix"""
+
+    __slots__ = ("thresholds", "subscriptions")
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.subscriptions: List["Subscription"] = []
+
+    def add(self, threshold: float, subscription: "Subscription") -> None:
+        index = bisect.bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(index, threshold)
+        self.subscriptions.insert(index, subscription)
+
+    def remove(self, threshold: float, subscription: "Subscription") -> None:
+        start = bisect.bisect_left(self.thresholds, threshold)
+        end = bisect.bisect_right(self.thresholds, threshold)
+        index = self.subscriptions.index(subscription, start, end)
+        del self.thresholds[index]
+        del self.subscriptions[index]
+
+    def upto(self, confidence: float) -> List["Subscription"]:
+        return self.subscriptions[:bisect.bisect_right(self.thresholds, confidence)]
+
+
+class SubscriptionIndex:
+    """All active alert rules compiled into inverted indexes.
+
+    Each rule is expanded into the (severity, source, asset) combinations it
+    accepts, with ``*`` standing for an unconstrained dimension, and filed in
+    that combination's bucket ordered by min_confidence. An event can only
+    fall in the 8 buckets formed from its own values and ``*``, and within
+    each the matching rules are a prefix, so matching costs 8 lookups plus
+    the matches themselves. Each rule lands in at most one of those buckets,
+    so results need no deduplication. Date windows (rare) are checked on the
+    matched rules only.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[BucketKey, _Bucket] = {}
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._windowed: Dict[str, Tuple[Optional[datetime], Optional[datetime]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def get(self, subscription_id: str) -> Optional[Subscription]:
+        return self._subscriptions.get(subscription_id)
+
+    def add(self, subscription: Subscription) -> None:
+        if subscription.id in self._subscriptions:
+            self.remove(subscription.id)
+        threshold = subscription.filter.min_confidence or 0.0
+        for key in subscription.bucket_keys():
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket()
+            bucket.add(threshold, subscription)
+        if subscription.filter.start_date or subscription.filter.end_date:
+            self._windowed[subscription.id] = (subscription.filter.start_date, subscription.filter.end_date)
+        self._subscriptions[subscription.id] = subscription
+
+    def remove(self, subscription_id: str) -> Optional[Subscription]:
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return None
+        threshold = subscription.filter.min_confidence or 0.0
+        for key in subscription.bucket_keys():
+            bucket = self._buckets[key]
+            bucket.remove(threshold, subscription)
+            if not bucket.subscriptions:
+                del self._buckets[key]
+        self._windowed.pop(subscription_id, None)
+        return subscription
+
+    def match(
+        self,
+        severity: str,
+        source: Optional[str],
+        asset: Optional[str],
+        confidence: float,
+        timestamp: Optional[datetime] = None
+    ) -> List[Subscription]:
+        """Rules that accept an event with these attributes"""
+        asset = asset.upper() if asset else None
+        matched: List[Subscription] = []
+        for key in itertools.product((severity, ANY), (source, ANY) if source else (ANY,), (asset, ANY) if asset else (ANY,)):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                matched.extend(bucket.upto(confidence))
+
+        if self._windowed:
+            matched = [
+                subscription for subscription in matched
+                if subscription.id not in self._windowed or _in_window(timestamp, *self._windowed[subscription.id])
+            ]
+        return matched
+
+    def match_message(self, fields: Mapping) -> List[Subscription]:
+        """Rules matching an events:analyzed message"""
+        timestamp = fields.get("timestamp")
+        return self.match(
+            severity=fields["severity"],
+            source=fields.get("source") or None,
+            asset=fields.get("asset") or None,
+            confidence=float(fields.get("confidence") or 0.0),
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else None
+        )
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _in_window(timestamp: Optional[datetime], start: Optional[datetime], end: Optional[datetime]) -> bool:
+    if timestamp is None:
+        return False
+    timestamp = _aware(timestamp)
+    return (start is None or timestamp >= _aware(start)) and (end is None or timestamp <= _aware(end))
+
+
+class SubscriptionStore:
+    """Alert rules persisted in Redis.
+
+    Rules live in one hash (id -> JSON) with a set of IDs per user. Every
+    change bumps a version counter so matchers know to reload.
+    """
+
+    def __init__(self, redis: aioredis.Redis, prefix: str = "alerts:subscriptions"):
+        self.redis = redis
+        self.prefix = prefix
+        self.version_key = f"{prefix}:version"
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.prefix}:user:{user_id}"
+
+    async def save(self, subscription: Subscription) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self.prefix, subscription.id, subscription.to_json())
+        pipe.sadd(self._user_key(subscription.user_id), subscription.id)
+        pipe.incr(self.version_key)
+        await pipe.execute()
+
+    async def delete(self, user_id: str, subscription_id: str) -> bool:
+        if not await self.redis.srem(self._user_key(user_id), subscription_id):
+            return False
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hdel(self.prefix, subscription_id)
+        pipe.incr(self.version_key)
+        await pipe.execute()
+        return True
+
+    async def for_user(self, user_id: str) -> List[Subscription]:
+        ids = list(await self.redis.smembers(self._user_key(user_id)))
+        if not ids:
+            return []
+        return [Subscription.from_json(raw) for raw in await self.redis.hmget(self.prefix, ids) if raw]
+
+    async def version(self) -> int:
+        return int(await self.redis.get(self.version_key) or 0)
+
+    async def load(self) -> Tuple[int, List[Subscription]]:
+        """Current version and every rule"""
+        version = await self.version()
+        rules = [Subscription.from_json(raw) async for _, raw in self.redis.hscan_iter(self.prefix, count=1000)]
+        return version, rules
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""Analysis worker service: consumes events:raw and runs the analysis pipeline"""
+
+from .jobs import URGENCY_FIELD, JobStore, event_message, event_partition_key, event_urgency, parse_event_message
+from .worker import AnalysisWorker
+
+__all__ = ['AnalysisWorker', 'JobStore', 'event_message', 'event_partition_key',
+           'event_urgency', 'parse_event_message', 'URGENCY_FIELD']
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""Run an analysis worker: python -m services.analysis_worker"""
+
+import asyncio
+import signal
+
+from config.database import database
+from config.redis import stream_manager
+from config.settings import settings
+from services.alert_service import AlertFeed
+from services.llm_orchestrator import EventVectorStore, LLMOrchestrator, StoryClusterer
+from services.llm_orchestrator.pipeline import AnalysisPipeline
+from services.event_store import EventStore, EventWriter
+from services.market_data import MarketDataService, build_feed
+from services.risk_engine import AnomalyDetector
+from shared.streams import LoadShedder, parse_thresholds, parse_weights
+from shared.utils.background import BackgroundTaskQueue
+from shared.utils.logger import setup_logger
+from .jobs import JobStore
+from .worker import AnalysisWorker
+
+
+async def main():
+    logger = setup_logger()
+    await stream_manager.connect()
+    persistence_queue = BackgroundTaskQueue(
+        "persistence",
+        workers=settings.persistence_queue_workers,
+        max_depth=settings.persistence_queue_max_depth
+    )
+    await persistence_queue.start()
+    # Each worker keeps its own rolling market history
+    market_data = MarketDataService(
+        build_feed(
+            settings.market_feed,
+            assets=settings.market_assets,
+            interval=settings.market_poll_seconds,
+            replay_path=settings.market_replay_path,
+            replay_speed=settings.market_replay_speed
+        ),
+        window=settings.market_window_ticks
+    )
+    await market_data.start()
+    await database.connect()
+    event_store = EventStore(database)
+    event_writer = None
+    if await event_store.available():
+        event_writer = EventWriter(
+            event_store,
+            batch_size=settings.event_store_batch_size,
+            flush_interval=settings.event_store_flush_seconds
+        )
+        await event_writer.start()
+    else:
+        logger.warning("Event store unavailable, events will not be persisted to Postgres")
+
+    pipeline = AnalysisPipeline(
+        orchestrator=LLMOrchestrator(),
+        vector_store=EventVectorStore(),
+        story_clusterer=StoryClusterer(
+            similarity_threshold=settings.story_similarity_threshold,
+            half_life_seconds=settings.story_half_life_seconds,
+            min_reanalysis_interval=settings.story_min_reanalysis_seconds,
+            failure_retry_interval=settings.story_failure_retry_seconds
+        ),
+        redis=stream_manager.redis,
+        analyzed_stream_key=stream_manager.config.analyzed_stream_key,
+        background=persistence_queue,
+        market_data=market_data,
+        anomaly_detector=AnomalyDetector(
+            z_threshold=settings.anomaly_z_threshold,
+            cusum_threshold=settings.anomaly_cusum_threshold,
+            escalation_score=settings.anomaly_escalation_score
+        ),
+        event_writer=event_writer,
+        alert_feed=AlertFeed(
+            stream_manager.redis,
+            retention_seconds=settings.alert_feed_retention_days * 86400,
+            max_per_severity=settings.alert_feed_max_per_severity
+        )
+    )
+    worker = AnalysisWorker(
+        pipeline,
+        stream_manager,
+        JobStore(stream_manager.redis),
+        concurrency=settings.analysis_worker_concurrency,
+        claim_idle_seconds=settings.analysis_worker_claim_idle_seconds,
+        max_deliveries=settings.analysis_worker_max_deliveries,
+        lane_weights=parse_weights(settings.event_lane_weights),
+        shedder=LoadShedder(
+            parse_thresholds(settings.load_shed_thresholds),
+            sample_rate=settings.load_shed_sample_rate
+        ) if settings.load_shed_enabled else None
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await market_data.stop()
+        await persistence_queue.stop()
+        if event_writer is not None:
+            await event_writer.stop()
+        await database.close()
+        await stream_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
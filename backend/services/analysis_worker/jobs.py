@@ -0,0 +1,122 @@
+# services/analysis_worker/jobs.py
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+from redis import asyncio as aioredis
+
+from config.redis import payload_codec
+from services.llm_orchestrator.vector_store import extract_asset
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+from shared.streams import LANES, PARTITION_KEY_FIELD
+from shared.utils.codec import Codec
+
+JOB_TTL_SECONDS = 86400  # Job status is kept for 24 hours
+
+# Stream field carrying the event's urgency lane
+URGENCY_FIELD = "urgency"
+
+# Terms that put an event on the critical lane
+CRITICAL_TERMS = (
+    "hack", "exploit", "drained", "insolven", "bankrupt", "halts withdrawals",
+    "withdrawals halted", "paused withdrawals", "depeg", "rug pull", "delist", "seized"
+)
+# Sources whose events skip ahead of social chatter
+HIGH_URGENCY_SOURCES = {"news", "onchain", "exchange", "regulator"}
+LOW_RELEVANCE = 0.3
+
+
+def event_partition_key(event: EventModel) -> str:
+    """events:raw partition key: the asset, or the source when none is found"""
+    asset = extract_asset(event)
+    return asset if asset != "UNKNOWN" else f"source:{event.source}"
+
+
+def event_urgency(event: EventModel) -> str:
+    """Urgency lane, decided cheaply at ingest: an explicit metadata
+    "urgency", then critical terms, trusted sources and relevance"""
+    metadata = event.metadata or {}
+    urgency = metadata.get("urgency")
+    if urgency in LANES:
+        return urgency
+    text = f"{event.content.get('title', '')} {event.content.get('text', '')}".lower()
+    if any(term in text for term in CRITICAL_TERMS):
+        return "critical"
+    if event.source in HIGH_URGENCY_SOURCES:
+        return "high"
+    relevance = metadata.get("relevance_score")
+    if relevance is not None and float(relevance) < LOW_RELEVANCE:
+        return "low"
+    return "normal"
+
+
+def event_message(event: EventModel, job_id: Optional[str] = None, codec: Codec = payload_codec) -> Dict[str, str]:
+    """Stream fields for an event on events:raw (stream values must be flat;
+    the event itself is a codec payload)"""
+    fields = {
+        "event_id": str(event.id),
+        "event": codec.encode(event.model_dump()),
+        PARTITION_KEY_FIELD: event_partition_key(event),
+        URGENCY_FIELD: event_urgency(event)
+    }
+    if job_id:
+        fields["job_id"] = job_id
+    return fields
+
+
+def parse_event_message(fields: Dict[str, str], codec: Codec = payload_codec) -> Tuple[Optional[str], EventModel]:
+    """Inverse of event_message: (job_id, event); also reads entries written
+    as JSON before the codec"""
+    return fields.get("job_id"), EventModel.model_validate(codec.decode(fields["event"]))
+
+
+class JobStore:
+    """Status of asynchronous analysis jobs, kept in Redis hashes (results as
+    codec payloads)"""
+
+    def __init__(self, redis: aioredis.Redis, prefix: str = "jobs", codec: Codec = payload_codec):
+        self.redis = redis
+        self.prefix = prefix
+        self.codec = codec
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:{job_id}"
+
+    async def _update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = datetime.now(timezone.utc).isoformat()
+        key = self._key(job_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, JOB_TTL_SECONDS)
+            await pipe.execute()
+
+    async def create(self, event: EventModel, owner: str) -> str:
+        """Queue a job; only ``owner`` (the submitter's user ID) may read it"""
+        job_id = str(uuid4())
+        await self._update(
+            job_id,
+            status="queued",
+            event_id=str(event.id),
+            owner=owner,
+            created_at=datetime.now(timezone.utc).isoformat()
+        )
+        return job_id
+
+    async def mark_running(self, job_id: str, worker: str) -> None:
+        await self._update(job_id, status="running", worker=worker)
+
+    async def complete(self, job_id: str, analysis: AnalysisResult) -> None:
+        await self._update(job_id, status="completed", result=self.codec.encode(analysis.model_dump()))
+
+    async def fail(self, job_id: str, error: str) -> None:
+        await self._update(job_id, status="failed", error=error)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        data = await self.redis.hgetall(self._key(job_id))
+        if not data:
+            return None
+        job = {"job_id": job_id, **data}
+        if "result" in job:
+            job["result"] = self.codec.decode(job["result"])
+        return job
@@ -0,0 +1,152 @@
+# services/analysis_worker/worker.py
+import asyncio
+import time
+from typing import Dict, Optional
+
+from prometheus_client import Counter, Gauge
+
+from config.redis import RedisStreamManager
+from services.llm_orchestrator.pipeline import AnalysisPipeline
+from shared.streams import (
+    DEFAULT_LANE_WEIGHTS,
+    LANES,
+    PARTITION_KEY_FIELD,
+    LoadShedder,
+    PartitionAssigner,
+    default_consumer_name,
+    lane_of,
+    lane_streams
+)
+from shared.streams.lanes import DROP, LOCAL
+from shared.utils.logger import get_logger
+from .jobs import JobStore, parse_event_message
+
+logger = get_logger()
+
+# Metrics
+worker_jobs = Counter('analysis_worker_jobs_total', 'Events processed by analysis workers', ['status'])
+worker_inflight = Gauge('analysis_worker_inflight', 'Analyses currently running in this worker')
+
+
+class AnalysisWorker:
+    """Consumes events:raw through the shared consumer group and runs analyses
+    with bounded concurrency. A failed analysis leaves its entry pending;
+    it is reclaimed (as are entries of a crashed worker) after
+    ``claim_idle_seconds`` and retried, and dead-lettered after
+    ``max_deliveries`` attempts, at which point its async job is failed.
+    Entries that cannot be parsed are failed and acked at once.
+
+    When events:raw is partitioned, the worker consumes only the partitions
+    assigned to it and handles events for the same asset in order.
+
+    Every urgency lane of events:raw is read, weighted by ``lane_weights``.
+    With a ``shedder``, events that waited too long on a sheddable lane are
+    scored locally (no LLM) or sampled; async API jobs are never dropped."""
+
+    def __init__(
+        self,
+        pipeline: AnalysisPipeline,
+        stream_manager: RedisStreamManager,
+        jobs: JobStore,
+        consumer_name: str = None,
+        concurrency: int = 8,
+        claim_idle_seconds: float = 300.0,
+        max_deliveries: int = 3,
+        lane_weights: Optional[Dict[str, int]] = None,
+        shedder: Optional[LoadShedder] = None
+    ):
+        self.pipeline = pipeline
+        self.stream_manager = stream_manager
+        self.jobs = jobs
+        self.consumer_name = consumer_name or default_consumer_name("analysis")
+        self.concurrency = concurrency
+        self.stream_key = stream_manager.config.event_stream_key
+        self.shedder = shedder
+        partitioned = stream_manager.config.event_partitions > 1
+        lane_weights = lane_weights or DEFAULT_LANE_WEIGHTS
+        self.consumer = stream_manager.consumer(
+            [] if partitioned else lane_streams(self.stream_key),
+            self._handle,
+            consumer_name=self.consumer_name,
+            concurrency=concurrency,
+            min_batch=1,
+            max_batch=concurrency,
+            claim_idle_ms=int(claim_idle_seconds * 1000),
+            max_deliveries=max_deliveries,
+            on_dead=self._dead_letter,
+            order_key=(lambda fields: fields.get(PARTITION_KEY_FIELD)) if partitioned else None,
+            weights={
+                stream: lane_weights.get(lane_of(self.stream_key, stream), 1)
+                for stream in stream_manager.event_streams
+            }
+        )
+        self.assigner = PartitionAssigner(
+            stream_manager.redis,
+            self.consumer,
+            self.stream_key,
+            stream_manager.config.event_partitions,
+            lanes=LANES
+        ) if partitioned else None
+
+    def stop(self) -> None:
+        if self.assigner is not None:
+            self.assigner.stop()
+        else:
+            self.consumer.stop()
+
+    async def run(self) -> None:
+        logger.info("Analysis worker started", consumer=self.consumer_name, concurrency=self.concurrency)
+        # Drains on stop: running analyses finish so their messages get acked
+        if self.assigner is None:
+            await self.consumer.run()
+        else:
+            consuming = asyncio.create_task(self.consumer.run())
+            await self.assigner.run()  # hands back its partitions on stop
+            self.consumer.stop()
+            await consuming
+        logger.info("Analysis worker stopped", consumer=self.consumer_name)
+
+    async def _handle(self, stream: str, message_id: str, fields: dict) -> None:
+        """Raises on a failed analysis so the entry stays pending for a retry"""
+        worker_inflight.set(self.consumer.inflight)
+        job_id = fields.get("job_id")
+        try:
+            decision = None
+            if self.shedder is not None:
+                lag = time.time() - int(message_id.split("-")[0]) / 1000
+                decision = self.shedder.decide(lane_of(self.stream_key, stream), lag, required=bool(job_id))
+                if decision == DROP:
+                    worker_jobs.labels(status="shed").inc()
+                    return
+
+            try:
+                job_id, event = parse_event_message(fields)
+            except Exception as e:
+                # Malformed entries fail the same way on every delivery
+                logger.error("Unparseable event message", error=str(e), job_id=job_id, message_id=message_id)
+                if job_id:
+                    await self.jobs.fail(job_id, "Invalid event")
+                worker_jobs.labels(status="failed").inc()
+                return
+
+            try:
+                if job_id:
+                    await self.jobs.mark_running(job_id, self.consumer_name)
+                analysis = await self.pipeline.run(event, local_only=decision == LOCAL)
+                if job_id:
+                    await self.jobs.complete(job_id, analysis)
+            except Exception as e:
+                logger.warning("Analysis attempt failed, will retry", error=str(e), job_id=job_id, message_id=message_id)
+                worker_jobs.labels(status="retry").inc()
+                raise
+            worker_jobs.labels(status="local" if decision == LOCAL else "completed").inc()
+        finally:
+            worker_inflight.set(self.consumer.inflight - 1)
+
+    async def _dead_letter(self, stream: str, message_id: str, fields: dict) -> None:
+        """Out of deliveries: the job's caller is told it failed"""
+        job_id = fields.get("job_id")
+        logger.error("Analysis job failed", job_id=job_id, message_id=message_id)
+        if job_id:
+            await self.jobs.fail(job_id, "Analysis failed")
+        worker_jobs.labels(status="failed").inc()
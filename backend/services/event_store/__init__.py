@@ -0,0 +1,23 @@
+"""Event Store: events and analyses in Postgres"""
+
+from .store import (
+    EventStore,
+    EventWriter,
+    encode_cursor,
+    decode_cursor,
+    processed_event_json,
+    alert_json,
+    ALERT_SEVERITIES,
+    MAX_PAGE_SIZE
+)
+
+__all__ = [
+    'EventStore',
+    'EventWriter',
+    'encode_cursor',
+    'decode_cursor',
+    'processed_event_json',
+    'alert_json',
+    'ALERT_SEVERITIES',
+    'MAX_PAGE_SIZE'
+]
\ No newline at end of file
@@ -0,0 +1,316 @@
+# services/event_store/store.py
+import asyncio
+import base64
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import orjson
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import Select, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+from config.database import Database
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+from shared.utils.logger import get_logger
+from .tables import events
+
+logger = get_logger()
+
+# Metrics
+rows_written = Counter('event_store_rows_written_total', 'Event rows written to Postgres', ['status'])
+batch_latency = Histogram('event_store_batch_seconds', 'Time to write one batch of event rows')
+pending_rows = Gauge('event_store_pending_rows', 'Event rows waiting to be written')
+
+MAX_PAGE_SIZE = 1000
+ALERT_SEVERITIES = ("high", "critical")
+
+# Columns written on conflict (re-analysis updates the analysis fields)
+UPSERT_COLUMNS = (
+    "processed_at", "severity", "confidence", "risk_factors",
+    "recommended_actions", "analysis", "sentiment_score", "asset"
+)
+
+
+def encode_cursor(timestamp: datetime, event_id: UUID) -> str:
+    """Opaque keyset cursor for the row (timestamp, id)"""
+    raw = f"{timestamp.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverse of encode_cursor; ValueError if the cursor is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, event_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), UUID(event_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def event_row(event: EventModel, analysis: Optional[AnalysisResult] = None, asset: Optional[str] = None) -> Dict:
+    """Column values for one event (and its analysis, if any)"""
+    meta = event.metadata or {}
+    row = {
+        "id": event.id,
+        "timestamp": event.timestamp,
+        "source": event.source,
+        "asset": asset,
+        "content": event.content,
+        "metadata": meta,
+        "sentiment_score": meta.get("sentiment_score"),
+        "entities": list(meta.get("entities", [])),
+        "topics": list(meta.get("topics", [])),
+        "processed_at": None,
+        "severity": None,
+        "confidence": None,
+        "risk_factors": [],
+        "recommended_actions": [],
+        "analysis": None
+    }
+    if analysis is not None:
+        row.update({
+            "processed_at": analysis.timestamp,
+            "severity": analysis.severity,
+            "confidence": analysis.confidence_score,
+            "risk_factors": analysis.risk_factors,
+            "recommended_actions": analysis.recommended_actions,
+            "analysis": analysis.model_dump(mode="json")
+        })
+    return row
+
+
+def processed_event_json(row: Mapping) -> Dict:
+    """A row shaped like shared.models.event.ProcessedEvent"""
+    return {
+        "id": row["id"],
+        "timestamp": row["timestamp"],
+        "source": row["source"],
+        "content": row["content"],
+        "metadata": row["metadata"],
+        "processed_at": row["processed_at"] or row["timestamp"],
+        "sentiment_score": row["sentiment_score"],
+        "relevance_score": None,
+        "entities": row["entities"],
+        "topics": row["topics"],
+        "language": "en"
+    }
+
+
+def alert_json(row: Mapping) -> Dict:
+    """A row shaped like shared.models.event.AlertEvent"""
+    return {
+        **processed_event_json(row),
+        "alert_id": row["id"],
+        "severity": row["severity"],
+        "confidence": row["confidence"],
+        "risk_factors": row["risk_factors"],
+        "recommended_actions": row["recommended_actions"],
+        "affected_assets": [row["asset"]] if row["asset"] else []
+    }
+
+
+class EventStore:
+    """Events and their analyses in Postgres.
+
+    Listings are ordered newest first and paged with a keyset cursor on
+    (timestamp, id), so every page costs the same regardless of depth.
+    A page (at most MAX_PAGE_SIZE rows) is read in one query and encoded
+    out row by row; its next cursor comes from the last row read.
+
+    The schema is managed by alembic (``alembic upgrade head`` from backend/).
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    async def available(self, timeout: float = 5.0) -> bool:
+        """Whether Postgres is reachable and the events table exists"""
+        async def probe() -> None:
+            async with self.database.engine.connect() as conn:
+                await conn.execute(select(events.c.id).limit(1))
+
+        try:
+            await asyncio.wait_for(probe(), timeout)
+            return True
+        except Exception as e:
+            logger.error("Event store unavailable", error=str(e))
+            return False
+
+    async def insert_many(self, rows: Sequence[Dict]) -> None:
+        """Upsert a batch of event rows in one round trip"""
+        statement = insert(events)
+        statement = statement.on_conflict_do_update(
+            index_elements=[events.c.id],
+            set_={name: statement.excluded[name] for name in UPSERT_COLUMNS}
+        )
+        async with self.database.engine.begin() as conn:
+            await conn.execute(statement, list(rows))
+
+    async def get(self, event_id: UUID) -> Optional[Mapping]:
+        async with self.database.engine.connect() as conn:
+            result = await conn.execute(select(events).where(events.c.id == event_id))
+            row = result.mappings().first()
+        return row
+
+    def listing_query(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sources: Optional[Sequence[str]] = None,
+        severities: Optional[Sequence[str]] = None,
+        asset: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Select:
+        """Newest-first page of events after ``cursor``"""
+        limit = min(limit, MAX_PAGE_SIZE)
+        conditions = []
+        if asset:
+            conditions.append(events.c.asset == asset)
+        if start_date:
+            conditions.append(events.c.timestamp >= start_date)
+        if end_date:
+            conditions.append(events.c.timestamp < end_date)
+        if cursor:
+            timestamp, event_id = decode_cursor(cursor)
+            conditions.append(tuple_(events.c.timestamp, events.c.id) < tuple_(timestamp, event_id))
+
+        # An IN list over an index's leading column cannot be read in timestamp
+        # order, so Postgres would sort every match. Instead read each value's
+        # index range in order and merge the heads.
+        split_column, values = None, None
+        if severities and len(severities) > 1:
+            split_column, values = events.c.severity, severities
+            if sources:
+                conditions.append(events.c.source.in_(sources))
+        elif sources and len(sources) > 1:
+            split_column, values = events.c.source, sources
+            if severities:
+                conditions.append(events.c.severity.in_(severities))
+        else:
+            if sources:
+                conditions.append(events.c.source == sources[0])
+            if severities:
+                conditions.append(events.c.severity == severities[0])
+
+        newest_first = (events.c.timestamp.desc(), events.c.id.desc())
+        if split_column is None:
+            return select(events).where(*conditions).order_by(*newest_first).limit(limit)
+
+        heads = union_all(*(
+            select(events).where(*conditions, split_column == value).order_by(*newest_first).limit(limit)
+            for value in values
+        )).subquery()
+        return select(heads).order_by(heads.c.timestamp.desc(), heads.c.id.desc()).limit(limit)
+
+    async def page(self, query: Select, limit: int) -> Tuple[List[Mapping], Optional[str]]:
+        """Rows of ``query`` and the cursor for the page after them.
+
+        The cursor is taken from the last row returned, so it always agrees
+        with the rows the caller sends; None if the page is not full.
+        """
+        async with self.database.engine.connect() as conn:
+            rows = (await conn.execute(query)).mappings().all()
+        if len(rows) < min(limit, MAX_PAGE_SIZE):
+            return rows, None
+        return rows, encode_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+
+    @staticmethod
+    def iter_json(rows: Sequence[Mapping], shape: Callable[[Mapping], Dict]) -> Iterator[bytes]:
+        """``rows`` as a JSON array, encoded one row at a time"""
+        yield b"["
+        for i, row in enumerate(rows):
+            yield (b"," if i else b"") + orjson.dumps(shape(row))
+        yield b"]"
+
+
+class EventWriter:
+    """Batches event rows from the analysis path into multi-row upserts.
+
+    ``add`` never blocks: rows are buffered (up to ``max_pending``) and a
+    flusher task writes them every ``batch_size`` rows or ``flush_interval``
+    seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        store: EventStore,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        max_attempts: int = 3
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._queue: asyncio.Queue[Dict] = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def add(self, event: EventModel, analysis: Optional[AnalysisResult] = None, asset: Optional[str] = None) -> bool:
+        """Buffer one event row; False if the buffer is full"""
+        try:
+            self._queue.put_nowait(event_row(event, analysis, asset))
+        except asyncio.QueueFull:
+            rows_written.labels(status="dropped").inc()
+            return False
+        pending_rows.set(self._queue.qsize())
+        return True
+
+    async def _next_batch(self) -> List[Dict]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _write(self, batch: List[Dict]) -> None:
+        # Within a batch the latest row per event wins (ON CONFLICT cannot
+        # touch the same row twice in one statement)
+        rows = list({row["id"]: row for row in batch}.values())
+        for attempt in range(self.max_attempts):
+            try:
+                with batch_latency.time():
+                    await self.store.insert_many(rows)
+                rows_written.labels(status="written").inc(len(rows))
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt + 1 == self.max_attempts:
+                    logger.error("Failed to write event batch", rows=len(rows), error=str(e))
+                    rows_written.labels(status="failed").inc(len(rows))
+                    return
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            pending_rows.set(self._queue.qsize())
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Flush buffered rows (up to ``timeout``) and stop the flusher"""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Event writer not drained", remaining=self._queue.qsize())
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
\ No newline at end of file
@@ -0,0 +1,33 @@
+# services/event_store/tables.py
+from sqlalchemy import Column, DateTime, Float, Index, MetaData, String, Table
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+metadata = MetaData()
+
+# One row per event; analysis fields are filled in once the event is analyzed.
+# Every listing index ends in (timestamp, id) so keyset pagination on
+# (timestamp DESC, id DESC) is an index range scan for each filter.
+events = Table(
+    "events",
+    metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("timestamp", DateTime(timezone=True), nullable=False),
+    Column("source", String(64), nullable=False),
+    Column("asset", String(16)),
+    Column("content", JSONB, nullable=False),
+    Column("metadata", JSONB, nullable=False, server_default="{}"),
+    Column("sentiment_score", Float),
+    Column("entities", JSONB, nullable=False, server_default="[]"),
+    Column("topics", JSONB, nullable=False, server_default="[]"),
+    # Analysis
+    Column("processed_at", DateTime(timezone=True)),
+    Column("severity", String(16)),
+    Column("confidence", Float),
+    Column("risk_factors", JSONB, nullable=False, server_default="[]"),
+    Column("recommended_actions", JSONB, nullable=False, server_default="[]"),
+    Column("analysis", JSONB),
+    Index("ix_events_timestamp_id", "timestamp", "id"),
+    Index("ix_events_source_timestamp", "source", "timestamp", "id"),
+    Index("ix_events_severity_timestamp", "severity", "timestamp", "id"),
+    Index("ix_events_asset_timestamp", "asset", "timestamp", "id"),
+)
\ No newline at end of file
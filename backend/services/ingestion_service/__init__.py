@@ -0,0 +1 @@
+"""Ingestion service: historical backfill and event intake"""
\ No newline at end of file
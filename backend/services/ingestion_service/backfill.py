@@ -0,0 +1,340 @@
+# services/ingestion_service/backfill.py
+"""Bulk historical backfill into the event vector store
+
+Streams JSONL or CSV input, embeds in large batches across a process pool
+and bulk-upserts to Pinecone from a small thread pool, overlapping upserts
+with embedding. Progress is checkpointed after every batch so
+an interrupted run resumes where it stopped.
+
+The store follows the index version registry like the API does: rows are
+embedded for the active version, and while a migration dual-writes they
+are also embedded for and written to its shadow version.
+
+Usage (from backend/):
+    python -m services.ingestion_service.backfill data/ftx_2022.jsonl
+    python -m services.ingestion_service.backfill data/news.csv --workers 8 --batch-size 1024
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from uuid import NAMESPACE_URL, UUID, uuid5
+
+from redis import asyncio as aioredis
+
+from config.settings import settings
+from shared.models.event import EventModel
+from shared.utils.logger import get_logger, setup_logger
+
+logger = get_logger()
+
+# Columns that map onto EventModel fields; any other CSV column becomes content
+EVENT_FIELDS = {"id", "timestamp", "source", "metadata"}
+ANALYSIS_FIELDS = {"severity", "confidence_score", "risk_factors", "sentiment_score"}
+
+# Per-process encoder, created by _init_worker
+_encoder = None
+
+
+@dataclass
+class Checkpoint:
+    """Backfill progress for a single input file"""
+    input_path: str
+    rows_done: int = 0
+    events_stored: int = 0
+    rows_skipped: int = 0
+    updated_at: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str, input_path: str) -> "Checkpoint":
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("input_path") == input_path:
+                return cls(**data)
+            logger.warning("Checkpoint belongs to another input, starting over", checkpoint=path)
+        return cls(input_path=input_path)
+
+    def save(self, path: str) -> None:
+        self.updated_at = datetime.now(timezone.utc).isoformat()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)  # atomic, never leaves a torn checkpoint
+
+
+def read_rows(path: str, start: int = 0) -> Iterator[Dict]:
+    """Stream rows from a JSONL or CSV file, skipping the first ``start`` rows"""
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            rows: Iterator[Dict] = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for index, row in enumerate(rows):
+            if index >= start:
+                yield row
+
+
+def row_to_event(row: Dict) -> Tuple[EventModel, Dict]:
+    """Convert an input row into an EventModel and its (historical) analysis"""
+    analysis = dict(row.get("analysis") or {})
+    for key in ANALYSIS_FIELDS & row.keys():
+        analysis[key] = row[key]
+    if isinstance(analysis.get("risk_factors"), str):
+        analysis["risk_factors"] = [r for r in analysis["risk_factors"].split("|") if r]
+    if "confidence_score" in analysis:
+        analysis["confidence_score"] = float(analysis["confidence_score"])
+
+    content = row.get("content")
+    if not isinstance(content, dict):
+        content = {
+            k: v for k, v in row.items()
+            if k not in EVENT_FIELDS | ANALYSIS_FIELDS | {"analysis", "content"} and v not in (None, "")
+        }
+
+    fields = {k: row[k] for k in EVENT_FIELDS & row.keys() if row[k] not in (None, "")}
+    # Deterministic IDs keep re-runs idempotent: upserts overwrite instead of duplicating
+    raw_id = fields.get("id") or json.dumps(row, sort_keys=True, default=str)
+    try:
+        fields["id"] = UUID(str(raw_id))
+    except ValueError:
+        fields["id"] = uuid5(NAMESPACE_URL, str(raw_id))
+    event = EventModel(content=content, **{"source": "historical", **fields})
+    return event, analysis
+
+
+def _init_worker(
+    backend: str,
+    model: str,
+    projection_path: Optional[str],
+    hashing_dimension: int,
+    allow_fallback: bool
+) -> None:
+    global _encoder
+    from services.llm_orchestrator.encoders import build_encoder
+
+    _encoder = build_encoder(backend, model, projection_path, hashing_dimension, allow_fallback)
+
+
+def _embed_batch(rows: List[Dict]) -> Tuple[List[Tuple[str, List[float], Dict]], List[str], int]:
+    """Worker task: parse, embed and build upsert records for a batch of rows;
+    the texts are returned too so a shadow version can embed them its way"""
+    from services.llm_orchestrator.vector_store import build_metadata, create_text_representation
+
+    events, analyses, skipped = [], [], 0
+    for row in rows:
+        try:
+            event, analysis = row_to_event(row)
+        except Exception:
+            skipped += 1
+            continue
+        events.append(event)
+        analyses.append(analysis)
+
+    if not events:
+        return [], [], skipped
+
+    texts = [create_text_representation(e, a) for e, a in zip(events, analyses)]
+    embeddings = _encoder.encode(texts)
+    records = [
+        (str(event.id), embedding.tolist(), build_metadata(event, analysis))
+        for event, analysis, embedding in zip(events, analyses, embeddings)
+    ]
+    return records, texts, skipped
+
+
+async def apply_versions(vector_store):
+    """Switch ``vector_store`` to the registry's active and shadow versions;
+    returns the active version's spec (None if no migration ever ran)"""
+    from services.llm_orchestrator.migration import VersionRegistry, apply_registry
+
+    redis = aioredis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+    try:
+        registry = VersionRegistry(redis)
+        await apply_registry(vector_store, registry, {})
+        return (await registry.get())["active"]
+    finally:
+        await redis.close()
+
+
+def _batches(rows: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    batch: List[Dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_backfill(
+    input_path: str,
+    checkpoint_path: str,
+    workers: int = os.cpu_count() or 2,
+    batch_size: int = 512,
+    dry_run: bool = False,
+    report_every: float = 10.0,
+    upsert_workers: int = 4,
+    vector_store=None,
+    active_spec=None
+) -> Checkpoint:
+    """Embed and upsert every row of ``input_path``, resuming from the checkpoint.
+
+    ``vector_store`` defaults to a new EventVectorStore synced with the
+    version registry; it is unused on a dry run. ``active_spec`` (the
+    VersionSpec of its active version, if it came from the registry) tells
+    the workers how to embed; otherwise they follow settings.
+    """
+    checkpoint = Checkpoint.load(checkpoint_path, os.path.abspath(input_path))
+    if checkpoint.rows_done:
+        logger.info("Resuming backfill", rows_done=checkpoint.rows_done)
+
+    if dry_run:
+        vector_store = None
+    elif vector_store is None:
+        from services.llm_orchestrator.vector_store import EventVectorStore
+
+        vector_store = EventVectorStore()
+        active_spec = asyncio.run(apply_versions(vector_store))
+
+    started = time.perf_counter()
+    last_report = started
+    stored_this_run = 0
+    # Batches move embed -> upsert in submission order; both stages are bounded
+    embedding: Deque[Tuple[Future, int]] = deque()
+    upserting: Deque[Tuple[Future, int, int]] = deque()
+    max_embedding = workers * 2  # keep every worker busy while upserts run
+    max_upserting = upsert_workers * 2
+
+    def upsert(records: List[Tuple[str, List[float], Dict]], texts: List[str]) -> int:
+        if vector_store is None or not records:
+            return len(records)
+        vector_store.upsert_vectors(records)
+        shadow = vector_store.shadow
+        if shadow is not None:
+            upsert_shadow(shadow, records, texts)
+        return len(records)
+
+    def upsert_shadow(shadow, records: List[Tuple[str, List[float], Dict]], texts: List[str]) -> None:
+        from services.llm_orchestrator.vector_store import shadow_write_errors
+
+        # As for live writes, a failing shadow never fails the backfill; the
+        # migration's re-embed pass covers what is missed
+        try:
+            embeddings = shadow.encoder.encode(texts)
+            vector_store.upsert_vectors(
+                [(vector_id, embedding.tolist(), metadata) for (vector_id, _, metadata), embedding in zip(records, embeddings)],
+                version=shadow
+            )
+        except Exception as e:
+            shadow_write_errors.labels(version=shadow.name).inc()
+            logger.warning("Shadow index write failed", version=shadow.name, error=str(e))
+
+    def start_upsert(upsert_pool: ThreadPoolExecutor) -> None:
+        future, row_count = embedding.popleft()
+        records, texts, skipped = future.result()
+        upserting.append((upsert_pool.submit(upsert, records, texts), row_count, skipped))
+
+    def finish_upsert() -> None:
+        nonlocal stored_this_run
+        future, row_count, skipped = upserting.popleft()
+        stored = future.result()
+        # Only the oldest batch is checkpointed, so the checkpoint never
+        # advances past rows whose upsert has not completed
+        checkpoint.rows_done += row_count
+        checkpoint.events_stored += stored
+        checkpoint.rows_skipped += skipped
+        checkpoint.save(checkpoint_path)
+        stored_this_run += stored
+
+    def advance(upsert_pool: ThreadPoolExecutor) -> None:
+        # Retire finished work, blocking only while a stage is at its bound
+        while upserting and (upserting[0][0].done() or len(upserting) >= max_upserting):
+            finish_upsert()
+        while embedding and (embedding[0][0].done() or len(embedding) >= max_embedding):
+            if len(upserting) >= max_upserting:
+                finish_upsert()
+            start_upsert(upsert_pool)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            active_spec.encoder_backend,
+            active_spec.encoder_model,
+            active_spec.projection_path,
+            active_spec.hashing_dimension,
+            False
+        ) if active_spec is not None else (
+            # Workers must encode exactly like the store's active version, so a
+            # fallback is decided once here rather than independently per worker
+            "hashing" if vector_store is not None and vector_store.encoder.fallback else settings.encoder_backend,
+            settings.encoder_model,
+            settings.encoder_projection_path,
+            settings.encoder_hashing_dimension,
+            vector_store is None and settings.encoder_allow_fallback
+        )
+    ) as pool, ThreadPoolExecutor(max_workers=upsert_workers, thread_name_prefix="backfill-upsert") as upsert_pool:
+        for batch in _batches(read_rows(input_path, checkpoint.rows_done), batch_size):
+            embedding.append((pool.submit(_embed_batch, batch), len(batch)))
+            advance(upsert_pool)
+
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                logger.info(
+                    "Backfill progress",
+                    rows_done=checkpoint.rows_done,
+                    events_per_sec=round(stored_this_run / (now - started), 1)
+                )
+                last_report = now
+
+        while embedding:
+            if len(upserting) >= max_upserting:
+                finish_upsert()
+            start_upsert(upsert_pool)
+        while upserting:
+            finish_upsert()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Backfill complete",
+        events_stored=stored_this_run,
+        rows_skipped=checkpoint.rows_skipped,
+        seconds=round(elapsed, 1),
+        events_per_sec=round(stored_this_run / elapsed, 1) if elapsed else 0.0
+    )
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill historical events into the vector store")
+    parser.add_argument("input", help="JSONL or CSV file of historical events")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <input>.checkpoint.json)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--upsert-workers", type=int, default=4, help="concurrent Pinecone upserts")
+    parser.add_argument("--dry-run", action="store_true", help="embed only, skip Pinecone upserts")
+    args = parser.parse_args()
+
+    setup_logger()
+    run_backfill(
+        args.input,
+        args.checkpoint or f"{args.input}.checkpoint.json",
+        workers=args.workers,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        upsert_workers=args.upsert_workers
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# services/ingestion_service/dedup.py
+"""Ingest-side deduplication of raw events
+
+Exact replays are caught by a rotating Bloom filter over recent event IDs.
+Near-identical reposts are caught by 64-bit SimHash fingerprints over
+normalized content, indexed with LSH banding inside a sliding time window.
+Both structures have a fixed upper bound on memory.
+
+Checking an event does not remember it: callers ``record`` a new event only
+once it has been published, so a failed publish can be retried with the
+same event ID.
+"""
+
+import hashlib
+import math
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from shared.models.event import EventModel
+
+# Metrics
+dedup_events = Counter('ingest_dedup_events_total', 'Events seen by the dedup stage', ['result'])
+dedup_ratio = Gauge('ingest_dedup_ratio', 'Fraction of ingested events dropped as duplicates')
+
+FINGERPRINT_BITS = 64
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_MENTION_RE = re.compile(r"(^|\s)(rt\s+)?@\w+:?")
+_NON_WORD_RE = re.compile(r"[^a-z0-9$#\s]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _hash64(data: str) -> int:
+    return int.from_bytes(hashlib.blake2b(data.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing"""
+
+    def __init__(self, capacity: int, error_rate: float = 1e-4):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RotatingBloomFilter:
+    """Two Bloom filter generations, rotated by size or age.
+
+    Membership checks both generations, so an ID is remembered for at least
+    one full generation; memory never exceeds two filters.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-4, max_age: float = 3600.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_age = max_age
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous: Optional[BloomFilter] = None
+        self.rotated_at = time.monotonic()
+
+    def _maybe_rotate(self) -> None:
+        if self.current.count >= self.capacity or time.monotonic() - self.rotated_at >= self.max_age:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+            self.rotated_at = time.monotonic()
+
+    def add(self, item: str) -> None:
+        self._maybe_rotate()
+        self.current.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.current or (self.previous is not None and item in self.previous)
+
+
+def normalize_content(text: str) -> str:
+    """Strip URLs, mentions, retweet markers, punctuation and case"""
+    text = _URL_RE.sub(" ", text.lower())
+    text = _MENTION_RE.sub(" ", text)
+    text = _NON_WORD_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash over unigram and bigram features"""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        h = _hash64(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDuplicateIndex:
+    """Sliding-window SimHash index with LSH banding.
+
+    With ``bands`` > ``max_distance`` the pigeonhole principle guarantees any
+    fingerprint within ``max_distance`` bits shares at least one band exactly,
+    so only that band's bucket is scanned.
+    """
+
+    def __init__(self, window_seconds: float = 900.0, max_distance: int = 3, max_entries: int = 200_000):
+        self.window_seconds = window_seconds
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self._band_mask = (1 << self.band_bits) - 1
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, str]]] = {}
+        self._entries: Deque[Tuple[float, int, str]] = deque()
+
+    def _band_keys(self, fingerprint: int):
+        return [(band, (fingerprint >> (band * self.band_bits)) & self._band_mask) for band in range(self.bands)]
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._entries and (self._entries[0][0] < cutoff or len(self._entries) > self.max_entries):
+            _, fingerprint, event_id = self._entries.popleft()
+            for key in self._band_keys(fingerprint):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                try:
+                    bucket.remove((fingerprint, event_id))
+                except ValueError:
+                    pass
+                if not bucket:
+                    del self._buckets[key]
+
+    def find(self, fingerprint: int, now: Optional[float] = None) -> Optional[str]:
+        """Return the canonical event ID of a near duplicate, if any"""
+        self._evict(time.monotonic() if now is None else now)
+        for key in self._band_keys(fingerprint):
+            for candidate, event_id in self._buckets.get(key, ()):
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return event_id
+        return None
+
+    def add(self, fingerprint: int, event_id: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._entries.append((now, fingerprint, event_id))
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, []).append((fingerprint, event_id))
+        self._evict(now)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class DedupResult:
+    """Outcome of the dedup stage for one event"""
+    kind: str  # "new", "exact" or "near"
+    canonical_id: str
+    # SimHash of a new event's content (None if too short to fingerprint)
+    fingerprint: Optional[int] = None
+
+    @property
+    def is_duplicate(self) -> bool:
+        return self.kind != "new"
+
+
+class EventDeduplicator:
+    """Classifies incoming events as new, exact replays or near duplicates"""
+
+    def __init__(
+        self,
+        window_seconds: float = 900.0,
+        max_distance: int = 3,
+        id_capacity: int = 1_000_000,
+        min_tokens: int = 4
+    ):
+        self.seen_ids = RotatingBloomFilter(capacity=id_capacity)
+        self.near = NearDuplicateIndex(window_seconds=window_seconds, max_distance=max_distance)
+        self.min_tokens = min_tokens
+        self.total = 0
+        self.duplicates = 0
+
+    def check(self, event: EventModel) -> DedupResult:
+        """Classify ``event`` without remembering it"""
+        event_id = str(event.id)
+        result = self._classify(event, event_id)
+
+        self.total += 1
+        if result.is_duplicate:
+            self.duplicates += 1
+        dedup_events.labels(result=result.kind).inc()
+        dedup_ratio.set(self.duplicates / self.total)
+        return result
+
+    def record(self, event: EventModel, result: DedupResult) -> None:
+        """Remember a new event so later replays and reposts of it are caught"""
+        if result.is_duplicate:
+            return
+        self.seen_ids.add(result.canonical_id)
+        if result.fingerprint is not None:
+            self.near.add(result.fingerprint, result.canonical_id)
+
+    def _classify(self, event: EventModel, event_id: str) -> DedupResult:
+        if event_id in self.seen_ids:
+            return DedupResult("exact", event_id)
+
+        text = f"{event.content.get('title', '')} {event.content.get('text', '')}"
+        tokens = normalize_content(text).split()
+        # Very short posts collide too easily to fingerprint meaningfully
+        if len(tokens) < self.min_tokens:
+            return DedupResult("new", event_id)
+
+        fingerprint = simhash(tokens)
+        canonical_id = self.near.find(fingerprint)
+        if canonical_id is not None:
+            return DedupResult("near", canonical_id)
+        return DedupResult("new", event_id, fingerprint)
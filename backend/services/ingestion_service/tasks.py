@@ -0,0 +1,50 @@
+# services/ingestion_service/tasks.py
+"""Periodic ingestion tasks run by Celery beat"""
+
+import time
+
+import redis
+
+from config.celery_config import celery_app
+from config.redis import payload_codec
+from config.settings import settings
+from services.market_data.service import SNAPSHOT_KEY
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+# Rolling-stat levels that count as market stress
+DRAWDOWN_ALERT = -0.10
+VOLUME_ZSCORE_ALERT = 3.0
+
+
+@celery_app.task(bind=True)
+def check_market_health(self):
+    """Check the published market snapshot is fresh and flag stressed assets"""
+    client = redis.Redis.from_url(settings.redis_url)
+    try:
+        raw = client.get(SNAPSHOT_KEY)
+    finally:
+        client.close()
+
+    if raw is None:
+        logger.warning("No market snapshot published")
+        return {"status": "missing"}
+
+    snapshot = payload_codec.decode(raw)
+    assets = snapshot.get("assets", {})
+    # Age of the newest tick, not of the publish: a stalled feed keeps republishing
+    age = time.time() - max((stats["timestamp"] for stats in assets.values()), default=0)
+    stressed = {
+        asset: {"drawdown": stats["drawdown"], "volume_zscore": stats["volume_zscore"]}
+        for asset, stats in assets.items()
+        if stats["drawdown"] <= DRAWDOWN_ALERT or abs(stats["volume_zscore"]) >= VOLUME_ZSCORE_ALERT
+    }
+
+    status = "stale" if age > settings.market_stale_seconds else "healthy"
+    if status == "stale":
+        logger.warning("Market snapshot is stale", age_seconds=round(age))
+    if stressed:
+        logger.warning("Market stress detected", assets=stressed)
+
+    return {"status": status, "age_seconds": round(age, 1), "stressed_assets": stressed}
\ No newline at end of file
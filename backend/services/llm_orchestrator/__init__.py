@@ -2,5 +2,26 @@
 
 from .orchestrator import LLMOrchestrator
 from .vector_store import EventVectorStore
+from .stories import StoryClusterer
+from .pipeline import AnalysisPipeline
+from .encoders import (
+    Encoder,
+    EncoderUnavailableError,
+    HashingEncoder,
+    SentenceTransformerEncoder,
+    ProjectedEncoder,
+    build_encoder
+)
 
-__all__ = ['LLMOrchestrator', 'EventVectorStore']
\ No newline at end of file
+__all__ = [
+    'LLMOrchestrator',
+    'EventVectorStore',
+    'StoryClusterer',
+    'AnalysisPipeline',
+    'Encoder',
+    'EncoderUnavailableError',
+    'HashingEncoder',
+    'SentenceTransformerEncoder',
+    'ProjectedEncoder',
+    'build_encoder'
+]
\ No newline at end of file
@@ -0,0 +1,217 @@
+# services/llm_orchestrator/encoders.py
+import hashlib
+import importlib.util
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_MODEL = "sentence-transformers/all-mpnet-base-v2"
+
+_TOKEN_RE = re.compile(r"[a-z0-9$#@]+")
+
+
+class EncoderUnavailableError(RuntimeError):
+    """The configured encoder could not be loaded and fallback is disabled"""
+
+
+class Encoder(ABC):
+    """Turns event text into fixed-size, L2-normalised float32 vectors"""
+
+    name: str = "encoder"
+    # Set on encoders substituted for an unavailable model; their vectors
+    # are not comparable with the model's and must live in their own namespace
+    fallback: bool = False
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Output vector dimension"""
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode a batch of texts into an (n, dimension) float32 array"""
+
+    def encode_one(self, text: str) -> np.ndarray:
+        """Encode a single text"""
+        return self.encode([text])[0]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class SentenceTransformerEncoder(Encoder):
+    """sentence-transformers model loaded from the hub or a local path.
+
+    The model is loaded on first use; build_encoder loads it eagerly so a
+    missing model or failed hub download surfaces at startup.
+    """
+
+    def __init__(
+        self,
+        model_name_or_path: str = DEFAULT_MODEL,
+        device: Optional[str] = None,
+        batch_size: int = 64
+    ):
+        self.model_name_or_path = model_name_or_path
+        self.device = device
+        self.batch_size = batch_size
+        self.name = f"st:{os.path.basename(model_name_or_path.rstrip('/'))}"
+        self._model = None
+
+    def _load(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            logger.info("Loading sentence-transformers model", model=self.model_name_or_path)
+            self._model = SentenceTransformer(self.model_name_or_path, device=self.device)
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self._load().get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._load().encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+class HashingEncoder(Encoder):
+    """Zero-dependency signed feature-hashing vectorizer.
+
+    Uses unigrams and bigrams with sublinear term frequency. Quality is far
+    below a trained model but it needs no weights, encodes thousands
+    of texts per second and is deterministic across processes.
+    """
+
+    def __init__(self, dimension: int = 768, ngram_range: Tuple[int, int] = (1, 2)):
+        self._dimension = dimension
+        self.ngram_range = ngram_range
+        self.name = f"hashing:{dimension}"
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _features(self, text: str) -> List[str]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        low, high = self.ngram_range
+        features = []
+        for n in range(low, high + 1):
+            for i in range(len(tokens) - n + 1):
+                features.append(" ".join(tokens[i:i + n]))
+        return features
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                h = int.from_bytes(digest, "little")
+                index = h % self._dimension
+                sign = 1.0 if (h >> 63) & 1 else -1.0
+                counts[index] = counts.get(index, 0.0) + sign
+            if counts:
+                indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                vectors[row, indices] = np.sign(values) * np.log1p(np.abs(values))
+        return _normalize(vectors)
+
+
+class ProjectedEncoder(Encoder):
+    """Wraps another encoder with a linear projection learned offline (e.g. PCA)"""
+
+    def __init__(self, base: Encoder, projection_path: str):
+        self.base = base
+        self.projection_path = projection_path
+        self.mean, self.components = load_projection(projection_path)
+        self.name = f"{base.name}+pca{self.components.shape[0]}"
+
+    @property
+    def dimension(self) -> int:
+        return int(self.components.shape[0])
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.base.encode(texts)
+        return _normalize((vectors - self.mean) @ self.components.T)
+
+
+def fit_projection(vectors: np.ndarray, n_components: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Learn a PCA projection (mean, components) from sample embeddings"""
+    mean = vectors.mean(axis=0)
+    _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+    return mean.astype(np.float32), vt[:n_components].astype(np.float32)
+
+
+def save_projection(path: str, mean: np.ndarray, components: np.ndarray) -> None:
+    """Persist a projection for use with ProjectedEncoder"""
+    np.savez(path, mean=mean, components=components)
+
+
+def load_projection(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Load a projection saved by save_projection"""
+    data = np.load(path)
+    return data["mean"].astype(np.float32), data["components"].astype(np.float32)
+
+
+def build_encoder(
+    backend: str = "sentence-transformers",
+    model: str = DEFAULT_MODEL,
+    projection_path: Optional[str] = None,
+    hashing_dimension: int = 768,
+    allow_fallback: bool = False
+) -> Encoder:
+    """Build an encoder, loading model weights up front.
+
+    When sentence-transformers or the model is unavailable this raises
+    EncoderUnavailableError, or with ``allow_fallback`` returns a
+    HashingEncoder flagged as a fallback.
+    """
+    encoder: Encoder
+    if backend == "hashing":
+        encoder = HashingEncoder(dimension=hashing_dimension)
+    elif backend == "sentence-transformers":
+        try:
+            encoder = _load_sentence_transformer(model)
+        except EncoderUnavailableError as e:
+            if not allow_fallback:
+                raise
+            logger.warning("Encoder model unavailable, using hashing encoder", model=model, error=str(e))
+            encoder = HashingEncoder(dimension=hashing_dimension)
+            encoder.fallback = True
+            return encoder
+    else:
+        raise ValueError(f"Unknown encoder backend: {backend}")
+
+    if projection_path:
+        encoder = ProjectedEncoder(encoder, projection_path)
+    return encoder
+
+
+def _load_sentence_transformer(model: str) -> SentenceTransformerEncoder:
+    if importlib.util.find_spec("sentence_transformers") is None:
+        raise EncoderUnavailableError("sentence-transformers is not installed")
+    is_local_path = model.startswith((os.path.sep, ".", "~"))
+    if is_local_path and not os.path.exists(os.path.expanduser(model)):
+        raise EncoderUnavailableError(f"Encoder model path not found: {model}")
+    encoder = SentenceTransformerEncoder(os.path.expanduser(model))
+    try:
+        encoder._load()
+    except Exception as e:  # hub download, corrupt weights, missing device
+        raise EncoderUnavailableError(f"Failed to load encoder model {model}: {e}") from e
+    return encoder
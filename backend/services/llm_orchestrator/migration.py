@@ -0,0 +1,455 @@
+# services/llm_orchestrator/migration.py
+"""Online re-embedding and index version migration
+
+A migration registers a shadow index version in Redis. Every API process
+picks it up through ``sync_versions`` and dual-writes new events to it while
+the migrator re-embeds stored events from their source text (batched and
+throttled). Once recall parity is verified on sample queries the registry is
+switched in a single write and every process promotes the new version.
+
+Usage (from backend/):
+    python -m services.llm_orchestrator.migration v2 --model /models/bge-small \\
+        --ids-file event_ids.txt
+    python -m services.llm_orchestrator.migration --rollback
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from prometheus_client import Counter, Gauge
+from redis import asyncio as aioredis
+
+from config.settings import settings
+from shared.utils.logger import get_logger, setup_logger
+from .encoders import Encoder, build_encoder
+from .vector_store import (
+    DEFAULT_NAMESPACE,
+    DEFAULT_VERSION,
+    EventVectorStore,
+    IndexVersion,
+    build_metadata,
+    create_text_representation,
+    has_source_text,
+    namespace_for,
+    record_from_metadata,
+)
+
+logger = get_logger()
+
+# Metrics
+migration_events = Counter('vector_migration_events_total', 'Events re-embedded by index migrations', ['version', 'status'])
+migration_rate = Gauge('vector_migration_events_per_second', 'Current re-embedding throughput', ['version'])
+dual_write_active = Gauge('vector_store_dual_write', 'Whether this process dual-writes to a shadow index')
+
+
+@dataclass
+class VersionSpec:
+    """Serializable description of an index version"""
+    name: str
+    index_name: str
+    namespace: str
+    encoder_backend: str
+    encoder_model: str
+    projection_path: Optional[str] = None
+    hashing_dimension: int = 768
+
+    def build_encoder(self) -> Encoder:
+        return build_encoder(
+            backend=self.encoder_backend,
+            model=self.encoder_model,
+            projection_path=self.projection_path,
+            hashing_dimension=self.hashing_dimension
+        )
+
+    @classmethod
+    def from_settings(cls, encoder: Encoder, index_name: str = "blackswan-events") -> "VersionSpec":
+        """The default version as built from settings; ``encoder`` is the one
+        actually loaded, so a hashing fallback is recorded as such and under
+        its own namespace"""
+        return cls(
+            name=DEFAULT_VERSION,
+            index_name=index_name,
+            namespace=namespace_for(encoder),
+            encoder_backend="hashing" if encoder.fallback else settings.encoder_backend,
+            encoder_model=settings.encoder_model,
+            projection_path=None if encoder.fallback else settings.encoder_projection_path,
+            hashing_dimension=settings.encoder_hashing_dimension
+        )
+
+
+@dataclass
+class MigrationProgress:
+    """Observable state of a running migration"""
+    version: str
+    state: str = "pending"
+    processed: int = 0
+    missing: int = 0
+    events_per_sec: float = 0.0
+    overlap_at_k: Optional[float] = None
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+class VersionRegistry:
+    """Redis-backed record of the active and shadow versions shared by all processes"""
+
+    KEY = "vector_store:versions"
+    PROGRESS_KEY = "vector_store:migration"
+
+    def __init__(self, redis: aioredis.Redis):
+        self.redis = redis
+
+    async def get(self) -> Dict[str, Optional[VersionSpec]]:
+        raw = await self.redis.get(self.KEY)
+        state = json.loads(raw) if raw else {}
+        return {
+            role: VersionSpec(**state[role]) if state.get(role) else None
+            for role in ("active", "shadow", "previous")
+        }
+
+    async def _put(
+        self,
+        active: Optional[VersionSpec],
+        shadow: Optional[VersionSpec],
+        previous: Optional[VersionSpec] = None
+    ) -> None:
+        # One SET so readers never observe a half-applied switch
+        await self.redis.set(self.KEY, json.dumps({
+            "active": asdict(active) if active else None,
+            "shadow": asdict(shadow) if shadow else None,
+            "previous": asdict(previous) if previous else None
+        }))
+
+    async def set_shadow(self, spec: Optional[VersionSpec], default_active: VersionSpec) -> None:
+        state = await self.get()
+        await self._put(state["active"] or default_active, spec, state["previous"])
+
+    async def promote(self, spec: VersionSpec) -> None:
+        state = await self.get()
+        await self._put(spec, None, state["active"])
+
+    async def rollback(self) -> VersionSpec:
+        """Switch back to the version active before the last promotion"""
+        state = await self.get()
+        if state["previous"] is None:
+            raise ValueError("No previous index version to roll back to")
+        await self._put(state["previous"], None, state["active"])
+        return state["previous"]
+
+    async def report(self, progress: MigrationProgress) -> None:
+        await self.redis.hset(self.PROGRESS_KEY, mapping={
+            k: "" if v is None else str(v) for k, v in asdict(progress).items()
+        })
+
+
+def _open(vector_store: EventVectorStore, spec: VersionSpec, opened: Dict[str, IndexVersion]) -> IndexVersion:
+    if spec.name == vector_store.active.name:
+        return vector_store.active
+    if spec.name not in opened:
+        opened[spec.name] = vector_store.open_version(
+            spec.name, spec.index_name, spec.namespace, spec.build_encoder()
+        )
+    return opened[spec.name]
+
+
+async def apply_registry(
+    vector_store: EventVectorStore,
+    registry: VersionRegistry,
+    opened: Dict[str, IndexVersion]
+) -> None:
+    """Bring a process's vector store in line with the registry"""
+    state = await registry.get()
+    active, shadow = state["active"], state["shadow"]
+
+    if active and active.name != vector_store.active.name:
+        version = await asyncio.to_thread(_open, vector_store, active, opened)
+        previous = vector_store.promote(version)
+        opened.setdefault(previous.name, previous)  # a rollback reuses the open version
+        logger.info("Promoted vector index version", version=active.name)
+
+    current_shadow = vector_store.shadow.name if vector_store.shadow else None
+    wanted_shadow = shadow.name if shadow else None
+    if wanted_shadow != current_shadow:
+        version = await asyncio.to_thread(_open, vector_store, shadow, opened) if shadow else None
+        vector_store.set_shadow(version)
+        logger.info("Vector index dual-write changed", shadow=wanted_shadow)
+    dual_write_active.set(1 if vector_store.shadow else 0)
+
+
+async def sync_versions(vector_store: EventVectorStore, registry: VersionRegistry, interval: float = 5.0):
+    """Background loop run by every API process"""
+    opened: Dict[str, IndexVersion] = {}
+    while True:
+        try:
+            await apply_registry(vector_store, registry, opened)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Vector version sync failed", error=str(e))
+        await asyncio.sleep(interval)
+
+
+class IndexMigrator:
+    """Re-embeds stored events into a new index version and switches over"""
+
+    def __init__(
+        self,
+        vector_store: EventVectorStore,
+        registry: VersionRegistry,
+        target: VersionSpec,
+        batch_size: int = 100,
+        max_rate: float = 500.0,
+        sync_interval: float = 5.0
+    ):
+        self.vector_store = vector_store
+        self.registry = registry
+        self.target_spec = target
+        self.batch_size = batch_size
+        self.max_rate = max_rate
+        self.sync_interval = sync_interval
+        self.target: Optional[IndexVersion] = None
+        self.progress = MigrationProgress(version=target.name)
+        self.sample_texts: List[str] = []
+
+    async def run(
+        self,
+        event_ids: Iterable[str],
+        sample_queries: Optional[List[str]] = None,
+        min_overlap: float = 0.8,
+        k: int = 10,
+        promote: bool = True
+    ) -> MigrationProgress:
+        self.target = await asyncio.to_thread(
+            self.vector_store.open_version,
+            self.target_spec.name,
+            self.target_spec.index_name,
+            self.target_spec.namespace,
+            self.target_spec.build_encoder()
+        )
+
+        # Dual-write first so events stored during the backfill are not missed
+        await self.registry.set_shadow(
+            self.target_spec,
+            default_active=VersionSpec.from_settings(self.vector_store.encoder, self.vector_store.index_name)
+        )
+        self.vector_store.set_shadow(self.target)
+        await self._set_state("dual_write")
+        await asyncio.sleep(self.sync_interval)
+
+        await self._set_state("reembedding")
+        await self.reembed(event_ids)
+
+        if self.progress.processed == 0:
+            # An empty target would verify trivially and serve no results
+            logger.warning("No events re-embedded, keeping dual-write", missing=self.progress.missing)
+            await self._set_state("verification_failed")
+            return self.progress
+
+        await self._set_state("verifying")
+        overlap = await self.verify(sample_queries or self.sample_texts, k=k)
+        if overlap is not None:
+            self.progress.overlap_at_k = round(overlap, 4)
+
+        if overlap is None or overlap < min_overlap:
+            logger.warning("Recall parity check failed, keeping dual-write", overlap=overlap)
+            await self._set_state("verification_failed")
+            return self.progress
+
+        if promote:
+            await self.registry.promote(self.target_spec)
+            self.vector_store.promote(self.target)
+            await self._set_state("promoted")
+        else:
+            await self._set_state("verified")
+        return self.progress
+
+    async def reembed(self, event_ids: Iterable[str]) -> None:
+        """Fetch source text from the active version and upsert into the target"""
+        started = time.perf_counter()
+        for batch in _chunks(event_ids, self.batch_size):
+            batch_started = time.perf_counter()
+            processed = await asyncio.to_thread(self._reembed_batch, batch)
+
+            self.progress.processed += processed
+            self.progress.missing += len(batch) - processed
+            migration_events.labels(version=self.target_spec.name, status="ok").inc(processed)
+            migration_events.labels(version=self.target_spec.name, status="missing").inc(len(batch) - processed)
+
+            elapsed = time.perf_counter() - started
+            self.progress.events_per_sec = round(self.progress.processed / elapsed, 1) if elapsed else 0.0
+            migration_rate.labels(version=self.target_spec.name).set(self.progress.events_per_sec)
+            await self.registry.report(self.progress)
+
+            # Throttle so the migration never starves live traffic of Pinecone capacity
+            budget = len(batch) / self.max_rate
+            spent = time.perf_counter() - batch_started
+            if spent < budget:
+                await asyncio.sleep(budget - spent)
+
+        logger.info(
+            "Re-embedding complete",
+            version=self.target_spec.name,
+            processed=self.progress.processed,
+            missing=self.progress.missing,
+            events_per_sec=self.progress.events_per_sec
+        )
+
+    def _reembed_batch(self, event_ids: List[str]) -> int:
+        stored = self.vector_store.fetch_metadata(event_ids)
+
+        events, analyses = [], []
+        for event_id, metadata in stored.items():
+            if not has_source_text(metadata):
+                # Re-embedding from empty content would only fill the target
+                # with junk; these are counted as missing instead
+                continue
+            event, analysis = record_from_metadata(event_id, metadata)
+            events.append(event)
+            analyses.append(analysis)
+        if not events:
+            return 0
+
+        texts = [create_text_representation(e, a) for e, a in zip(events, analyses)]
+        if len(self.sample_texts) < 50:
+            self.sample_texts.extend(create_text_representation(e, {}) for e in events[:5])
+
+        embeddings = self.target.encoder.encode(texts)
+        vectors = [
+            (str(event.id), embedding.tolist(), build_metadata(event, analysis))
+            for event, analysis, embedding in zip(events, analyses, embeddings)
+        ]
+        return self.vector_store.upsert_vectors(vectors, version=self.target)
+
+    async def verify(self, queries: List[str], k: int = 10) -> Optional[float]:
+        """Mean overlap@k between the active and target versions' results;
+        None if nothing could be measured (no queries, or none with results
+        in the active version)"""
+        if not queries:
+            return None
+        overlaps = await asyncio.to_thread(self._overlaps, queries, k)
+        if not overlaps:
+            return None
+        return sum(overlaps) / len(overlaps)
+
+    def _overlaps(self, queries: List[str], k: int) -> List[float]:
+        old_version, new_version = self.vector_store.active, self.target
+        old_vectors = old_version.encoder.encode(queries)
+        new_vectors = new_version.encoder.encode(queries)
+
+        overlaps = []
+        for old_vector, new_vector in zip(old_vectors, new_vectors):
+            old_ids = _top_ids(old_version, old_vector.tolist(), k)
+            new_ids = _top_ids(new_version, new_vector.tolist(), k)
+            if old_ids:
+                overlaps.append(len(old_ids & new_ids) / len(old_ids))
+        return overlaps
+
+    async def _set_state(self, state: str) -> None:
+        self.progress.state = state
+        await self.registry.report(self.progress)
+        logger.info("Index migration state", version=self.target_spec.name, state=state)
+
+
+def _top_ids(version: IndexVersion, vector: List[float], k: int) -> set:
+    results = version.index.query(vector=vector, top_k=k, namespace=version.namespace)
+    return {match.id for match in results.matches}
+
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_ids(args) -> Iterator[str]:
+    if args.ids_file:
+        with open(args.ids_file) as f:
+            yield from (line.strip() for line in f if line.strip())
+    if args.from_backfill:
+        from services.ingestion_service.backfill import read_rows, row_to_event
+
+        for row in read_rows(args.from_backfill):
+            yield str(row_to_event(row)[0].id)
+
+
+async def _main(args) -> None:
+    redis = await aioredis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+    try:
+        registry = VersionRegistry(redis)
+        if args.rollback:
+            spec = await registry.rollback()
+            print(json.dumps({"active": asdict(spec)}, indent=2))
+            return
+
+        vector_store = EventVectorStore(index_name=args.source_index)
+        await apply_registry(vector_store, registry, {})
+
+        target = VersionSpec(
+            name=args.name,
+            index_name=args.index_name or f"{args.source_index}-{args.name}",
+            namespace=args.namespace,
+            encoder_backend=args.backend,
+            encoder_model=args.model,
+            projection_path=args.projection,
+            hashing_dimension=args.hashing_dimension
+        )
+        queries = None
+        if args.queries_file:
+            with open(args.queries_file) as f:
+                queries = [line.strip() for line in f if line.strip()]
+
+        migrator = IndexMigrator(
+            vector_store, registry, target,
+            batch_size=args.batch_size,
+            max_rate=args.max_rate
+        )
+        progress = await migrator.run(
+            _read_ids(args),
+            sample_queries=queries,
+            min_overlap=args.min_overlap,
+            promote=not args.no_promote
+        )
+        print(json.dumps(asdict(progress), indent=2))
+    finally:
+        await redis.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed stored events into a new index version")
+    parser.add_argument("name", nargs="?", help="new version name, e.g. v2")
+    parser.add_argument("--rollback", action="store_true", help="switch back to the previously active version")
+    parser.add_argument("--source-index", default="blackswan-events")
+    parser.add_argument("--index-name", help="target index (default: <source-index>-<name>)")
+    parser.add_argument("--namespace", default=DEFAULT_NAMESPACE)
+    parser.add_argument("--backend", default=settings.encoder_backend)
+    parser.add_argument("--model", default=settings.encoder_model)
+    parser.add_argument("--projection")
+    parser.add_argument("--hashing-dimension", type=int, default=settings.encoder_hashing_dimension)
+    parser.add_argument("--ids-file", help="file with one event ID per line")
+    parser.add_argument("--from-backfill", help="derive event IDs from a backfill JSONL/CSV input")
+    parser.add_argument("--queries-file", help="sample query texts for the recall parity check")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-rate", type=float, default=500.0, help="events/sec ceiling")
+    parser.add_argument("--min-overlap", type=float, default=0.8)
+    parser.add_argument("--no-promote", action="store_true", help="verify but leave the switch to an operator")
+    args = parser.parse_args()
+    if not args.rollback and not args.name:
+        parser.error("a version name is required")
+    if not args.rollback and not args.ids_file and not args.from_backfill:
+        parser.error("one of --ids-file or --from-backfill is required")
+
+    setup_logger()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
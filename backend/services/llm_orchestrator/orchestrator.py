@@ -2,11 +2,12 @@
 import asyncio
 import json
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
 
 from anthropic import AsyncAnthropic
 import openai
+import orjson
 from tenacity import retry, stop_after_attempt, wait_exponential
 import numpy as np
 from prometheus_client import Counter, Histogram
@@ -22,6 +23,14 @@ llm_calls = Counter('llm_calls_total', 'Total LLM API calls', ['model', 'status'
 llm_latency = Histogram('llm_latency_seconds', 'LLM response time', ['model'])
 consensus_scores = Histogram('llm_consensus_scores', 'Agreement between models')
 
+
+def _price_bucket(value, significant_digits: int = 3):
+    """Round to a few significant digits (None passes through)"""
+    if not value:
+        return value
+    return float(f"{value:.{significant_digits}g}")
+
+
 class LLMOrchestrator:
     """Multi-agent LLM orchestration with chain-of-thought reasoning"""
     
@@ -53,23 +62,31 @@ class LLMOrchestrator:
         self, 
         event_data: Dict,
         market_data: Dict,
-        similar_events: List[Dict]
+        similar_events: List[Dict],
+        anomaly: Optional[Dict] = None
     ) -> AnalysisResult:
-        """Orchestrate multi-agent analysis of potential black swan event"""
+        """Orchestrate multi-agent analysis of potential black swan event
+        
+        When a quantitative anomaly signal is supplied and does not call for
+        escalation, the deep sentiment agent is skipped. Results are not cached
+        here: callers cache the final, enriched result with ``cache_result``
+        so hits and misses have the same shape.
+        """
         
         # Check cache first
         cache_key = self._generate_cache_key(event_data, market_data)
         cached = self.cache.get(cache_key)
         if cached:
-            return AnalysisResult.model_validate(cached)
+            return AnalysisResult.model_validate_json(cached)
         
         # Run parallel analysis with different agents
         tasks = [
             self._primary_analysis(event_data, market_data),
-            self._sentiment_analysis(event_data),
             self._historical_comparison(event_data, similar_events),
             self._market_impact_analysis(market_data)
         ]
+        if anomaly is None or anomaly.get("escalate"):
+            tasks.insert(1, self._sentiment_analysis(event_data))
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
@@ -80,12 +97,7 @@ class LLMOrchestrator:
             raise Exception("Multi-agent analysis failed")
         
         # Synthesize results
-        final_analysis = await self._synthesize_results(valid_results, event_data)
-        
-        # Cache result
-        self.cache.set(cache_key, final_analysis.model_dump())
-        
-        return final_analysis
+        return await self._synthesize_results(valid_results, event_data)
     
     @retry(
         stop=stop_after_attempt(3),
@@ -223,17 +235,23 @@ Output as JSON with these fields:
         
         return [action for action, count in sorted_actions[:5]]  # Top 5
     
+    def cache_result(self, event_data: Dict, market_data: Dict, analysis: AnalysisResult) -> None:
+        """Cache a final analysis pre-serialized so hits can be returned without re-encoding"""
+        self.cache.set(self._generate_cache_key(event_data, market_data), orjson.dumps(analysis.model_dump()))
+    
+    def cached_result(self, event_data: Dict, market_data: Dict) -> Optional[bytes]:
+        """Cached analysis as JSON bytes, ready to send as-is; None on a miss"""
+        return self.cache.get(self._generate_cache_key(event_data, market_data))
+    
     def _generate_cache_key(self, event_data: Dict, market_data: Dict) -> str:
         """Generate cache key from event and market data"""
-        key_data = {
-            'event_id': event_data.get('id'),
-            'source': event_data.get('source'),
-            'market_snapshot': {
-                'btc_price': market_data.get('btc_price'),
-                'total_market_cap': market_data.get('total_market_cap')
-            }
-        }
-        return json.dumps(key_data, sort_keys=True)
+        # Live prices move every tick; bucket them so the cache can still hit
+        return ":".join((
+            str(event_data.get('id')),
+            str(event_data.get('source')),
+            str(_price_bucket(market_data.get('btc_price'))),
+            str(_price_bucket(market_data.get('total_market_cap')))
+        ))
     
     async def _sentiment_analysis(self, event_data: Dict) -> Dict:
         """Deep sentiment analysis using Claude"""
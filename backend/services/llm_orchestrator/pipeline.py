@@ -0,0 +1,240 @@
+# services/llm_orchestrator/pipeline.py
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from prometheus_client import Histogram
+from redis import asyncio as aioredis
+
+from services.alert_service import AlertFeed
+from services.event_store import EventWriter
+from services.market_data import MarketDataService
+from services.risk_engine import AnomalyDetector, AnomalySignal
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+from shared.utils.background import BackgroundTaskQueue
+from shared.utils.logger import get_logger
+from .orchestrator import LLMOrchestrator
+from .stories import StoryClusterer
+from .vector_store import EventVectorStore, extract_asset
+
+logger = get_logger()
+
+# Metrics
+stage_latency = Histogram('analysis_stage_seconds', 'Time spent in each analysis stage', ['stage'])
+
+T = TypeVar("T")
+
+
+def local_analysis(event: EventModel, anomaly: Optional[AnomalySignal]) -> AnalysisResult:
+    """Result from the anomaly score alone, for events shed from LLM analysis.
+    Never rated critical: that takes the full pipeline."""
+    score = anomaly.score if anomaly is not None else 0.0
+    severity = "high" if score >= 0.75 else "medium" if score >= 0.5 else "low"
+    return AnalysisResult(
+        event_id=str(event.id),
+        confidence_score=round(min(1.0, max(0.0, score)), 3),
+        severity=severity,
+        reasoning={"mode": "local", "anomaly": anomaly.to_dict() if anomaly else None},
+        requires_human_review=score >= 0.5
+    )
+
+
+class AnalysisPipeline:
+    """End-to-end analysis of one event, shared by the API and analysis workers
+    
+    The critical path is embed -> anomaly scoring -> similarity search -> LLM
+    synthesis. Every event updates the anomaly detector, and an escalating
+    score forces analysis even inside a debounced story. Persisting to the
+    vector store, indexing the alert feed and publishing to events:analyzed
+    run afterwards on a supervised background queue when one is provided, so
+    callers get the result as soon as synthesis finishes.
+
+    With ``local_only`` (load shedding) the event is scored by the anomaly
+    detector alone, without embedding, similarity search or LLMs, unless
+    the score escalates.
+    """
+
+    def __init__(
+        self,
+        orchestrator: LLMOrchestrator,
+        vector_store: EventVectorStore,
+        story_clusterer: StoryClusterer,
+        redis: aioredis.Redis,
+        analyzed_stream_key: str = "events:analyzed",
+        background: Optional[BackgroundTaskQueue] = None,
+        market_data: Optional[MarketDataService] = None,
+        anomaly_detector: Optional[AnomalyDetector] = None,
+        event_writer: Optional[EventWriter] = None,
+        alert_feed: Optional[AlertFeed] = None,
+        latency_observer: Optional[Callable[[float], None]] = None
+    ):
+        self.orchestrator = orchestrator
+        self.vector_store = vector_store
+        self.story_clusterer = story_clusterer
+        self.redis = redis
+        self.analyzed_stream_key = analyzed_stream_key
+        self.background = background
+        self.market_data = market_data
+        self.anomaly_detector = anomaly_detector
+        self.event_writer = event_writer
+        self.alert_feed = alert_feed
+        # Told the similarity + LLM time of every full analysis (admission control)
+        self.latency_observer = latency_observer
+
+    async def run(self, event: EventModel, local_only: bool = False) -> AnalysisResult:
+        """Analyze one event; persistence and publishing happen off the critical path"""
+        logger.info("Analyzing event", event_id=str(event.id), source=event.source)
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        market_data = await self._timed("market_data", timings, self.get_market_data())
+        # Every event feeds the detector, including those that end up debounced
+        asset = extract_asset(event)
+        anomaly = None
+        if self.anomaly_detector is not None:
+            anomaly = self.anomaly_detector.observe(event, asset, market_data)
+
+        if local_only and (anomaly is None or not anomaly.escalate):
+            analysis = local_analysis(event, anomaly)
+            self._record(event, analysis, asset)
+            await self._schedule_persistence(event, analysis, asset, store=False)
+            stage_latency.labels(stage="local").observe(time.perf_counter() - started)
+            return analysis
+
+        embedding = await self._timed("embed", timings, asyncio.to_thread(self.vector_store.embed_event, event))
+
+        # Group into stories: only story openings, material changes and
+        # anomalies reach the LLMs
+        story, trigger = self.story_clusterer.assign(event, embedding)
+        if trigger is None and anomaly is not None and anomaly.escalate and story.pending is None:
+            trigger = "anomaly"
+        if trigger is not None and not self.story_clusterer.begin_analysis(story):
+            trigger = None
+        while trigger is None:
+            inherited = await self.story_clusterer.inherited_analysis(story, event)
+            if inherited is not None:
+                logger.info("Event inherited story analysis", event_id=str(event.id), story_id=story.id)
+                self._record(event, inherited, asset)
+                return inherited
+            # The story's analysis failed: one member retries it and the rest
+            # wait on that retry, so a failing LLM sees one call per story
+            if self.story_clusterer.begin_analysis(story, retry=True):
+                trigger = "retry"
+            elif story.pending is None:
+                # Retried too recently; score locally instead of stampeding the LLMs
+                analysis = local_analysis(event, anomaly)
+                analysis.reasoning["story_id"] = story.id
+                self._record(event, analysis, asset)
+                await self._schedule_persistence(event, analysis, asset, store=False)
+                return analysis
+
+        analysis = None
+        try:
+            similar_events = await self._timed(
+                "similarity", timings, self.vector_store.find_similar_events(event, embedding=embedding)
+            )
+
+            # Run LLM analysis
+            event_data = event.model_dump(mode="json")
+            analysis = await self._timed("llm", timings, self.orchestrator.analyze_event(
+                event_data=event_data,
+                market_data=market_data,
+                similar_events=similar_events,
+                anomaly=anomaly.to_dict() if anomaly else None
+            ))
+            analysis.reasoning.update({"story_id": story.id, "story_trigger": trigger})
+            if anomaly is not None:
+                analysis.reasoning["anomaly"] = anomaly.to_dict()
+            # Cache the enriched result so cache hits match what misses return
+            self.orchestrator.cache_result(event_data, market_data, analysis)
+        finally:
+            self.story_clusterer.finish_analysis(story, analysis)
+        if self.latency_observer is not None:
+            self.latency_observer(timings["similarity"] + timings["llm"])
+
+        self._record(event, analysis, asset)
+        await self._schedule_persistence(event, analysis, asset)
+
+        timings["critical_path"] = time.perf_counter() - started
+        stage_latency.labels(stage="critical_path").observe(timings["critical_path"])
+        logger.info(
+            "Event analysis complete",
+            event_id=str(event.id),
+            severity=analysis.severity,
+            confidence=analysis.confidence_score,
+            stage_ms={stage: round(seconds * 1000, 1) for stage, seconds in timings.items()}
+        )
+
+        return analysis
+
+    async def cached_result(self, event: EventModel) -> Optional[bytes]:
+        """Serialized analysis for ``event`` if the orchestrator has one cached"""
+        return self.orchestrator.cached_result(
+            {"id": str(event.id), "source": event.source},
+            await self.get_market_data()
+        )
+
+    async def get_market_data(self) -> Dict:
+        """Current market snapshot from the in-process ring buffers"""
+        if self.market_data is None:
+            return {}
+        return self.market_data.snapshot()
+
+    async def _timed(self, stage: str, timings: Dict[str, float], awaitable: Awaitable[T]) -> T:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[stage] = time.perf_counter() - started
+            stage_latency.labels(stage=stage).observe(timings[stage])
+
+    def _record(self, event: EventModel, analysis: AnalysisResult, asset: str) -> None:
+        """Buffer the event row for the batched Postgres writer"""
+        if self.event_writer is not None and not self.event_writer.add(event, analysis, asset):
+            logger.warning("Event writer buffer full, row dropped", event_id=str(event.id))
+
+    async def _schedule_persistence(
+        self,
+        event: EventModel,
+        analysis: AnalysisResult,
+        asset: Optional[str],
+        store: bool = True
+    ) -> None:
+        jobs = [
+            # Publish to Redis stream for real-time subscribers
+            ("publish", lambda: self._timed("publish", {}, self._publish(event, analysis, asset)))
+        ]
+        if store:
+            # Store event and analysis for future reference
+            analysis_data = analysis.model_dump()
+            jobs.insert(0, ("store_event", lambda: self._timed(
+                "store_event", {}, self.vector_store.store_event(event, analysis_data)
+            )))
+        if self.alert_feed is not None:
+            # Index for the dashboard alert feed
+            jobs.append(("alert_index", lambda: self._timed(
+                "alert_index", {}, self.alert_feed.add(event, analysis, asset)
+            )))
+        for label, factory in jobs:
+            if self.background is None:
+                await factory()
+            elif not self.background.submit(label, factory):
+                # Queue full: degrade to doing the work inline rather than dropping it
+                logger.warning("Background queue full, persisting inline", job=label, event_id=str(event.id))
+                await self.background.run_with_retries(label, factory)
+
+    async def _publish(self, event: EventModel, analysis: AnalysisResult, asset: Optional[str]) -> None:
+        await self.redis.xadd(
+            self.analyzed_stream_key,
+            {
+                "event_id": str(event.id),
+                "severity": analysis.severity,
+                "confidence": str(analysis.confidence_score),
+                # Attributes alert subscriptions filter on
+                "source": event.source,
+                "asset": asset or "",
+                "timestamp": event.timestamp.isoformat(),
+                "story_id": str(analysis.reasoning.get("story_id", ""))
+            }
+        )
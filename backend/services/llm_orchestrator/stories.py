@@ -0,0 +1,267 @@
+# services/llm_orchestrator/stories.py
+import asyncio
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import uuid4
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+# Metrics
+story_events = Counter('story_events_total', 'Events assigned to stories', ['decision'])
+active_stories = Gauge('stories_active', 'Stories currently tracked by the clusterer')
+
+_TICKER_RE = re.compile(r"\$?\b[A-Z]{2,6}\b")
+
+
+def extract_entities(event: EventModel) -> Set[str]:
+    """Entities supplied by upstream enrichment, else ticker-like tokens"""
+    entities = (event.metadata or {}).get("entities")
+    if entities:
+        return {str(e).upper() for e in entities}
+    text = f"{event.content.get('title', '')} {event.content.get('text', '')}"
+    return {token.lstrip("$") for token in _TICKER_RE.findall(text)}
+
+
+@dataclass
+class Story:
+    """A burst of related events sharing one analysis
+
+    The centroid lives in row ``row`` of the clusterer's centroid matrix.
+    """
+    id: str
+    row: int
+    weight: float
+    opened_at: float
+    updated_at: float
+    entities: Set[str] = field(default_factory=set)
+    member_count: int = 1
+
+    # Analysis state
+    analysis: Optional[AnalysisResult] = None
+    analyzed_at: float = 0.0
+    members_at_analysis: int = 0
+    entities_at_analysis: Set[str] = field(default_factory=set)
+    pending: Optional[asyncio.Future] = None
+    failed_at: Optional[float] = None
+
+
+class StoryClusterer:
+    """Online clustering of event embeddings into time-decayed stories.
+
+    Each event joins the most similar live story (cosine similarity against
+    decayed centroids) or opens a new one. Analysis runs once when a story
+    opens and again only on material change: a volume spike since the last
+    analysis or entities not seen at that time. Only one analysis per story
+    runs at a time; after a failure a single member retries it, at most once
+    per ``failure_retry_interval``.
+
+    Centroids are kept in one preallocated matrix (grown by doubling) so
+    finding the nearest story is a single matrix-vector product.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.8,
+        half_life_seconds: float = 1800.0,
+        min_reanalysis_interval: float = 120.0,
+        volume_spike_factor: float = 2.0,
+        min_spike_members: int = 20,
+        max_stories: int = 5000,
+        failure_retry_interval: float = 30.0,
+        initial_capacity: int = 256
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.decay_rate = math.log(2) / half_life_seconds
+        self.min_reanalysis_interval = min_reanalysis_interval
+        self.volume_spike_factor = volume_spike_factor
+        self.min_spike_members = min_spike_members
+        self.max_stories = max_stories
+        self.failure_retry_interval = failure_retry_interval
+        self.initial_capacity = initial_capacity
+        self.stories: Dict[str, Story] = {}
+        self._dimension: Optional[int] = None
+        self._centroids = np.zeros((0, 0), dtype=np.float32)
+        self._live = np.zeros(0, dtype=bool)
+        self._stories_by_row: List[Optional[Story]] = []
+        self._free_rows: List[int] = []
+        self._rows_used = 0
+
+    def _decay(self, story: Story, now: float) -> float:
+        return story.weight * math.exp(-self.decay_rate * (now - story.updated_at))
+
+    def _reset(self, dimension: int) -> None:
+        self.stories.clear()
+        self._dimension = dimension
+        self._centroids = np.zeros((self.initial_capacity, dimension), dtype=np.float32)
+        self._live = np.zeros(self.initial_capacity, dtype=bool)
+        self._stories_by_row = [None] * self.initial_capacity
+        self._free_rows = []
+        self._rows_used = 0
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        if self._rows_used == len(self._centroids):
+            capacity = max(1, 2 * len(self._centroids))
+            centroids = np.zeros((capacity, self._dimension), dtype=np.float32)
+            centroids[:self._rows_used] = self._centroids[:self._rows_used]
+            live = np.zeros(capacity, dtype=bool)
+            live[:self._rows_used] = self._live[:self._rows_used]
+            self._centroids, self._live = centroids, live
+            self._stories_by_row.extend([None] * (capacity - len(self._stories_by_row)))
+        self._rows_used += 1
+        return self._rows_used - 1
+
+    def _remove(self, story: Story) -> None:
+        del self.stories[story.id]
+        self._live[story.row] = False
+        self._stories_by_row[story.row] = None
+        self._free_rows.append(story.row)
+
+    def centroid(self, story: Story) -> np.ndarray:
+        """The story's current (unit-length) centroid"""
+        return self._centroids[story.row]
+
+    def _expire(self, now: float) -> None:
+        stale = [s for s in self.stories.values() if self._decay(s, now) < 0.05 and s.pending is None]
+        for story in stale:
+            self._remove(story)
+        if len(self.stories) > self.max_stories:
+            by_age = sorted(self.stories.values(), key=lambda s: s.updated_at)
+            for story in by_age[:len(self.stories) - self.max_stories]:
+                self._remove(story)
+
+    def _nearest(self, embedding: np.ndarray) -> Tuple[Optional[Story], float]:
+        if not self.stories:
+            return None, 0.0
+        scores = self._centroids[:self._rows_used] @ embedding
+        scores[~self._live[:self._rows_used]] = -np.inf
+        best = int(np.argmax(scores))
+        return self._stories_by_row[best], float(scores[best])
+
+    def assign(self, event: EventModel, embedding: np.ndarray, now: Optional[float] = None) -> Tuple[Story, Optional[str]]:
+        """Place an event in a story.
+
+        Returns the story and the reason it needs (re)analysis -- "open",
+        "volume_spike", "new_entities" or "retry" after a failed analysis --
+        or None if the event should inherit the story's analysis.
+        """
+        now = time.monotonic() if now is None else now
+        embedding = np.asarray(embedding, dtype=np.float32)
+        if self._dimension != embedding.shape[0]:
+            # Encoder changed (e.g. index migration): centroids are not comparable
+            self._reset(embedding.shape[0])
+
+        self._expire(now)
+        active_stories.set(len(self.stories))
+        entities = extract_entities(event)
+        story, score = self._nearest(embedding)
+
+        if story is None or score < self.similarity_threshold:
+            story = Story(
+                id=str(uuid4()),
+                row=self._allocate_row(),
+                weight=1.0,
+                opened_at=now,
+                updated_at=now,
+                entities=set(entities)
+            )
+            self._centroids[story.row] = embedding
+            self._live[story.row] = True
+            self._stories_by_row[story.row] = story
+            self.stories[story.id] = story
+            story_events.labels(decision="open").inc()
+            return story, "open"
+
+        # Decayed incremental mean, re-normalised so dot product stays cosine
+        weight = self._decay(story, now)
+        centroid = self._centroids[story.row] * weight + embedding
+        self._centroids[story.row] = centroid / (np.linalg.norm(centroid) or 1.0)
+        story.weight = weight + 1.0
+        story.updated_at = now
+        story.member_count += 1
+        story.entities |= entities
+
+        reason = self._material_change(story, now)
+        story_events.labels(decision=reason or "inherit").inc()
+        return story, reason
+
+    def _material_change(self, story: Story, now: float) -> Optional[str]:
+        if story.pending is not None:
+            return None
+        if story.analysis is None:
+            # Previous analysis failed; let this member retry it once the
+            # retry interval has passed
+            return "retry" if self._may_retry(story, now) else None
+        if now - story.analyzed_at < self.min_reanalysis_interval:
+            return None
+        new_members = story.member_count - story.members_at_analysis
+        if (new_members >= self.min_spike_members
+                and story.member_count >= self.volume_spike_factor * story.members_at_analysis):
+            return "volume_spike"
+        if story.entities - story.entities_at_analysis:
+            return "new_entities"
+        return None
+
+    def _may_retry(self, story: Story, now: float) -> bool:
+        return story.failed_at is None or now - story.failed_at >= self.failure_retry_interval
+
+    def begin_analysis(self, story: Story, retry: bool = False, now: Optional[float] = None) -> bool:
+        """Claim a story's analysis so other members wait for the result.
+
+        Returns False, without touching the story, if an analysis is already
+        pending or (with ``retry``) the last one failed too recently.
+        """
+        if story.pending is not None:
+            return False
+        now = time.monotonic() if now is None else now
+        if retry and not self._may_retry(story, now):
+            return False
+        story.pending = asyncio.get_running_loop().create_future()
+        return True
+
+    def finish_analysis(self, story: Story, analysis: Optional[AnalysisResult], now: Optional[float] = None) -> None:
+        """Record a story analysis (or its failure, with None) and wake waiters"""
+        now = time.monotonic() if now is None else now
+        if analysis is not None:
+            story.analysis = analysis
+            story.analyzed_at = now
+            story.members_at_analysis = story.member_count
+            story.entities_at_analysis = set(story.entities)
+            story.failed_at = None
+        else:
+            story.failed_at = now
+        if story.pending is not None and not story.pending.done():
+            story.pending.set_result(analysis)
+        story.pending = None
+
+    async def inherited_analysis(self, story: Story, event: EventModel) -> Optional[AnalysisResult]:
+        """The story's analysis re-addressed to ``event``; None if unavailable.
+
+        Waits out any pending analysis first, including retries claimed by
+        other members while this one was waiting.
+        """
+        while story.pending is not None:
+            await asyncio.shield(story.pending)
+        analysis = story.analysis
+        if analysis is None:
+            return None
+        return analysis.model_copy(update={
+            "event_id": str(event.id),
+            "reasoning": {
+                **analysis.reasoning,
+                "story_id": story.id,
+                "inherited_from": analysis.event_id,
+                "story_members": story.member_count
+            }
+        })
@@ -1,81 +1,206 @@
 # services/llm_orchestrator/vector_store.py
+import asyncio
 import os
+import re
 import hashlib
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 
 import pinecone
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from tenacity import retry, stop_after_attempt
+from prometheus_client import Counter
 
+from config.settings import settings
 from shared.models.event import EventModel
+from shared.utils.logger import get_logger
+from .encoders import Encoder, build_encoder
+
+logger = get_logger()
+
+UPSERT_BATCH_SIZE = 100  # Pinecone recommends <=100 vectors per upsert request
+METADATA_TEXT_LIMIT = 1000  # Source text kept in metadata so vectors can be re-embedded
+
+DEFAULT_VERSION = "v1"
+DEFAULT_NAMESPACE = "events"
+
+# Metrics
+shadow_write_errors = Counter(
+    'vector_store_shadow_write_errors_total', 'Failed dual-writes to a shadow index version', ['version']
+)
+
+
+@dataclass
+class IndexVersion:
+    """One generation of event vectors: where they live and how they were encoded"""
+    name: str
+    index_name: str
+    namespace: str
+    encoder: Encoder
+    index: Any = field(default=None, repr=False)
+
 
 class EventVectorStore:
-    """Pinecone-based vector store for event similarity search"""
+    """Pinecone-based vector store for event similarity search
+    
+    Reads always go to the active index version. While a migration is in
+    progress a shadow version receives dual writes until it is promoted.
+    """
     
-    def __init__(self, index_name: str = "blackswan-events"):
+    def __init__(self, index_name: str = "blackswan-events", encoder: Optional[Encoder] = None):
         pinecone.init(
             api_key=os.getenv("PINECONE_API_KEY"),
             environment=os.getenv("PINECONE_ENV")
         )
         
         self.index_name = index_name
-        self.index = pinecone.Index(index_name)
         
-        # Use financial-domain embeddings
-        self.encoder = SentenceTransformer('sentence-transformers/all-mpnet-base-v2')
-        self.embedding_dim = 768
+        # Encoder backend is configurable; an unavailable model fails startup
+        # unless fallback is enabled, which gets its own namespace
+        encoder = encoder or build_encoder(
+            backend=settings.encoder_backend,
+            model=settings.encoder_model,
+            projection_path=settings.encoder_projection_path,
+            hashing_dimension=settings.encoder_hashing_dimension,
+            allow_fallback=settings.encoder_allow_fallback
+        )
         
+        self.active = self.open_version(DEFAULT_VERSION, index_name, namespace_for(encoder), encoder)
+        self.shadow: Optional[IndexVersion] = None
+    
+    def open_version(self, name: str, index_name: str, namespace: str, encoder: Encoder) -> IndexVersion:
+        """Connect to (creating if needed) the index backing a version"""
         # Create index if doesn't exist
         if index_name not in pinecone.list_indexes():
             pinecone.create_index(
                 name=index_name,
-                dimension=self.embedding_dim,
+                dimension=encoder.dimension,
                 metric="cosine",
                 pods=1,
                 replicas=1,
                 pod_type="p1.x1"
             )
+        return IndexVersion(name, index_name, namespace, encoder, pinecone.Index(index_name))
+    
+    def set_shadow(self, version: Optional[IndexVersion]) -> None:
+        """Start (or stop, with None) dual-writing new events to ``version``"""
+        self.shadow = version
+    
+    def promote(self, version: IndexVersion) -> IndexVersion:
+        """Atomically switch reads to ``version``; returns the previous active version"""
+        previous, self.active = self.active, version
+        if self.shadow is not None and self.shadow.name == version.name:
+            self.shadow = None
+        return previous
+    
+    @property
+    def index(self):
+        return self.active.index
+    
+    @property
+    def encoder(self) -> Encoder:
+        return self.active.encoder
+    
+    @property
+    def embedding_dim(self) -> int:
+        return self.encoder.dimension
     
-    @retry(stop=stop_after_attempt(3))
     async def store_event(self, event: EventModel, analysis: Dict):
-        """Store event with embeddings and metadata"""
+        """Store event with embeddings and metadata
+        
+        Not retried here: the pipeline's background queue retries the whole
+        job with backoff.
+        """
         
         # Create text representation for embedding
-        text_repr = self._create_text_representation(event, analysis)
+        text_repr = create_text_representation(event, analysis)
+        metadata = build_metadata(event, analysis)
+        active, shadow = self.active, self.shadow
         
+        # Encoding and the Pinecone client are blocking; keep them off the event loop
+        await asyncio.to_thread(self._embed_and_upsert, active, str(event.id), text_repr, metadata)
+        if shadow is not None:
+            await self._shadow_write(shadow, self._embed_and_upsert, shadow, str(event.id), text_repr, metadata)
+    
+    async def _shadow_write(self, shadow: IndexVersion, func, *args) -> None:
+        # A failing shadow index must never fail (or retry) the live write;
+        # the migration's re-embed pass backfills anything missed here
+        try:
+            await asyncio.to_thread(func, *args)
+        except Exception as e:
+            shadow_write_errors.labels(version=shadow.name).inc()
+            logger.warning("Shadow index write failed", version=shadow.name, error=str(e))
+    
+    def _embed_and_upsert(self, version: IndexVersion, event_id: str, text_repr: str, metadata: Dict) -> None:
         # Generate embedding
-        embedding = self.encoder.encode(text_repr).tolist()
-        
-        # Prepare metadata
-        metadata = {
-            "event_id": str(event.id),
-            "source": event.source,
-            "timestamp": event.timestamp.isoformat(),
-            "confidence_score": analysis.get("confidence_score", 0),
-            "severity": analysis.get("severity", "low"),
-            "asset": self._extract_asset(event),
-            "sentiment": analysis.get("sentiment_score", 0)
-        }
+        embedding = version.encoder.encode_one(text_repr).tolist()
         
         # Upsert to Pinecone
-        self.index.upsert(
-            vectors=[(str(event.id), embedding, metadata)],
-            namespace="events"
+        version.index.upsert(
+            vectors=[(event_id, embedding, metadata)],
+            namespace=version.namespace
         )
     
+    async def store_events(self, events: List[EventModel], analyses: Optional[List[Dict]] = None) -> int:
+        """Store many events with a single batched encode and chunked upserts"""
+        analyses = analyses or [{} for _ in events]
+        texts = [create_text_representation(e, a) for e, a in zip(events, analyses)]
+        metadatas = [build_metadata(e, a) for e, a in zip(events, analyses)]
+        
+        active, shadow = self.active, self.shadow
+        
+        def embed_and_upsert(version: IndexVersion) -> None:
+            embeddings = version.encoder.encode(texts)
+            vectors = [
+                (str(event.id), embedding.tolist(), metadata)
+                for event, metadata, embedding in zip(events, metadatas, embeddings)
+            ]
+            self.upsert_vectors(vectors, UPSERT_BATCH_SIZE, version)
+        
+        await asyncio.to_thread(embed_and_upsert, active)
+        if shadow is not None:
+            await self._shadow_write(shadow, embed_and_upsert, shadow)
+        return len(events)
+    
+    def upsert_vectors(
+        self,
+        vectors: List[Tuple[str, List[float], Dict]],
+        batch_size: int = UPSERT_BATCH_SIZE,
+        version: Optional[IndexVersion] = None
+    ) -> int:
+        """Bulk upsert precomputed (id, embedding, metadata) records"""
+        version = version or self.active
+        for i in range(0, len(vectors), batch_size):
+            version.index.upsert(vectors=vectors[i:i + batch_size], namespace=version.namespace)
+        return len(vectors)
+    
+    def fetch_metadata(self, event_ids: List[str], version: Optional[IndexVersion] = None) -> Dict[str, Dict]:
+        """Fetch stored metadata by event ID"""
+        version = version or self.active
+        response = version.index.fetch(ids=event_ids, namespace=version.namespace)
+        return {vector_id: vector.metadata or {} for vector_id, vector in response.vectors.items()}
+    
+    def embed_event(self, event: EventModel) -> np.ndarray:
+        """Query embedding for an event under the active version"""
+        return self.active.encoder.encode_one(create_text_representation(event, {}))
+    
     async def find_similar_events(
         self, 
         event: EventModel,
         k: int = 10,
-        time_window_days: Optional[int] = 90
+        time_window_days: Optional[int] = 90,
+        embedding: Optional[np.ndarray] = None
     ) -> List[Dict]:
         """Find similar historical events"""
         
-        # Generate query embedding
-        text_repr = self._create_text_representation(event, {})
-        query_embedding = self.encoder.encode(text_repr).tolist()
+        # Pin the version once so a concurrent promote() can't mix encoders and indexes
+        version = self.active
+        
+        # Generate query embedding (reuse the caller's if it matches this version)
+        if embedding is None or len(embedding) != version.encoder.dimension:
+            text_repr = create_text_representation(event, {})
+            embedding = await asyncio.to_thread(version.encoder.encode_one, text_repr)
+        query_embedding = embedding.tolist()
         
         # Build filter
         filter_dict = {}
@@ -84,11 +209,12 @@ class EventVectorStore:
             filter_dict["timestamp"] = {"$gte": cutoff}
         
         # Query Pinecone
-        results = self.index.query(
+        results = await asyncio.to_thread(
+            version.index.query,
             vector=query_embedding,
             top_k=k,
             include_metadata=True,
-            namespace="events",
+            namespace=version.namespace,
             filter=filter_dict if filter_dict else None
         )
         
@@ -108,27 +234,87 @@ class EventVectorStore:
     
     def _create_text_representation(self, event: EventModel, analysis: Dict) -> str:
         """Create rich text representation for embedding"""
-        parts = [
-            f"Source: {event.source}",
-            f"Content: {event.content.get('title', '')} {event.content.get('text', '')}",
-        ]
-        
-        if analysis:
-            parts.extend([
-                f"Severity: {analysis.get('severity', 'unknown')}",
-                f"Risk factors: {' '.join(analysis.get('risk_factors', []))}"
-            ])
-        
-        return " ".join(parts)
+        return create_text_representation(event, analysis)
     
     def _extract_asset(self, event: EventModel) -> str:
         """Extract crypto asset from event content"""
-        # Simple extraction - in production use NER
-        content_text = f"{event.content.get('title', '')} {event.content.get('text', '')}"
-        
-        common_assets = ['BTC', 'ETH', 'SOL', 'AVAX', 'MATIC', 'DOT']
-        for asset in common_assets:
-            if asset.lower() in content_text.lower():
-                return asset
-        
-        return "UNKNOWN"
\ No newline at end of file
+        return extract_asset(event)
+
+
+def namespace_for(encoder: Encoder, namespace: str = DEFAULT_NAMESPACE) -> str:
+    """Namespace for an encoder's vectors; fallback encoders get their own so
+    they never mix with (or are queried against) the model's vectors"""
+    if not encoder.fallback:
+        return namespace
+    return f"{namespace}-{re.sub(r'[^a-z0-9-]+', '-', encoder.name.lower())}"
+
+
+def create_text_representation(event: EventModel, analysis: Dict) -> str:
+    """Create rich text representation for embedding"""
+    parts = [
+        f"Source: {event.source}",
+        f"Content: {event.content.get('title', '')} {event.content.get('text', '')}",
+    ]
+    
+    if analysis:
+        parts.extend([
+            f"Severity: {analysis.get('severity', 'unknown')}",
+            f"Risk factors: {' '.join(analysis.get('risk_factors', []))}"
+        ])
+    
+    return " ".join(parts)
+
+
+def extract_asset(event: EventModel) -> str:
+    """Extract crypto asset from event content"""
+    # Simple extraction - in production use NER
+    content_text = f"{event.content.get('title', '')} {event.content.get('text', '')}"
+    
+    common_assets = ['BTC', 'ETH', 'SOL', 'AVAX', 'MATIC', 'DOT']
+    for asset in common_assets:
+        if asset.lower() in content_text.lower():
+            return asset
+    
+    return "UNKNOWN"
+
+
+def build_metadata(event: EventModel, analysis: Dict) -> Dict:
+    """Pinecone metadata stored alongside each event vector"""
+    return {
+        "event_id": str(event.id),
+        "source": event.source,
+        "timestamp": event.timestamp.isoformat(),
+        "confidence_score": analysis.get("confidence_score", 0),
+        "severity": analysis.get("severity", "low"),
+        "asset": extract_asset(event),
+        "sentiment": analysis.get("sentiment_score", 0),
+        "risk_factors": list(analysis.get("risk_factors", [])),
+        "title": str(event.content.get("title", ""))[:METADATA_TEXT_LIMIT],
+        "text": str(event.content.get("text", ""))[:METADATA_TEXT_LIMIT]
+    }
+
+
+def has_source_text(metadata: Dict) -> bool:
+    """Whether a vector's metadata carries the text needed to re-embed it
+
+    Vectors stored before source text was kept in metadata do not.
+    """
+    return "title" in metadata or "text" in metadata
+
+
+def record_from_metadata(event_id: str, metadata: Dict) -> Tuple[EventModel, Dict]:
+    """Rebuild the event and analysis stored in a vector's metadata"""
+    event = EventModel(
+        id=event_id,
+        source=metadata.get("source", "unknown"),
+        timestamp=metadata.get("timestamp") or datetime.now(timezone.utc),
+        content={"title": metadata.get("title", ""), "text": metadata.get("text", "")}
+    )
+    analysis = {
+        key: metadata[key]
+        for key in ("severity", "confidence_score", "risk_factors")
+        if key in metadata
+    }
+    if "sentiment" in metadata:
+        analysis["sentiment_score"] = metadata["sentiment"]
+    return event, analysis
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""Market Data Service: live feeds, ring-buffer history and rolling stats"""
+
+from .feeds import MarketFeed, ReplayFeed, CoinGeckoFeed, Tick, build_feed
+from .ring_buffer import RingBuffer, AssetSeries
+from .service import MarketDataService, SNAPSHOT_KEY
+
+__all__ = [
+    'MarketFeed',
+    'ReplayFeed',
+    'CoinGeckoFeed',
+    'Tick',
+    'build_feed',
+    'RingBuffer',
+    'AssetSeries',
+    'MarketDataService',
+    'SNAPSHOT_KEY'
+]
\ No newline at end of file
@@ -0,0 +1,153 @@
+# services/market_data/feeds.py
+import asyncio
+import csv
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+import httpx
+
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+# Pseudo-asset carrying total crypto market capitalisation as its "price"
+TOTAL_MARKET_CAP = "TOTAL"
+
+
+@dataclass
+class Tick:
+    """One price observation for an asset"""
+    asset: str
+    price: float
+    volume: float = 0.0
+    timestamp: float = 0.0  # unix seconds
+
+
+class MarketFeed(ABC):
+    """Async source of market ticks"""
+
+    @abstractmethod
+    def stream(self) -> AsyncIterator[Tick]:
+        """Yield ticks until the feed ends or the consumer stops iterating"""
+
+    async def close(self) -> None:
+        pass
+
+
+def _parse_timestamp(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def read_ticks(path: str) -> Iterator[Tick]:
+    """Ticks from a JSONL or CSV file with timestamp, asset, price and volume columns"""
+    with open(path, newline="") as f:
+        rows = csv.DictReader(f) if path.endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            yield Tick(
+                asset=str(row["asset"]).upper(),
+                price=float(row["price"]),
+                volume=float(row.get("volume") or 0.0),
+                timestamp=_parse_timestamp(row["timestamp"])
+            )
+
+
+class ReplayFeed(MarketFeed):
+    """Replays recorded ticks from a file, the local stand-in for a live feed.
+
+    ``speed`` scales the recorded gaps between ticks (2.0 replays twice as
+    fast); 0 replays as fast as the consumer reads.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+    async def stream(self) -> AsyncIterator[Tick]:
+        while True:
+            previous = None
+            for tick in read_ticks(self.path):
+                if self.speed > 0 and previous is not None and tick.timestamp > previous:
+                    await asyncio.sleep((tick.timestamp - previous) / self.speed)
+                previous = tick.timestamp
+                # Re-stamp so downstream staleness checks see a live feed
+                yield Tick(tick.asset, tick.price, tick.volume, time.time())
+            if not self.loop:
+                return
+
+
+class CoinGeckoFeed(MarketFeed):
+    """Polls CoinGecko for spot prices, 24h volumes and total market cap"""
+
+    BASE_URL = "https://api.coingecko.com/api/v3"
+
+    def __init__(self, assets: Dict[str, str], interval: float = 30.0, timeout: float = 10.0):
+        # assets maps our symbol to the CoinGecko coin id, e.g. {"BTC": "bitcoin"}
+        self.assets = assets
+        self.interval = interval
+        self._client = httpx.AsyncClient(base_url=self.BASE_URL, timeout=timeout)
+
+    async def stream(self) -> AsyncIterator[Tick]:
+        while True:
+            started = time.monotonic()
+            for tick in await self._poll():
+                yield tick
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def _poll(self) -> List[Tick]:
+        prices, global_data = await asyncio.gather(
+            self._client.get("/simple/price", params={
+                "ids": ",".join(self.assets.values()),
+                "vs_currencies": "usd",
+                "include_24hr_vol": "true"
+            }),
+            self._client.get("/global")
+        )
+        prices.raise_for_status()
+        global_data.raise_for_status()
+
+        now = time.time()
+        quotes = prices.json()
+        ticks = [
+            Tick(symbol, quotes[coin_id]["usd"], quotes[coin_id].get("usd_24h_vol", 0.0), now)
+            for symbol, coin_id in self.assets.items()
+            if coin_id in quotes
+        ]
+        market = global_data.json()["data"]
+        ticks.append(Tick(
+            TOTAL_MARKET_CAP,
+            market["total_market_cap"]["usd"],
+            market["total_volume"]["usd"],
+            now
+        ))
+        return ticks
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def parse_assets(spec: str) -> Dict[str, str]:
+    """Parse "BTC:bitcoin,ETH:ethereum" into a symbol -> CoinGecko id mapping"""
+    pairs = (item.split(":", 1) for item in spec.split(",") if item.strip())
+    return {symbol.strip().upper(): coin_id.strip() for symbol, coin_id in pairs}
+
+
+def build_feed(kind: str, assets: str = "BTC:bitcoin", interval: float = 30.0,
+               replay_path: Optional[str] = None, replay_speed: float = 1.0) -> Optional[MarketFeed]:
+    """Feed from settings: "coingecko", "replay" or "none" (no live market data)"""
+    if kind == "coingecko":
+        return CoinGeckoFeed(parse_assets(assets), interval=interval)
+    if kind == "replay":
+        if not replay_path:
+            raise ValueError("Replay market feed needs a file path (MARKET_REPLAY_PATH)")
+        return ReplayFeed(replay_path, speed=replay_speed, loop=True)
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown market feed: {kind}")
\ No newline at end of file
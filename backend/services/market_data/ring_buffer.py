@@ -0,0 +1,123 @@
+# services/market_data/ring_buffer.py
+import math
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity float64 ring buffer with O(1) running sum and sum of squares.
+
+    Running sums drift with floating point error, so they are recomputed
+    (vectorized) from the buffer once per full wrap.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.head = 0  # next write position
+        self.count = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self._writes_since_resync = 0
+
+    def push(self, value: float) -> Optional[float]:
+        """Append a value; returns the evicted value once the buffer is full"""
+        evicted = None
+        if self.count == self.capacity:
+            evicted = float(self.values[self.head])
+            self.sum -= evicted
+            self.sumsq -= evicted * evicted
+        else:
+            self.count += 1
+
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.sum += value
+        self.sumsq += value * value
+
+        self._writes_since_resync += 1
+        if self._writes_since_resync >= self.capacity:
+            self._resync()
+        return evicted
+
+    def _resync(self) -> None:
+        window = self.values[:self.count] if self.count < self.capacity else self.values
+        self.sum = float(window.sum())
+        self.sumsq = float(np.dot(window, window))
+        self._writes_since_resync = 0
+
+    @property
+    def last(self) -> float:
+        return float(self.values[(self.head - 1) % self.capacity]) if self.count else math.nan
+
+    @property
+    def oldest(self) -> float:
+        if not self.count:
+            return math.nan
+        return float(self.values[0] if self.count < self.capacity else self.values[self.head])
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.sumsq - self.sum * self.sum / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def view(self) -> np.ndarray:
+        """Values in insertion order (oldest first); copies only when wrapped"""
+        if self.count < self.capacity:
+            return self.values[:self.count]
+        return np.concatenate((self.values[self.head:], self.values[:self.head]))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class AssetSeries:
+    """Rolling market statistics for one asset, updated in O(1) per tick"""
+
+    def __init__(self, window: int = 1440):
+        self.window = window
+        self.prices = RingBuffer(window)
+        self.volumes = RingBuffer(window)
+        self.log_returns = RingBuffer(window - 1)
+        self.timestamps = RingBuffer(window)
+        # Monotonic deque of (sequence, price) for the rolling max (drawdown)
+        self._max_deque: Deque[Tuple[int, float]] = deque()
+        self._seq = 0
+
+    def push(self, timestamp: float, price: float, volume: float = 0.0) -> None:
+        if self.prices.count and self.prices.last > 0 and price > 0:
+            self.log_returns.push(math.log(price / self.prices.last))
+        self.prices.push(price)
+        self.volumes.push(volume)
+        self.timestamps.push(timestamp)
+
+        while self._max_deque and self._max_deque[-1][1] <= price:
+            self._max_deque.pop()
+        self._max_deque.append((self._seq, price))
+        if self._max_deque[0][0] <= self._seq - self.window:
+            self._max_deque.popleft()
+        self._seq += 1
+
+    def stats(self) -> Dict[str, float]:
+        price = self.prices.last
+        oldest = self.prices.oldest
+        window_max = self._max_deque[0][1] if self._max_deque else price
+        volume_std = self.volumes.std
+        return {
+            "price": price,
+            "timestamp": self.timestamps.last,
+            "rolling_return": price / oldest - 1 if oldest else 0.0,
+            "volatility": self.log_returns.std,
+            "drawdown": price / window_max - 1 if window_max else 0.0,
+            "volume": self.volumes.last,
+            "volume_zscore": (self.volumes.last - self.volumes.mean) / volume_std if volume_std else 0.0,
+            "samples": len(self.prices)
+        }
\ No newline at end of file
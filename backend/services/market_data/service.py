@@ -0,0 +1,119 @@
+# services/market_data/service.py
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+from redis import asyncio as aioredis
+
+from config.redis import payload_codec
+from shared.utils.codec import Codec
+from shared.utils.logger import get_logger
+from .feeds import TOTAL_MARKET_CAP, MarketFeed, Tick
+from .ring_buffer import AssetSeries
+
+logger = get_logger()
+
+# Metrics
+market_ticks = Counter('market_data_ticks_total', 'Market ticks ingested', ['asset'])
+market_feed_errors = Counter('market_data_feed_errors_total', 'Market feed failures')
+market_last_tick = Gauge('market_data_last_tick_timestamp', 'Unix time of the latest tick', ['asset'])
+
+SNAPSHOT_KEY = "market:snapshot"
+
+
+class MarketDataService:
+    """Consumes a market feed into per-asset ring buffers and serves snapshots.
+
+    Rolling stats are maintained incrementally on every tick, and the
+    snapshot dict is rebuilt only when ticks have arrived since the last
+    call, so readers on the request path pay O(1). When a Redis client is
+    given the snapshot is also published periodically, as a codec payload,
+    for other processes (e.g. the Celery market health check).
+    """
+
+    def __init__(
+        self,
+        feed: Optional[MarketFeed],
+        window: int = 1440,
+        redis: Optional[aioredis.Redis] = None,
+        publish_interval: float = 15.0,
+        snapshot_ttl: int = 600,
+        codec: Codec = payload_codec
+    ):
+        self.feed = feed
+        self.window = window
+        self.redis = redis
+        self.publish_interval = publish_interval
+        self.snapshot_ttl = snapshot_ttl
+        self.codec = codec
+        self.series: Dict[str, AssetSeries] = {}
+        self._snapshot: Optional[Dict] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def ingest(self, tick: Tick) -> None:
+        series = self.series.get(tick.asset)
+        if series is None:
+            series = self.series[tick.asset] = AssetSeries(self.window)
+        series.push(tick.timestamp, tick.price, tick.volume)
+        self._snapshot = None
+        market_ticks.labels(asset=tick.asset).inc()
+        market_last_tick.labels(asset=tick.asset).set(tick.timestamp)
+
+    def snapshot(self) -> Dict:
+        """Latest prices and rolling stats for every asset"""
+        if self._snapshot is None:
+            assets = {asset: series.stats() for asset, series in self.series.items()}
+            latest = max((stats["timestamp"] for stats in assets.values()), default=None)
+            self._snapshot = {
+                "as_of": datetime.fromtimestamp(latest, timezone.utc).isoformat() if latest else None,
+                "btc_price": assets["BTC"]["price"] if "BTC" in assets else None,
+                "total_market_cap": assets[TOTAL_MARKET_CAP]["price"] if TOTAL_MARKET_CAP in assets else None,
+                "assets": assets
+            }
+        return self._snapshot
+
+    async def start(self) -> None:
+        if self.feed is None:
+            logger.warning("No market feed configured, market snapshots will be empty")
+            return
+        self._tasks.append(asyncio.create_task(self._consume()))
+        if self.redis is not None:
+            self._tasks.append(asyncio.create_task(self._publish()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.feed is not None:
+            await self.feed.close()
+
+    async def _consume(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                async for tick in self.feed.stream():
+                    self.ingest(tick)
+                    delay = 1.0
+                logger.info("Market feed ended")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                market_feed_errors.inc()
+                logger.error("Market feed failed", error=str(e), retry_in=delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    async def _publish(self) -> None:
+        while True:
+            await asyncio.sleep(self.publish_interval)
+            if not self.series:
+                continue
+            try:
+                payload = {**self.snapshot(), "published_at": time.time()}
+                await self.redis.set(SNAPSHOT_KEY, self.codec.encode(payload), ex=self.snapshot_ttl)
+            except Exception as e:
+                logger.error("Failed to publish market snapshot", error=str(e))
\ No newline at end of file
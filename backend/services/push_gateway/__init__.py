@@ -0,0 +1,21 @@
+"""Push Gateway: fans events:analyzed out to WebSocket and SSE clients"""
+
+from .hub import (
+    PushHub,
+    Subscriber,
+    Frame,
+    CHANNELS,
+    DROP_OLDEST,
+    DISCONNECT,
+    push_subscribers
+)
+
+__all__ = [
+    'PushHub',
+    'Subscriber',
+    'Frame',
+    'CHANNELS',
+    'DROP_OLDEST',
+    'DISCONNECT',
+    'push_subscribers'
+]
\ No newline at end of file
@@ -0,0 +1,244 @@
+# services/push_gateway/hub.py
+import asyncio
+from collections import deque
+from typing import Callable, Deque, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+import orjson
+from prometheus_client import Counter, Gauge
+from redis import asyncio as aioredis
+
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+# Metrics
+push_subscribers = Gauge('push_subscribers', 'Open push connections', ['transport'])
+push_messages = Counter('push_messages_total', 'Stream messages fanned out by the push hub')
+push_dropped = Counter('push_frames_dropped_total', 'Frames dropped for slow push consumers', ['reason'])
+
+# (stream message ID, channel, JSON payload)
+Frame = Tuple[str, str, bytes]
+
+# Channels clients can subscribe to, as filters over events:analyzed messages
+CHANNELS: Dict[str, Callable[[Mapping], bool]] = {
+    "events:analyzed": lambda fields: True,
+    "alerts:high": lambda fields: fields.get("severity") in ("high", "critical"),
+    "alerts:critical": lambda fields: fields.get("severity") == "critical",
+}
+
+DROP_OLDEST = "drop_oldest"
+DISCONNECT = "disconnect"
+
+
+def stream_id_key(message_id: str) -> Tuple[int, int]:
+    """Sortable form of a Redis stream ID ("<ms>-<seq>")"""
+    ms, _, seq = message_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def frames_for(message_id: str, fields: Mapping, channels: Iterable[str]) -> List[Frame]:
+    payload = orjson.dumps(fields)
+    return [(message_id, channel, payload) for channel in channels if CHANNELS[channel](fields)]
+
+
+class Subscriber:
+    """One push connection's outbox.
+
+    ``offer`` never blocks the hub: frames queue up to ``max_pending`` and
+    past that the oldest are dropped (or, with the ``disconnect`` policy, the
+    connection is closed so the client reconnects and resumes from its last
+    ID). The connection's writer takes everything pending at once, so a slow
+    client gets fewer, larger writes instead of falling further behind.
+    """
+
+    def __init__(self, channels: Iterable[str], max_pending: int = 256, drop_policy: str = DROP_OLDEST):
+        self.channels = frozenset(channels)
+        self.max_pending = max_pending
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.closed = False
+        self.overflowed = False
+        self._pending: Deque[Frame] = deque()
+        self._ready = asyncio.Event()
+        self._resume_floor: Optional[Tuple[int, int]] = None
+
+    def offer(self, frame: Frame) -> None:
+        self.offer_many([frame])
+
+    def offer_many(self, frames: List[Frame]) -> None:
+        if self.closed or not frames:
+            return
+        if self._resume_floor is not None:
+            # Skip what the resume backlog already covered
+            frames = [frame for frame in frames if stream_id_key(frame[0]) > self._resume_floor]
+            if not frames:
+                return
+            self._resume_floor = None
+        overflow = len(self._pending) + len(frames) - self.max_pending
+        if overflow > 0:
+            if self.drop_policy == DISCONNECT:
+                push_dropped.labels(reason="disconnect").inc(len(self._pending) + len(frames))
+                self.overflowed = True
+                self.close()
+                return
+            from_pending = min(overflow, len(self._pending))
+            for _ in range(from_pending):
+                self._pending.popleft()
+            frames = frames[overflow - from_pending:]
+            self.dropped += overflow
+            push_dropped.labels(reason="overflow").inc(overflow)
+        self._pending.extend(frames)
+        self._ready.set()
+
+    def prepend_backlog(self, frames: List[Frame]) -> None:
+        """Queue missed frames ahead of live ones, skipping live duplicates"""
+        if not frames:
+            return
+        self._resume_floor = stream_id_key(frames[-1][0])
+        live = [frame for frame in self._pending if stream_id_key(frame[0]) > self._resume_floor]
+        self._pending = deque(frames + live)
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def next_batch(self, max_frames: int = 500, timeout: Optional[float] = None) -> Tuple[List[Frame], int]:
+        """Wait for frames; returns (frames, frames dropped since the last batch).
+
+        Returns empty on timeout (for keepalives) or once closed.
+        """
+        if not self._pending and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        count = min(len(self._pending), max_frames)
+        frames = [self._pending.popleft() for _ in range(count)]
+        if self._pending:
+            self._ready.set()
+        dropped, self.dropped = self.dropped, 0
+        return frames, dropped
+
+
+class PushHub:
+    """Fans events:analyzed out to push connections.
+
+    One XREAD loop per process reads the stream (no consumer group: every
+    process sees every message) and offers each batch to the subscribers of
+    the channels it matches, serializing each message once. Clients
+    reconnecting with their last stream ID get the gap replayed from the
+    stream (up to ``resume_limit`` messages) before live messages.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        stream_key: str = "events:analyzed",
+        block_ms: int = 5000,
+        batch_size: int = 500,
+        resume_limit: int = 1000
+    ):
+        self.redis = redis
+        self.stream_key = stream_key
+        self.block_ms = block_ms
+        self.batch_size = batch_size
+        self.resume_limit = resume_limit
+        self.last_id = "$"
+        self._groups: Dict[FrozenSet[str], Set[Subscriber]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        # Start from the newest message so "$" does not skip anything
+        # published between reads
+        latest = await self.redis.xrevrange(self.stream_key, count=1)
+        self.last_id = latest[0][0] if latest else "0-0"
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for subscriber in self.subscribers():
+            subscriber.close()
+
+    def subscribers(self) -> Set[Subscriber]:
+        return set().union(*self._groups.values())
+
+    async def subscribe(self, channels: Iterable[str], last_id: Optional[str] = None, **options) -> Subscriber:
+        """Register a connection; with ``last_id`` the missed messages are
+        queued first. ValueError for unknown channels or a malformed ID."""
+        channels = list(channels)
+        unknown = [channel for channel in channels if channel not in CHANNELS]
+        if unknown or not channels:
+            raise ValueError(f"Unknown channels: {', '.join(unknown)}" if unknown else "No channels")
+        if last_id is not None:
+            stream_id_key(last_id)
+
+        subscriber = Subscriber(channels, **options)
+        self._groups.setdefault(subscriber.channels, set()).add(subscriber)
+
+        if last_id is not None:
+            missed = await self.redis.xrange(self.stream_key, min=f"({last_id}", max="+", count=self.resume_limit)
+            backlog = [frame for message_id, fields in missed for frame in frames_for(message_id, fields, subscriber.channels)]
+            if len(missed) == self.resume_limit:
+                # More than we replay: the client sees a gap notice
+                subscriber.dropped += 1
+            subscriber.prepend_backlog(backlog)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        group = self._groups.get(subscriber.channels)
+        if group is not None:
+            group.discard(subscriber)
+            if not group:
+                del self._groups[subscriber.channels]
+
+    def publish(self, message_id: str, fields: Mapping) -> None:
+        """Offer one stream message to every matching subscriber"""
+        self.publish_many([(message_id, fields)])
+
+    def publish_many(self, messages: List[Tuple[str, Mapping]]) -> None:
+        """Offer a batch of stream messages to every matching subscriber.
+
+        Subscribers are grouped by channel set, so each group's frame list is
+        built once and handed to every member in a single call.
+        """
+        push_messages.inc(len(messages))
+        payloads = [orjson.dumps(fields) for _, fields in messages]
+        for channels, subscribers in self._groups.items():
+            ordered = [channel for channel in CHANNELS if channel in channels]
+            frames = [
+                (message_id, channel, payload)
+                for (message_id, fields), payload in zip(messages, payloads)
+                for channel in ordered if CHANNELS[channel](fields)
+            ]
+            if not frames:
+                continue
+            for subscriber in subscribers:
+                subscriber.offer_many(frames)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                response = await self.redis.xread(
+                    {self.stream_key: self.last_id},
+                    count=self.batch_size,
+                    block=self.block_ms
+                )
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Push hub read failed", error=str(e))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+
+            for _, messages in response or []:
+                if messages:
+                    self.publish_many(messages)
+                    self.last_id = messages[-1][0]
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""Risk Engine: quantitative signals computed ahead of LLM analysis"""
+
+from .anomaly import AnomalyDetector, AnomalySignal
+
+__all__ = ['AnomalyDetector', 'AnomalySignal']
\ No newline at end of file
@@ -0,0 +1,279 @@
+# services/risk_engine/anomaly.py
+"""Streaming per-asset anomaly detection over event flow
+
+Each asset keeps EWMA mean/variance and two-sided CUSUM statistics for
+three features: event rate, event sentiment and price move since the
+asset's previous event. Updates are O(1) per event; ``update`` processes a
+batch with NumPy, one vectorized step per "round" in which every asset
+appears at most once, so ordering within an asset is preserved.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from prometheus_client import Counter, Histogram
+
+from shared.models.event import EventModel
+
+# Metrics
+anomaly_scores = Histogram(
+    'anomaly_score', 'Anomaly score per event',
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+)
+anomaly_decisions = Counter('anomaly_escalations_total', 'LLM escalation decisions', ['decision'])
+
+FEATURES = ("event_rate", "sentiment", "price_move")
+# The decayed event rate is strongly autocorrelated, which would make CUSUM
+# drift upward between bursts; it is scored on its z-score alone
+CUSUM_FEATURES = np.array([False, True, True])
+
+# Below this many events per round, batches take the scalar path
+MIN_ROUND_WIDTH = 16
+
+
+@dataclass
+class AnomalySignal:
+    """Anomaly score for one event and whether it warrants deep LLM analysis"""
+    asset: str
+    score: float
+    escalate: bool
+    zscores: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {"asset": self.asset, "score": self.score, "escalate": self.escalate, "zscores": self.zscores}
+
+
+def event_sentiment(event: EventModel) -> Optional[float]:
+    """Upstream sentiment score, if the event carries one"""
+    value = getattr(event, "sentiment_score", None)
+    if value is None:
+        value = (event.metadata or {}).get("sentiment_score", event.content.get("sentiment_score"))
+    return float(value) if value is not None else None
+
+
+class AnomalyDetector:
+    """Per-asset EWMA z-score and CUSUM detector.
+
+    The score is the largest of |z| / z_threshold and CUSUM / cusum_threshold
+    across features, capped at 1. Features with fewer than ``warmup``
+    observations do not contribute.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.02,
+        rate_half_life: float = 300.0,
+        z_threshold: float = 3.0,
+        cusum_drift: float = 0.5,
+        cusum_threshold: float = 5.0,
+        escalation_score: float = 1.0,
+        warmup: int = 50,
+        capacity: int = 64
+    ):
+        self.alpha = alpha
+        self.rate_decay = math.log(2) / rate_half_life
+        self.z_threshold = z_threshold
+        self.cusum_drift = cusum_drift
+        self.cusum_threshold = cusum_threshold
+        self.escalation_score = escalation_score
+        self.warmup = warmup
+
+        self._rows: Dict[str, int] = {}
+        k = len(FEATURES)
+        self.mean = np.zeros((capacity, k))
+        self.var = np.zeros((capacity, k))
+        self.count = np.zeros((capacity, k), dtype=np.int64)
+        self.cusum_pos = np.zeros((capacity, k))
+        self.cusum_neg = np.zeros((capacity, k))
+        self.rate = np.zeros(capacity)
+        self.last_time = np.full(capacity, np.nan)
+        self.last_price = np.full(capacity, np.nan)
+
+    def _row(self, asset: str) -> int:
+        row = self._rows.get(asset)
+        if row is None:
+            row = self._rows[asset] = len(self._rows)
+            if row == len(self.rate):
+                self._grow()
+        return row
+
+    def _grow(self) -> None:
+        for name in ("mean", "var", "count", "cusum_pos", "cusum_neg"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+        self.rate = np.concatenate([self.rate, np.zeros_like(self.rate)])
+        for name in ("last_time", "last_price"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.full_like(array, np.nan)]))
+
+    def update(
+        self,
+        assets: Sequence[str],
+        timestamps: np.ndarray,
+        sentiments: np.ndarray,
+        prices: np.ndarray
+    ) -> tuple:
+        """Process a batch in arrival order; missing values are NaN.
+
+        Returns (scores, zscores) with shapes (n,) and (n, len(FEATURES)).
+        """
+        rows = np.fromiter((self._row(a) for a in assets), dtype=np.int64, count=len(assets))
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        sentiments = np.asarray(sentiments, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        scores = np.zeros(len(rows))
+        zscores = np.zeros((len(rows), len(FEATURES)))
+
+        # Occurrence number of each event within its asset
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_rows)) + 1]
+        group_sizes = np.diff(np.r_[group_start, len(rows)])
+        occurrence = np.empty(len(rows), dtype=np.int64)
+        occurrence[order] = np.arange(len(rows)) - np.repeat(group_start, group_sizes)
+
+        rounds = int(occurrence.max(initial=-1)) + 1
+        if rounds and len(rows) / rounds < MIN_ROUND_WIDTH:
+            # Few assets: NumPy call overhead on tiny rounds exceeds the scalar path
+            events = zip(rows.tolist(), timestamps.tolist(), sentiments.tolist(), prices.tolist())
+            for i, (row, t, sentiment, price) in enumerate(events):
+                scores[i], zscores[i] = self._step_one(row, t, sentiment, price)
+            return scores, zscores
+
+        for k in range(rounds):
+            idx = np.flatnonzero(occurrence == k)
+            scores[idx], zscores[idx] = self._step(rows[idx], timestamps[idx], sentiments[idx], prices[idx])
+        return scores, zscores
+
+    def _step(self, rows: np.ndarray, t: np.ndarray, sentiment: np.ndarray, price: np.ndarray) -> tuple:
+        # Event rate: exponentially decayed event count per asset
+        elapsed = np.nan_to_num(t - self.last_time[rows], nan=0.0).clip(min=0.0)
+        rate = self.rate[rows] * np.exp(-self.rate_decay * elapsed) + 1.0
+        self.rate[rows] = rate
+        self.last_time[rows] = t
+
+        # Price move since this asset's previous event, scaled to a per-sqrt-second
+        # return so that moves over long and short gaps are comparable
+        previous = self.last_price[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            move = np.log(price / previous) / np.sqrt(np.maximum(elapsed, 1.0))
+        self.last_price[rows] = np.where(np.isnan(price), previous, price)
+
+        x = np.column_stack((rate, sentiment, move))
+        seen = ~np.isnan(x)
+        mean, var, count = self.mean[rows], self.var[rows], self.count[rows]
+
+        diff = np.where(seen, x - mean, 0.0)
+        # Bias-correct the EWMA variance, which starts from zero
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(var / (1 - (1 - self.alpha) ** (count - 1)))
+        z = np.divide(diff, std, out=np.zeros_like(diff), where=(std > 0) & (count >= self.warmup))
+
+        first = seen & (count == 0)
+        mean = np.where(first, np.nan_to_num(x), mean + self.alpha * diff)
+        var = np.where(first, 0.0, np.where(seen, (1 - self.alpha) * (var + self.alpha * diff * diff), var))
+        self.mean[rows], self.var[rows], self.count[rows] = mean, var, count + seen
+
+        active = (z != 0) & CUSUM_FEATURES
+        pos = np.where(active, np.maximum(0.0, self.cusum_pos[rows] + z - self.cusum_drift), self.cusum_pos[rows])
+        neg = np.where(active, np.maximum(0.0, self.cusum_neg[rows] - z - self.cusum_drift), self.cusum_neg[rows])
+        cusum = np.where(active, np.maximum(pos, neg), 0.0)
+        ratio = np.maximum(np.abs(z) / self.z_threshold, cusum / self.cusum_threshold)
+        # Reset CUSUM once it has fired so one shift does not escalate forever
+        fired = cusum >= self.cusum_threshold
+        self.cusum_pos[rows] = np.where(fired, 0.0, pos)
+        self.cusum_neg[rows] = np.where(fired, 0.0, neg)
+
+        return np.minimum(ratio.max(axis=1), 1.0), z
+
+    def _step_one(self, row: int, t: float, sentiment: float, price: float) -> Tuple[float, List[float]]:
+        """Scalar twin of ``_step`` for a single event"""
+        last_time = float(self.last_time[row])
+        elapsed = max(t - last_time, 0.0) if last_time == last_time else 0.0
+        rate = float(self.rate[row]) * math.exp(-self.rate_decay * elapsed) + 1.0
+        self.rate[row] = rate
+        self.last_time[row] = t
+
+        previous = float(self.last_price[row])
+        move = math.nan
+        if price == price:
+            if previous > 0 and price > 0:
+                move = math.log(price / previous) / math.sqrt(max(elapsed, 1.0))
+            self.last_price[row] = price
+
+        mean, var, count = self.mean[row].tolist(), self.var[row].tolist(), self.count[row].tolist()
+        cusum_pos, cusum_neg = self.cusum_pos[row].tolist(), self.cusum_neg[row].tolist()
+        z = [0.0, 0.0, 0.0]
+        ratio = 0.0
+        for j, x in enumerate((rate, sentiment, move)):
+            if x != x:
+                continue
+            if count[j] == 0:
+                mean[j], var[j], count[j] = x, 0.0, 1
+                continue
+            diff = x - mean[j]
+            if var[j] > 0 and count[j] >= self.warmup:
+                z[j] = diff / math.sqrt(var[j] / (1 - (1 - self.alpha) ** (count[j] - 1)))
+            mean[j] += self.alpha * diff
+            var[j] = (1 - self.alpha) * (var[j] + self.alpha * diff * diff)
+            count[j] += 1
+
+            ratio = max(ratio, abs(z[j]) / self.z_threshold)
+            if z[j] != 0 and CUSUM_FEATURES[j]:
+                cusum_pos[j] = max(0.0, cusum_pos[j] + z[j] - self.cusum_drift)
+                cusum_neg[j] = max(0.0, cusum_neg[j] - z[j] - self.cusum_drift)
+                ratio = max(ratio, max(cusum_pos[j], cusum_neg[j]) / self.cusum_threshold)
+                if max(cusum_pos[j], cusum_neg[j]) >= self.cusum_threshold:
+                    cusum_pos[j] = cusum_neg[j] = 0.0
+
+        self.mean[row], self.var[row], self.count[row] = mean, var, count
+        self.cusum_pos[row], self.cusum_neg[row] = cusum_pos, cusum_neg
+        return min(ratio, 1.0), z
+
+    def observe(self, event: EventModel, asset: str, market_data: Optional[Dict] = None) -> AnomalySignal:
+        """Score one event against its asset's history and update the state"""
+        quote = ((market_data or {}).get("assets") or {}).get(asset) or {}
+        sentiment = event_sentiment(event)
+        score, z = self._step_one(
+            self._row(asset),
+            event.timestamp.timestamp(),
+            math.nan if sentiment is None else sentiment,
+            float(quote.get("price", math.nan))
+        )
+        signal = self._signal(asset, score, z)
+        anomaly_scores.observe(signal.score)
+        anomaly_decisions.labels(decision="escalate" if signal.escalate else "skip").inc()
+        return signal
+
+    def observe_many(
+        self,
+        events: List[EventModel],
+        assets: List[str],
+        market_data: Optional[Dict] = None
+    ) -> List[AnomalySignal]:
+        """Vectorized ``observe`` for a batch of events in arrival order"""
+        quotes = (market_data or {}).get("assets") or {}
+        sentiments = [event_sentiment(event) for event in events]
+        scores, zscores = self.update(
+            assets,
+            np.array([event.timestamp.timestamp() for event in events]),
+            np.array([np.nan if s is None else s for s in sentiments], dtype=np.float64),
+            np.array([(quotes.get(asset) or {}).get("price", np.nan) for asset in assets], dtype=np.float64)
+        )
+        signals = [self._signal(asset, float(score), z) for asset, score, z in zip(assets, scores, zscores)]
+        for signal in signals:
+            anomaly_scores.observe(signal.score)
+        escalated = sum(signal.escalate for signal in signals)
+        anomaly_decisions.labels(decision="escalate").inc(escalated)
+        anomaly_decisions.labels(decision="skip").inc(len(signals) - escalated)
+        return signals
+
+    def _signal(self, asset: str, score: float, z: Sequence[float]) -> AnomalySignal:
+        return AnomalySignal(
+            asset=asset,
+            score=round(score, 4),
+            escalate=score >= self.escalation_score,
+            zscores={name: round(float(value), 3) for name, value in zip(FEATURES, z)}
+        )
\ No newline at end of file
@@ -1,6 +1,17 @@
-"""Shared middleware for authentication and rate limiting"""
+"""Shared middleware for authentication, rate limiting and admission control"""
 
-from .auth import AuthMiddleware, security
-from .rate_limit import RateLimitMiddleware
+from .admission import AdmissionController, AdmissionRejected, GradientLimit
+from .auth import AuthMiddleware, TokenCache, TokenRevocations, security
+from .rate_limit import RateLimiter, RateLimitMiddleware
 
-__all__ = ['AuthMiddleware', 'RateLimitMiddleware', 'security']
\ No newline at end of file
+__all__ = [
+    'AdmissionController',
+    'AdmissionRejected',
+    'AuthMiddleware',
+    'GradientLimit',
+    'RateLimiter',
+    'RateLimitMiddleware',
+    'TokenCache',
+    'TokenRevocations',
+    'security'
+]
\ No newline at end of file
@@ -0,0 +1,218 @@
+# shared/middleware/admission.py
+import asyncio
+import math
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+# Metrics
+admission_inflight = Gauge('admission_inflight', 'Admitted requests running', ['name'])
+admission_queued = Gauge('admission_queued', 'Requests waiting for admission', ['name'])
+admission_limit = Gauge('admission_concurrency_limit', 'Current estimated concurrency limit', ['name'])
+admission_rejected = Counter('admission_rejected_total', 'Requests refused admission', ['name', 'reason'])
+admission_wait = Histogram(
+    'admission_wait_seconds', 'Time spent queued before admission', ['name'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+
+
+class AdmissionRejected(Exception):
+    """Over capacity: ``status_code`` is 429 when the queue is full, 503 when
+    the bounded wait ran out"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = 429 if reason == "queue_full" else 503
+
+    @property
+    def headers(self) -> dict:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class GradientLimit:
+    """Concurrency limit from the gradient between baseline and current
+    downstream latency (in the style of Netflix's gradient limiter).
+
+    Samples are summarised as medians over windows of ``window_size``; the
+    baseline is the lowest median of the last ``baseline_windows``
+    windows. While the current median stays within ``tolerance`` of the
+    baseline the limit grows by about sqrt(limit) per window; above it the
+    limit shrinks in proportion, at most by half. Windows in which less than
+    half the limit was in use never raise it, so an idle service does not
+    talk itself into a huge limit. Errors and timeouts cut the limit by
+    ``backoff``.
+    """
+
+    def __init__(
+        self,
+        initial: float = 16,
+        min_limit: float = 2,
+        max_limit: float = 256,
+        tolerance: float = 1.25,
+        smoothing: float = 0.5,
+        window_size: int = 10,
+        baseline_windows: int = 300,
+        backoff: float = 0.9
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.window_size = window_size
+        self.backoff = backoff
+        self._window: List[float] = []
+        self._busy = False
+        self._medians: Deque[float] = deque(maxlen=baseline_windows)
+
+    @property
+    def baseline(self) -> Optional[float]:
+        return min(self._medians) if self._medians else None
+
+    def observe(self, rtt: float, inflight: int) -> float:
+        self._window.append(rtt)
+        self._busy = self._busy or inflight >= self.limit / 2
+        if len(self._window) < self.window_size:
+            return self.limit
+        sample = statistics.median(self._window)
+        busy, self._window, self._busy = self._busy, [], False
+        self._medians.append(sample)
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / sample))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        if target > self.limit and not busy:
+            return self.limit
+        self.limit = self._clamp(self.limit * (1 - self.smoothing) + target * self.smoothing)
+        return self.limit
+
+    def on_drop(self) -> float:
+        self.limit = self._clamp(self.limit * self.backoff)
+        return self.limit
+
+    def _clamp(self, limit: float) -> float:
+        return max(self.min_limit, min(self.max_limit, limit))
+
+
+class AdmissionController:
+    """Bounds concurrent work by an adaptive limit with a bounded FIFO queue.
+
+    Requests beyond the limit wait up to ``max_wait`` seconds for a slot;
+    with ``max_queue`` already waiting they are refused at once. Latency
+    samples come from the downstream calls themselves (``observe``), so
+    cache hits and queueing do not distort the estimate.
+    """
+
+    def __init__(
+        self,
+        name: str = "analyze",
+        limit: Optional[GradientLimit] = None,
+        max_queue: int = 64,
+        max_wait: float = 5.0
+    ):
+        self.name = name
+        self.limiter = limit or GradientLimit()
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Smoothed time a slot is held, for Retry-After estimates
+        self._service_time = 1.0
+        admission_limit.labels(name=name).set(self.limiter.limit)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def limit(self) -> int:
+        return int(self.limiter.limit)
+
+    def retry_after(self) -> float:
+        """Roughly how long until the current queue clears"""
+        return (self.queued + 1) * self._service_time / max(1, self.limit)
+
+    def observe(self, seconds: float) -> None:
+        """Downstream (LLM, vector store) latency of one admitted request"""
+        self.limiter.observe(seconds, self._inflight)
+        admission_limit.labels(name=self.name).set(self.limiter.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._inflight += 1
+                waiter.set_result(None)
+        self._report()
+
+    def _report(self) -> None:
+        admission_inflight.labels(name=self.name).set(self._inflight)
+        admission_queued.labels(name=self.name).set(len(self._waiters))
+
+    async def acquire(self) -> None:
+        if self._inflight < self.limit and not self._waiters:
+            self._inflight += 1
+            self._report()
+            return
+        if len(self._waiters) >= self.max_queue:
+            admission_rejected.labels(name=self.name, reason="queue_full").inc()
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                admission_rejected.labels(name=self.name, reason="timeout").inc()
+                raise AdmissionRejected("timeout", self.retry_after())
+        except asyncio.CancelledError:
+            # Caller went away; hand back a slot granted in the meantime
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            waiter.cancel()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            self._report()
+            admission_wait.labels(name=self.name).observe(time.perf_counter() - started)
+
+    def release(self) -> None:
+        self._inflight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one admission slot; errors inside count as drops"""
+        await self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.limiter.on_drop()
+            admission_limit.labels(name=self.name).set(self.limiter.limit)
+            raise
+        finally:
+            self._service_time += 0.1 * (time.perf_counter() - started - self._service_time)
+            self.release()
\ No newline at end of file
@@ -1,36 +1,207 @@
 # shared/middleware/auth.py
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from prometheus_client import Counter, Gauge
+from redis import asyncio as aioredis
 import jwt
 from datetime import datetime, timedelta, timezone
 
+from shared.utils.logger import get_logger
+
+logger = get_logger()
+
+# Metrics (hit rate = hit / (hit + miss))
+token_cache_lookups = Counter('auth_token_cache_lookups_total', 'Verified-token cache lookups', ['result'])
+token_cache_entries = Gauge('auth_token_cache_entries', 'Verified tokens held in the cache')
+tokens_revoked = Gauge('auth_tokens_revoked', 'Unexpired revoked token IDs known to this process')
+
+REVOCATION_KEY = "auth:revoked"
+REVOCATION_CHANNEL = "auth:revocations"
+
 security = HTTPBearer()
+# For routes that work anonymously but need the caller when one is given
+optional_security = HTTPBearer(auto_error=False)
+
+
+class TokenCache:
+    """Verified JWT payloads keyed by token digest, LRU-bounded.
+
+    An entry lives until its token's own ``exp``; token IDs in ``revoked``
+    are refused even if cached.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        # jti -> token expiry; dropped once the token would be expired anyway
+        self.revoked: Dict[str, float] = {}
+        self._hits = token_cache_lookups.labels(result="hit")
+        self._misses = token_cache_lookups.labels(result="miss")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: bytes) -> Optional[dict]:
+        entry = self._entries.get(digest)
+        if entry is not None:
+            payload, expires_at = entry
+            if expires_at > time.time() and payload.get("jti") not in self.revoked:
+                self._entries.move_to_end(digest)
+                self._hits.inc()
+                return payload
+            del self._entries[digest]
+        self._misses.inc()
+        return None
+
+    def put(self, digest: bytes, payload: dict) -> None:
+        self._entries[digest] = (payload, int(payload["exp"]))
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        token_cache_entries.set(len(self._entries))
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        self.revoked[jti] = expires_at
+
+    def prune(self) -> None:
+        """Forget expired tokens and revocations"""
+        now = time.time()
+        self.revoked = {jti: exp for jti, exp in self.revoked.items() if exp > now}
+        for digest in [d for d, (_, exp) in self._entries.items() if exp <= now]:
+            del self._entries[digest]
+        token_cache_entries.set(len(self._entries))
+        tokens_revoked.set(len(self.revoked))
+
+
+# Shared by every AuthMiddleware in the process; digests are keyed by the
+# signing secret, so instances with different secrets cannot collide
+token_cache = TokenCache()
+
+
+class TokenRevocations:
+    """Revoked token IDs, consistent across workers.
+
+    Revocations are stored in a Redis sorted set scored by token expiry and
+    announced on a pub/sub channel. ``run`` applies announcements to the
+    local TokenCache and reloads the whole set each time it (re)subscribes,
+    so revocations published while disconnected are not missed.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        cache: Optional[TokenCache] = None,
+        key: str = REVOCATION_KEY,
+        channel: str = REVOCATION_CHANNEL,
+        prune_interval: float = 60.0
+    ):
+        self.redis = redis
+        self.cache = cache if cache is not None else token_cache
+        self.key = key
+        self.channel = channel
+        self.prune_interval = prune_interval
+
+    async def revoke(self, payload: dict) -> bool:
+        """Revoke a verified token; False if it has no ID to revoke by"""
+        jti = payload.get("jti")
+        if not jti:
+            return False
+        expires_at = float(payload["exp"])
+        self.cache.revoke(jti, expires_at)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(self.key, {jti: expires_at})
+        pipe.zremrangebyscore(self.key, "-inf", time.time())
+        pipe.publish(self.channel, f"{jti} {expires_at}")
+        await pipe.execute()
+        return True
+
+    async def load(self) -> None:
+        for jti, expires_at in await self.redis.zrangebyscore(self.key, time.time(), "+inf", withscores=True):
+            self.cache.revoke(jti.decode() if isinstance(jti, bytes) else jti, float(expires_at))
+
+    def _apply(self, data) -> None:
+        jti, _, expires_at = (data.decode() if isinstance(data, bytes) else data).partition(" ")
+        self.cache.revoke(jti, float(expires_at or time.time() + 86400))
+
+    async def run(self) -> None:
+        """Background loop run by every API process"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                # Subscribe before loading so nothing falls between the two
+                await pubsub.subscribe(self.channel)
+                await self.load()
+                pruned_at = time.monotonic()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.prune_interval)
+                    if message is not None:
+                        self._apply(message["data"])
+                    if time.monotonic() - pruned_at >= self.prune_interval:
+                        self.cache.prune()
+                        pruned_at = time.monotonic()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Token revocation sync failed", error=str(e))
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
+
 
 class AuthMiddleware:
-    def __init__(self, secret_key: str):
+    def __init__(self, secret_key: str, cache: Optional[TokenCache] = None):
         self.secret_key = secret_key
         self.algorithm = "HS256"
+        self.cache = cache if cache is not None else token_cache
+        self._digest_key = hashlib.blake2b(secret_key.encode()).digest()
     
     async def verify_token(self, credentials: HTTPAuthorizationCredentials = Security(security)):
-        token = credentials.credentials
+        return self.decode_token(credentials.credentials)
+    
+    async def optional_token(
+        self,
+        credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_security)
+    ) -> Optional[dict]:
+        """Payload of the Bearer token if one is sent (401 if it is invalid), else None"""
+        if credentials is None:
+            return None
+        return self.decode_token(credentials.credentials)
+    
+    def decode_token(self, token: str) -> dict:
+        """Validated JWT payload; HTTPException(401) if invalid, expired or revoked"""
+        digest = hashlib.blake2b(token.encode(), key=self._digest_key, digest_size=16).digest()
+        payload = self.cache.get(digest)
+        if payload is not None:
+            return dict(payload)
         
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            
-            # Check expiration
-            if payload.get("exp", 0) < datetime.now(timezone.utc).timestamp():
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token expired"
-                )
-            
-            return payload
-            
+            # Signature and expiry (required) are checked by PyJWT
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm], options={"require": ["exp"]})
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token expired"
+            )
         except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
+        
+        if payload.get("jti") in self.cache.revoked:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token revoked"
+            )
+        
+        self.cache.put(digest, payload)
+        return dict(payload)
     
     def create_access_token(self, user_id: str, role: str = "user") -> str:
         expire = datetime.now(timezone.utc) + timedelta(hours=24)
@@ -39,7 +210,8 @@ class AuthMiddleware:
             "sub": user_id,
             "role": role,
             "exp": expire,
-            "iat": datetime.now(timezone.utc)
+            "iat": datetime.now(timezone.utc),
+            "jti": uuid.uuid4().hex
         }
         
         return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
\ No newline at end of file
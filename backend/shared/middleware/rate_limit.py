@@ -1,44 +1,265 @@
 # shared/middleware/rate_limit.py
 import time
-from typing import Dict, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
 from fastapi import HTTPException, Request
+from prometheus_client import Counter
 from redis import asyncio as aioredis
 
+from shared.utils.logger import get_logger
+from .auth import AuthMiddleware
+
+logger = get_logger()
+
+# Metrics
+rate_limit_decisions = Counter(
+    'rate_limit_decisions_total', 'Rate limit decisions', ['tier', 'decision']
+)
+
+DEFAULT_LIMITS = {
+    "api": (100, 60),  # 100 requests per 60 seconds
+    "llm": (10, 60),   # 10 LLM calls per 60 seconds
+    "trading": (5, 60)  # 5 trading actions per 60 seconds
+}
+
+# Path prefix -> tier, first match wins; unmatched paths are not limited
+DEFAULT_ROUTES: Sequence[Tuple[str, Optional[str]]] = (
+    ("/api/v1/stream", None),  # long-lived push connections
+    ("/api/v1/analyze", "llm"),
+    ("/api/v1/trading", "trading"),
+    ("/api/v1/", "api"),
+)
+
+# GCRA: one key per client holding its theoretical arrival time (TAT), in
+# microseconds of server time. A request is allowed if it would not push
+# the TAT more than the burst allowance into the future. Atomic, one round
+# trip, O(1) memory per client and no fixed-window edge bursts.
+GCRA_SCRIPT = """
+local emission = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if tat == nil or tat < now then
+    tat = now
+end
+local new_tat = tat + emission * cost
+local allowed_at = new_tat - emission * burst
+if now < allowed_at then
+    return {0, 0, allowed_at - now}
+end
+redis.call('SET', KEYS[1], string.format('%.0f', new_tat), 'PX', math.ceil((new_tat - now) / 1000) + 1)
+return {1, math.floor((now - allowed_at) / emission), 0}
+"""
+
+
+def parse_limit(spec: str) -> Tuple[int, float]:
+    """"100/60" -> 100 requests per 60 seconds"""
+    requests, _, seconds = spec.partition("/")
+    return int(requests), float(seconds or 60)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+
+class _LocalBuckets:
+    """Per-process token buckets with the same rate and burst as the shared
+    limit. This process's traffic is a subset of the client's total, so an
+    empty local bucket means the shared limit is exceeded too and Redis
+    need not be asked. Bounded LRU; an evicted client just starts full."""
+
+    def __init__(self, max_clients: int = 100_000):
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, rate: float, burst: int, cost: int = 1) -> float:
+        """Consume ``cost`` tokens; returns 0 if taken, else seconds until
+        they would be available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key: str, burst: int, cost: int = 1) -> None:
+        """Return tokens for a request the shared limit rejected, so the
+        local bucket never holds fewer tokens than the shared one"""
+        if key in self._buckets:
+            tokens, updated = self._buckets[key]
+            self._buckets[key] = (min(float(burst), tokens + cost), updated)
+
+
+class RateLimiter:
+    """Shared rate limits: local token-bucket pre-check, then GCRA in Redis.
+
+    Uses the caller's (pooled) Redis client. If Redis is unavailable
+    requests are allowed rather than failing the API.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        limits: Optional[Dict[str, Tuple[int, float]]] = None,
+        prefix: str = "rate_limit",
+        max_local_clients: int = 100_000
+    ):
+        self.redis = redis
+        self.limits = limits or dict(DEFAULT_LIMITS)
+        self.prefix = prefix
+        self._local = _LocalBuckets(max_local_clients)
+        self._script = redis.register_script(GCRA_SCRIPT)
+
+    async def hit(self, tier: str, client_id: str, cost: int = 1) -> RateLimitResult:
+        limit, window = self.limits.get(tier, DEFAULT_LIMITS["api"])
+        key = f"{self.prefix}:{tier}:{client_id}"
+
+        wait = self._local.take(key, limit / window, limit, cost)
+        if wait > 0:
+            rate_limit_decisions.labels(tier=tier, decision="local_reject").inc()
+            return RateLimitResult(False, limit, 0, wait)
+
+        emission_us = int(window * 1_000_000 / limit)
+        try:
+            allowed, remaining, retry_us = await self._script(keys=[key], args=[emission_us, limit, cost])
+        except Exception as e:
+            logger.warning("Rate limit check failed, allowing request", tier=tier, error=str(e))
+            rate_limit_decisions.labels(tier=tier, decision="error").inc()
+            return RateLimitResult(True, limit, limit)
+
+        if not allowed:
+            self._local.refund(key, limit, cost)
+        rate_limit_decisions.labels(tier=tier, decision="allow" if allowed else "reject").inc()
+        return RateLimitResult(bool(allowed), limit, int(remaining), int(retry_us) / 1_000_000)
+
+
+def client_key(scope: dict, auth: Optional[AuthMiddleware] = None) -> str:
+    """The user of a verified Bearer token, or the client address.
+
+    Unverified tokens are never used as keys: a client rotating made-up
+    tokens would get a fresh limit for each. Without ``auth`` every caller
+    is limited by address.
+    """
+    if auth is not None:
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                try:
+                    subject = auth.decode_token(value[7:].decode("latin-1")).get("sub")
+                except HTTPException:
+                    break
+                if subject:
+                    return f"user:{subject}"
+                break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
 class RateLimitMiddleware:
-    def __init__(self, redis_url: str):
-        self.redis_url = redis_url
-        self.limits = {
-            "api": (100, 60),  # 100 requests per 60 seconds
-            "llm": (10, 60),   # 10 LLM calls per 60 seconds
-            "trading": (5, 60)  # 5 trading actions per 60 seconds
-        }
-    
+    """ASGI middleware applying the api/llm/trading tiers by path prefix.
+
+    Over-limit requests get 429 with Retry-After; allowed ones carry
+    X-RateLimit-Limit and X-RateLimit-Remaining. With ``auth``, requests
+    with a valid token are limited per user, all others per address.
+    """
+
+    def __init__(
+        self,
+        app,
+        redis_url: Optional[str] = None,
+        limits: Optional[Dict[str, Tuple[int, float]]] = None,
+        routes: Sequence[Tuple[str, Optional[str]]] = DEFAULT_ROUTES,
+        enabled: bool = True,
+        max_connections: int = 20,
+        redis: Optional[aioredis.Redis] = None,
+        auth: Optional[AuthMiddleware] = None
+    ):
+        self.app = app
+        self.routes = routes
+        self.enabled = enabled
+        self.auth = auth
+        # The app's shared client, or one pooled client of our own; never a
+        # connection per request
+        self.limiter = RateLimiter(
+            redis if redis is not None else aioredis.from_url(redis_url, max_connections=max_connections),
+            limits=limits
+        )
+
+    @property
+    def limits(self) -> Dict[str, Tuple[int, float]]:
+        return self.limiter.limits
+
+    def tier_for(self, path: str) -> Optional[str]:
+        for prefix, tier in self.routes:
+            if path.startswith(prefix):
+                return tier
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+        tier = self.tier_for(scope["path"])
+        if tier is None:
+            return await self.app(scope, receive, send)
+
+        result = await self.limiter.hit(tier, client_key(scope, self.auth))
+        if not result.allowed:
+            retry_after = str(max(1, int(result.retry_after + 0.999)))
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", retry_after.encode()),
+                    (b"x-ratelimit-limit", str(result.limit).encode()),
+                    (b"x-ratelimit-remaining", b"0"),
+                ]
+            })
+            await send({
+                "type": "http.response.body",
+                "body": b'{"detail":"Rate limit exceeded. Try again in %s seconds."}' % retry_after.encode()
+            })
+            return
+
+        limit_headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
     async def check_rate_limit(
-        self, 
-        request: Request, 
+        self,
+        request: Request,
         user_id: str,
         limit_type: str = "api"
     ):
-        redis = await aioredis.from_url(self.redis_url)
-        
-        try:
-            limit, window = self.limits.get(limit_type, (100, 60))
-            key = f"rate_limit:{limit_type}:{user_id}"
-            
-            current = await redis.incr(key)
-            
-            if current == 1:
-                await redis.expire(key, window)
-            
-            if current > limit:
-                raise HTTPException(
-                    status_code=429,
-                    detail=f"Rate limit exceeded. Try again in {window} seconds."
-                )
-            
-            # Add headers
-            request.state.rate_limit_remaining = limit - current
-            request.state.rate_limit_reset = int(time.time()) + window
-            
-        finally:
-            await redis.close()
\ No newline at end of file
+        """Per-route check for callers that limit by user rather than path"""
+        result = await self.limiter.hit(limit_type, user_id)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded. Try again in {max(1, int(result.retry_after + 0.999))} seconds."
+            )
+
+        # Add headers
+        request.state.rate_limit_remaining = result.remaining
+        request.state.rate_limit_reset = int(time.time() + result.retry_after)
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Redis stream consumption helpers"""
+
+from .consumer import StreamConsumer, default_consumer_name
+from .lanes import (
+    LoadShedder,
+    WeightedRoundRobin,
+    lane_of,
+    lane_stream,
+    lane_streams,
+    parse_thresholds,
+    parse_weights,
+    DEFAULT_LANE_WEIGHTS,
+    LANES
+)
+from .partitions import (
+    PartitionAssigner,
+    assign_partitions,
+    partition_of,
+    partition_streams,
+    stream_for,
+    PARTITION_KEY_FIELD
+)
+
+__all__ = [
+    'LoadShedder',
+    'PartitionAssigner',
+    'StreamConsumer',
+    'WeightedRoundRobin',
+    'assign_partitions',
+    'default_consumer_name',
+    'lane_of',
+    'lane_stream',
+    'lane_streams',
+    'parse_thresholds',
+    'parse_weights',
+    'partition_of',
+    'partition_streams',
+    'stream_for',
+    'DEFAULT_LANE_WEIGHTS',
+    'LANES',
+    'PARTITION_KEY_FIELD'
+]
\ No newline at end of file
@@ -0,0 +1,368 @@
+"""Batched consumer-group reader for Redis streams"""
+
+import asyncio
+import os
+import socket
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from prometheus_client import Counter, Gauge
+from redis import asyncio as aioredis
+
+from shared.utils.logger import get_logger
+from .lanes import WeightedRoundRobin
+
+logger = get_logger()
+
+# Metrics
+stream_messages = Counter('stream_consumer_messages_total', 'Stream entries by outcome', ['stream', 'status'])
+stream_inflight = Gauge('stream_consumer_inflight', 'Stream entries being handled', ['group'])
+stream_batch_size = Gauge('stream_consumer_batch_size', 'Current adaptive XREADGROUP count', ['group'])
+
+# (stream, message ID, fields) -> None; raising leaves the entry pending
+Handler = Callable[[str, str, Dict[str, str]], Awaitable[None]]
+# fields -> ordering key; entries of a stream with the same key run one at a time
+OrderKey = Callable[[Dict[str, str]], Optional[str]]
+# (stream, message ID, fields) -> None; told about each dead-lettered entry
+DeadHandler = Callable[[str, str, Dict[str, str]], Awaitable[None]]
+
+
+def default_consumer_name(role: str = "consumer") -> str:
+    return f"{role}-{socket.gethostname()}-{os.getpid()}"
+
+
+class StreamConsumer:
+    """Reads one or more streams through a consumer group.
+
+    All streams are read with a single XREADGROUP whose count adapts
+    between ``min_batch`` and ``max_batch`` and never exceeds the free
+    in-flight slots; each entry is handled in its own task, at most
+    ``concurrency`` at a time. Successful entries are acknowledged in
+    batches, one pipelined XACK per stream every ``ack_interval``.
+
+    An entry whose handler raises stays pending. Every ``claim_interval``
+    the consumer XAUTOCLAIMs entries idle for ``claim_idle_ms`` (failed
+    here, or left behind by a crashed consumer) and runs them again; once
+    an entry has been delivered ``max_deliveries`` times it is copied to
+    ``{stream}:dead`` and acknowledged instead, and ``on_dead`` (if given)
+    is awaited with it. Entries still being handled here are never
+    reclaimed and run a second time, however long they take.
+
+    With ``order_key``, entries of one stream that share a key are handled
+    strictly in stream order (later ones wait for earlier ones); entries
+    with different keys still run concurrently. The stream set can be
+    changed while running with ``assign``.
+
+    With ``weights`` (stream -> weight, 1 if absent), free slots are shared
+    between the streams by smooth weighted round robin instead: each stream
+    is read for its share without blocking, all in one pipelined round
+    trip, and shares a stream leaves unused go to the streams that came
+    back full. Only when every stream is empty does the consumer block.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        streams: Sequence[str],
+        group: str,
+        handler: Handler,
+        consumer_name: Optional[str] = None,
+        concurrency: int = 256,
+        min_batch: int = 16,
+        max_batch: int = 1000,
+        block_ms: int = 1000,
+        ack_interval: float = 0.05,
+        claim_idle_ms: int = 60_000,
+        claim_interval: float = 30.0,
+        max_deliveries: int = 5,
+        dead_letter_max_len: int = 10_000,
+        order_key: Optional[OrderKey] = None,
+        weights: Optional[Dict[str, int]] = None,
+        on_dead: Optional[DeadHandler] = None
+    ):
+        self.redis = redis
+        self.streams = list(streams)
+        self.group = group
+        self.handler = handler
+        self.consumer_name = consumer_name or default_consumer_name()
+        self.concurrency = concurrency
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.block_ms = block_ms
+        self.ack_interval = ack_interval
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.max_deliveries = max_deliveries
+        self.dead_letter_max_len = dead_letter_max_len
+        self.order_key = order_key
+        self.on_dead = on_dead
+        self._wrr = WeightedRoundRobin(weights) if weights else None
+        self.batch_size = min_batch
+        self._acks: Dict[str, List[str]] = defaultdict(list)
+        self._inflight = 0
+        # Running handler task -> its (stream, message ID)
+        self._tasks: Dict[asyncio.Task, Tuple[str, str]] = {}
+        # (stream, order key) -> last task started for that key
+        self._tails: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._read_lock = asyncio.Lock()
+        self._slot_free = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._slot_free.set()
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    async def ensure_groups(self, streams: Optional[Sequence[str]] = None, start_id: str = "0") -> None:
+        for stream in self.streams if streams is None else streams:
+            try:
+                await self.redis.xgroup_create(stream, self.group, id=start_id, mkstream=True)
+            except aioredis.ResponseError:
+                pass  # group exists
+
+    def dispatch(self, stream: str, messages: List[Tuple[str, Optional[Dict]]]) -> None:
+        """Start a handler task per entry"""
+        for message_id, fields in messages:
+            if fields is None:
+                # Trimmed from the stream while pending: nothing to handle
+                self._acks[stream].append(message_id)
+                continue
+            self._inflight += 1
+            key = self.order_key(fields) if self.order_key is not None else None
+            if key is None:
+                task = asyncio.create_task(self._handle(stream, message_id, fields))
+                task.add_done_callback(self._tasks.pop)
+            else:
+                tail = (stream, key)
+                task = asyncio.create_task(self._handle(stream, message_id, fields, after=self._tails.get(tail)))
+                self._tails[tail] = task
+                task.add_done_callback(lambda done, tail=tail: self._finish_ordered(done, tail))
+            self._tasks[task] = (stream, message_id)
+
+    def _finish_ordered(self, task: asyncio.Task, tail: Tuple[str, str]) -> None:
+        self._tasks.pop(task, None)
+        if self._tails.get(tail) is task:
+            del self._tails[tail]
+
+    async def _handle(self, stream: str, message_id: str, fields: Dict, after: Optional[asyncio.Task] = None) -> None:
+        if after is not None:
+            await asyncio.wait([after])
+        try:
+            await self.handler(stream, message_id, fields)
+        except Exception as e:
+            stream_messages.labels(stream=stream, status="failed").inc()
+            logger.error("Stream handler failed", stream=stream, message_id=message_id, error=str(e))
+        else:
+            self._acks[stream].append(message_id)
+        finally:
+            self._inflight -= 1
+            self._slot_free.set()
+
+    def _adapt(self, received: int, requested: int) -> None:
+        """Grow the read size while reads come back full, shrink when sparse"""
+        if received >= requested:
+            self.batch_size = min(self.max_batch, self.batch_size * 2)
+        elif received < requested // 4:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+
+    async def flush_acks(self) -> None:
+        """XACK everything handled so far, one pipelined round trip"""
+        batches = {stream: ids for stream, ids in self._acks.items() if ids}
+        if not batches:
+            return
+        self._acks = defaultdict(list)
+        pipe = self.redis.pipeline(transaction=False)
+        for stream, ids in batches.items():
+            pipe.xack(stream, self.group, *ids)
+        try:
+            await pipe.execute()
+        except Exception:
+            for stream, ids in batches.items():
+                self._acks[stream].extend(ids)
+            raise
+        for stream, ids in batches.items():
+            stream_messages.labels(stream=stream, status="acked").inc(len(ids))
+
+    async def _ack_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ack_interval)
+            try:
+                await self.flush_acks()
+            except Exception as e:
+                logger.error("Failed to acknowledge stream entries", group=self.group, error=str(e))
+
+    async def reclaim(self, streams: Optional[Sequence[str]] = None, min_idle_ms: Optional[int] = None) -> int:
+        """Claim idle pending entries; dead-letter the exhausted ones and
+        dispatch the rest. Returns the number claimed."""
+        claimed = 0
+        for stream in self.streams if streams is None else streams:
+            start = "0-0"
+            while claimed < self.max_batch:
+                response = await self.redis.xautoclaim(
+                    stream,
+                    self.group,
+                    self.consumer_name,
+                    min_idle_time=self.claim_idle_ms if min_idle_ms is None else min_idle_ms,
+                    start_id=start,
+                    count=self.max_batch - claimed
+                )
+                start, messages = response[0], response[1]
+                if messages:
+                    claimed += len(messages)
+                    await self._redeliver(stream, messages)
+                if start in ("0-0", b"0-0"):
+                    break
+        return claimed
+
+    async def _redeliver(self, stream: str, messages: List[Tuple[str, Optional[Dict]]]) -> None:
+        # Redis 6.2 returns entries trimmed while pending as (None, None)
+        # without their ID; Redis 7 drops them from the PEL itself. Entries
+        # whose handler is still running here were claimed only because
+        # they have been running longer than claim_idle_ms.
+        running = set(self._tasks.values())
+        messages = [
+            message for message in messages
+            if message[0] is not None and (stream, message[0]) not in running
+        ]
+        if not messages:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for message_id, _ in messages:
+            pipe.xpending_range(stream, self.group, message_id, message_id, 1)
+        deliveries = [entry[0]["times_delivered"] if entry else 0 for entry in await pipe.execute()]
+
+        retry, dead = [], []
+        for (message_id, fields), delivered in zip(messages, deliveries):
+            (dead if delivered > self.max_deliveries and fields is not None else retry).append((message_id, fields))
+        if dead:
+            pipe = self.redis.pipeline(transaction=False)
+            for message_id, fields in dead:
+                pipe.xadd(
+                    f"{stream}:dead",
+                    {**fields, "dead_stream": stream, "dead_id": message_id, "dead_group": self.group},
+                    maxlen=self.dead_letter_max_len,
+                    approximate=True
+                )
+            pipe.xack(stream, self.group, *[message_id for message_id, _ in dead])
+            await pipe.execute()
+            stream_messages.labels(stream=stream, status="dead").inc(len(dead))
+            logger.warning("Stream entries dead-lettered", stream=stream, count=len(dead))
+            if self.on_dead is not None:
+                for message_id, fields in dead:
+                    try:
+                        await self.on_dead(stream, message_id, fields)
+                    except Exception as e:
+                        logger.error("Dead-letter handler failed", stream=stream, message_id=message_id, error=str(e))
+        if retry:
+            stream_messages.labels(stream=stream, status="reclaimed").inc(len(retry))
+            self.dispatch(stream, retry)
+
+    async def assign(self, streams: Sequence[str]) -> None:
+        """Switch to a new stream set. Dropped streams are drained (their
+        running handlers finish and are acked) before this returns; added
+        streams first take over whatever is pending on them, so entries a
+        previous owner left behind run before newer ones."""
+        removed = set(self.streams) - set(streams)
+        added = [stream for stream in streams if stream not in self.streams]
+        if added:
+            await self.ensure_groups(added)
+        async with self._read_lock:
+            self.streams = list(streams)
+            if added:
+                await self.reclaim(added, min_idle_ms=0)
+        draining = [task for task, (stream, _) in self._tasks.items() if stream in removed]
+        if draining:
+            await asyncio.wait(draining)
+        await self.flush_acks()
+        logger.info("Stream consumer reassigned", group=self.group, added=added, removed=sorted(removed))
+
+    async def _read(self, streams: List[str], free: int) -> Tuple[int, int]:
+        """Read and dispatch up to ``free`` entries; returns (received, requested)"""
+        if self._wrr is not None:
+            requested = min(free, self.batch_size * len(streams))
+            received = await self._read_weighted(streams, requested)
+            if received:
+                return received, requested
+        count = max(1, min(self.batch_size, free // len(streams)))
+        response = await self.redis.xreadgroup(
+            self.group,
+            self.consumer_name,
+            {stream: ">" for stream in streams},
+            count=count,
+            block=self.block_ms
+        )
+        received = 0
+        for stream, messages in response or []:
+            received += len(messages)
+            self.dispatch(stream, messages)
+        return received, count * len(streams)
+
+    async def _read_weighted(self, streams: List[str], budget: int) -> int:
+        received = 0
+        eligible = list(streams)
+        while budget > 0 and eligible:
+            shares = self._wrr.shares(budget, eligible)
+            pipe = self.redis.pipeline(transaction=False)
+            for stream, count in shares.items():
+                pipe.xreadgroup(self.group, self.consumer_name, {stream: ">"}, count=count)
+            eligible = []
+            for (stream, count), response in zip(shares.items(), await pipe.execute()):
+                messages = response[0][1] if response else []
+                if not messages:
+                    continue
+                received += len(messages)
+                budget -= len(messages)
+                self.dispatch(stream, messages)
+                if len(messages) == count:
+                    eligible.append(stream)
+        return received
+
+    async def run(self) -> None:
+        await self.ensure_groups()
+        ack_task = asyncio.create_task(self._ack_loop())
+        claimed_at = float("-inf")
+        logger.info("Stream consumer started", group=self.group, consumer=self.consumer_name, streams=self.streams)
+
+        while not self._stopping.is_set():
+            if time.monotonic() - claimed_at >= self.claim_interval:
+                claimed_at = time.monotonic()
+                try:
+                    await self.reclaim()
+                except Exception as e:
+                    logger.error("Failed to reclaim pending stream entries", group=self.group, error=str(e))
+
+            free = self.concurrency - self._inflight
+            if free <= 0:
+                self._slot_free.clear()
+                await self._slot_free.wait()
+                continue
+
+            async with self._read_lock:
+                streams = self.streams
+                if not streams:
+                    await asyncio.sleep(self.block_ms / 1000)
+                else:
+                    try:
+                        received, requested = await self._read(streams, free)
+                    except Exception as e:
+                        logger.error("Failed to read streams", group=self.group, error=str(e))
+                        await asyncio.sleep(1)
+                        continue
+            if streams:
+                self._adapt(received, requested)
+            stream_batch_size.labels(group=self.group).set(self.batch_size)
+            stream_inflight.labels(group=self.group).set(self._inflight)
+
+        # Let running handlers finish so their entries get acked
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+        ack_task.cancel()
+        try:
+            await self.flush_acks()
+        except Exception as e:
+            logger.error("Failed to acknowledge stream entries", group=self.group, error=str(e))
+        logger.info("Stream consumer stopped", group=self.group, consumer=self.consumer_name)
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""Urgency lanes: per-urgency streams, weighted fair reads and lag-based shedding"""
+
+import random
+from typing import Dict, List, Optional, Sequence
+
+from prometheus_client import Counter, Gauge
+
+# Metrics
+shed_decisions = Counter('stream_shed_decisions_total', 'Load-shedding decisions by lane', ['lane', 'decision'])
+lane_lag = Gauge('stream_lane_lag_seconds', 'Age of the latest entry read from each lane', ['lane'])
+
+# Most urgent first
+LANES = ("critical", "high", "normal", "low")
+DEFAULT_LANE_WEIGHTS = {"critical": 8, "high": 4, "normal": 2, "low": 1}
+
+# Shedding decisions
+FULL = "full"
+LOCAL = "local"
+DROP = "drop"
+
+
+def lane_stream(base: str, lane: str) -> str:
+    """The normal lane keeps the base name, so existing producers land there"""
+    return base if lane == "normal" else f"{base}:{lane}"
+
+
+def lane_of(base: str, stream: str) -> str:
+    """Inverse of lane_stream, also for partitioned names ({base}:{lane}:{i})"""
+    rest = stream[len(base) + 1:] if stream.startswith(base + ":") else ""
+    lane = rest.split(":", 1)[0]
+    return lane if lane in LANES and lane != "normal" else "normal"
+
+
+class WeightedRoundRobin:
+    """Smooth weighted round robin over the keys of ``weights``.
+
+    Consecutive picks interleave keys in proportion to their weights
+    (8:4:2:1 -> c h c n c h c l ...) rather than in bursts.
+    """
+
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = dict(weights)
+        self._current: Dict[str, int] = {key: 0 for key in weights}
+
+    def pick(self, eligible: Sequence[str]) -> Optional[str]:
+        if not eligible:
+            return None
+        total = 0
+        best = None
+        for key in eligible:
+            weight = self.weights.get(key, 1)
+            self._current[key] = self._current.get(key, 0) + weight
+            total += weight
+            if best is None or self._current[key] > self._current[best]:
+                best = key
+        self._current[best] -= total
+        return best
+
+    def shares(self, slots: int, eligible: Sequence[str]) -> Dict[str, int]:
+        """Hand out ``slots`` one at a time"""
+        counts = {key: 0 for key in eligible}
+        for _ in range(slots):
+            counts[self.pick(eligible)] += 1
+        return {key: count for key, count in counts.items() if count}
+
+
+class LoadShedder:
+    """Lag-driven degradation of low-urgency work.
+
+    ``thresholds`` maps a lane to (degrade_after, sample_after) seconds of
+    lag, measured as the age of the entry when read. Below the first, work
+    is handled in full; past it, it is degraded to local-only handling;
+    past the second, only ``sample_rate`` of it is handled (locally) and
+    the rest dropped. Lanes without thresholds are never shed. Entries
+    that must produce a result (``required``) are degraded but never
+    dropped.
+    """
+
+    def __init__(self, thresholds: Dict[str, tuple], sample_rate: float = 0.1, rng: Optional[random.Random] = None):
+        self.thresholds = thresholds
+        self.sample_rate = sample_rate
+        self._rng = rng or random.Random()
+
+    def decide(self, lane: str, lag_seconds: float, required: bool = False) -> str:
+        lane_lag.labels(lane=lane).set(lag_seconds)
+        limits = self.thresholds.get(lane)
+        if limits is None or lag_seconds < limits[0]:
+            decision = FULL
+        elif lag_seconds < limits[1] or required or self._rng.random() < self.sample_rate:
+            decision = LOCAL
+        else:
+            decision = DROP
+        shed_decisions.labels(lane=lane, decision=decision).inc()
+        return decision
+
+
+def parse_weights(spec: str) -> Dict[str, int]:
+    """"critical:8,high:4" -> {"critical": 8, "high": 4}"""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        lane, weight = item.split(":")
+        weights[lane] = int(weight)
+    return weights
+
+
+def parse_thresholds(spec: str) -> Dict[str, tuple]:
+    """"low:30:120,normal:120:600" -> {"low": (30.0, 120.0), "normal": (120.0, 600.0)}"""
+    thresholds = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        lane, degrade, sample = item.split(":")
+        thresholds[lane] = (float(degrade), float(sample))
+    return thresholds
+
+
+def lane_streams(base: str, lanes: Sequence[str] = LANES) -> List[str]:
+    return [lane_stream(base, lane) for lane in lanes]
\ No newline at end of file
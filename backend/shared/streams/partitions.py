@@ -0,0 +1,231 @@
+"""Hash-partitioned streams and partition ownership"""
+
+import asyncio
+import hashlib
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Set
+
+from prometheus_client import Gauge
+from redis import asyncio as aioredis
+
+from shared.utils.logger import get_logger
+from .consumer import StreamConsumer
+from .lanes import lane_stream
+
+logger = get_logger()
+
+# Metrics
+partition_lag_seconds = Gauge('stream_partition_lag_seconds', 'Age of the oldest entry not yet delivered to the group', ['stream'])
+partition_lag_entries = Gauge('stream_partition_lag_entries', 'Entries not yet delivered to the group (Redis 7+)', ['stream'])
+partition_pending = Gauge('stream_partition_pending', 'Entries delivered but not yet acked', ['stream'])
+partitions_owned = Gauge('stream_partitions_owned', 'Partitions this worker is consuming', ['stream'])
+
+# Stream field carrying the partition key, used by consumers to keep order
+PARTITION_KEY_FIELD = "key"
+
+# Renew a lease only if we still hold it; release likewise
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def partition_streams(base: str, partitions: int) -> List[str]:
+    """Stream names for a partitioned stream; one partition keeps the base name"""
+    if partitions <= 1:
+        return [base]
+    return [f"{base}:{i}" for i in range(partitions)]
+
+
+def partition_of(key: str, partitions: int) -> int:
+    """Stable across processes and restarts (unlike hash())"""
+    return zlib.crc32(key.encode()) % partitions if partitions > 1 else 0
+
+
+def stream_for(base: str, key: str, partitions: int) -> str:
+    return partition_streams(base, partitions)[partition_of(key, partitions)]
+
+
+def _weight(member: str, partition: int) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{member}/{partition}".encode(), digest_size=8).digest(), "big")
+
+
+def assign_partitions(members: Sequence[str], partitions: int) -> Dict[int, str]:
+    """Rendezvous hashing: every worker computes the same owners from the
+    same member list, and a join or leave only moves the partitions that
+    member gains or loses"""
+    if not members:
+        return {}
+    return {p: max(members, key=lambda member: _weight(member, p)) for p in range(partitions)}
+
+
+class PartitionAssigner:
+    """Spreads the partitions of one stream over the live workers.
+
+    Workers heartbeat into ``{base}:members`` and drive their
+    StreamConsumer to the partitions rendezvous hashing gives them. Each
+    partition is guarded by a lease: a worker starts reading only after
+    taking the lease, and gives it back only once its running entries for
+    that partition are acked, so events with the same key are never
+    handled by two workers at once. A crashed worker's leases expire after
+    ``member_ttl`` and the new owner takes over its pending entries first.
+
+    With ``lanes``, every lane of the stream is partitioned the same way and
+    a partition is owned as a unit: one lease (named after the partition's
+    base stream) covers that partition in every lane.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        consumer: StreamConsumer,
+        base_stream: str,
+        partitions: int,
+        member: Optional[str] = None,
+        heartbeat_interval: float = 2.0,
+        member_ttl: float = 10.0,
+        lanes: Optional[Sequence[str]] = None
+    ):
+        self.redis = redis
+        self.consumer = consumer
+        self.base_stream = base_stream
+        self.streams = partition_streams(base_stream, partitions)
+        # Partition -> its stream in every lane
+        self._lane_streams = {
+            stream: [partition_streams(lane_stream(base_stream, lane), partitions)[p] for lane in lanes]
+            for p, stream in enumerate(self.streams)
+        } if lanes else {stream: [stream] for stream in self.streams}
+        self.member = member or consumer.consumer_name
+        self.heartbeat_interval = heartbeat_interval
+        self.member_ttl = member_ttl
+        self.members_key = f"{base_stream}:members"
+        self.owned: Set[str] = set()
+        # Leases held, including ones still draining before release
+        self._held: Set[str] = set()
+        self._lost: Set[str] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._renew = redis.register_script(RENEW_SCRIPT)
+        self._release = redis.register_script(RELEASE_SCRIPT)
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def lease_key(self, stream: str) -> str:
+        return f"{stream}:lease"
+
+    def consumed_streams(self, partitions) -> List[str]:
+        """Streams to read for a set of owned partitions"""
+        return [lane for stream in sorted(partitions) for lane in self._lane_streams[stream]]
+
+    async def members(self) -> List[str]:
+        """Heartbeat, drop members that stopped heartbeating, list the rest"""
+        now_ms = int(time.time() * 1000)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(self.members_key, {self.member: now_ms})
+        pipe.zremrangebyscore(self.members_key, "-inf", now_ms - int(self.member_ttl * 1000))
+        pipe.zrange(self.members_key, 0, -1)
+        return sorted(m.decode() if isinstance(m, bytes) else m for m in (await pipe.execute())[2])
+
+    async def keepalive(self) -> None:
+        """Heartbeat and renew held leases; runs on its own so a long drain
+        cannot let them lapse"""
+        await self.members()
+        ttl_ms = int(self.member_ttl * 1000)
+        for stream in sorted(self._held):
+            if not await self._renew(keys=[self.lease_key(stream)], args=[self.member, ttl_ms]):
+                self._held.discard(stream)
+                self._lost.add(stream)
+                logger.warning("Partition lease lost", stream=stream, member=self.member)
+
+    async def _keepalive_loop(self) -> None:
+        while True:
+            try:
+                await self.keepalive()
+            except Exception as e:
+                logger.error("Partition heartbeat failed", member=self.member, error=str(e))
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def rebalance(self) -> None:
+        owners = assign_partitions(await self.members(), len(self.streams))
+        desired = {self.streams[p] for p, member in owners.items() if member == self.member}
+
+        # Stop reading lost partitions and drain the ones we give up before
+        # releasing them, so the next owner starts after us
+        lost, self._lost = self._lost, set()
+        target = (self.owned - lost) & desired
+        if target != self.owned:
+            await self.consumer.assign(self.consumed_streams(target))
+        for stream in self.owned - lost - desired:
+            await self._release(keys=[self.lease_key(stream)], args=[self.member])
+            self._held.discard(stream)
+
+        owned = set(target)
+        ttl_ms = int(self.member_ttl * 1000)
+        for stream in sorted(desired - target):
+            if await self.redis.set(self.lease_key(stream), self.member, nx=True, px=ttl_ms):
+                self._held.add(stream)
+                owned.add(stream)
+        if owned != target:
+            await self.consumer.assign(self.consumed_streams(owned))
+        if owned != self.owned:
+            logger.info("Partitions rebalanced", member=self.member, owned=sorted(owned))
+        self.owned = owned
+        partitions_owned.labels(stream=self.base_stream).set(len(owned))
+
+    async def report_lag(self) -> None:
+        """Lag gauges for the partitions this worker owns"""
+        now_ms = time.time() * 1000
+        for stream in self.consumed_streams(self.owned):
+            groups = await self.redis.xinfo_groups(stream)
+            info = next((g for g in groups if g["name"] in (self.consumer.group, self.consumer.group.encode())), None)
+            if info is None:
+                continue
+            partition_pending.labels(stream=stream).set(info["pending"])
+            if info.get("lag") is not None:
+                partition_lag_entries.labels(stream=stream).set(info["lag"])
+            last = info["last-delivered-id"]
+            last = last.decode() if isinstance(last, bytes) else last
+            oldest = await self.redis.xrange(stream, min=f"({last}", count=1)
+            age = 0.0
+            if oldest:
+                message_id = oldest[0][0]
+                message_id = message_id.decode() if isinstance(message_id, bytes) else message_id
+                age = now_ms - int(message_id.split("-")[0])
+            partition_lag_seconds.labels(stream=stream).set(max(0.0, age / 1000))
+
+    async def run(self) -> None:
+        logger.info("Partition assigner started", member=self.member, partitions=len(self.streams))
+        self._heartbeat = asyncio.create_task(self._keepalive_loop())
+        while not self._stopping.is_set():
+            try:
+                await self.rebalance()
+                await self.report_lag()
+            except Exception as e:
+                logger.error("Partition rebalance failed", member=self.member, error=str(e))
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+        await self.leave()
+
+    async def leave(self) -> None:
+        """Drain and hand back every partition, then leave the member set"""
+        await self.consumer.assign([])
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        for stream in sorted(self._held):
+            await self._release(keys=[self.lease_key(stream)], args=[self.member])
+        self.owned, self._held = set(), set()
+        await self.redis.zrem(self.members_key, self.member)
+        partitions_owned.labels(stream=self.base_stream).set(0)
+        logger.info("Partition assigner stopped", member=self.member)
\ No newline at end of file
@@ -2,5 +2,8 @@
 
 from .logger import setup_logger, get_logger
 from .cache import TTLCache, cached
+from .passwords import HasherBusy, PasswordHasher
+from .redis_batch import AutoBatchingRedis
+from .codec import Codec, CodecError
 
-__all__ = ['setup_logger', 'get_logger', 'TTLCache', 'cached']
\ No newline at end of file
+__all__ = ['setup_logger', 'get_logger', 'TTLCache', 'cached', 'AutoBatchingRedis', 'Codec', 'CodecError', 'HasherBusy', 'PasswordHasher']
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Supervised background task queue"""
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from .logger import get_logger
+
+logger = get_logger()
+
+# Metrics
+queue_depth = Gauge('background_queue_depth', 'Jobs waiting in a background queue', ['queue'])
+queue_jobs = Counter('background_jobs_total', 'Background jobs by outcome', ['queue', 'label', 'status'])
+
+JobFactory = Callable[[], Awaitable[None]]
+
+
+class BackgroundTaskQueue:
+    """Bounded queue of retried jobs drained by a fixed pool of worker tasks.
+
+    Jobs are passed as zero-argument coroutine factories so each retry gets a
+    fresh coroutine. ``submit`` never blocks: it returns False when the queue
+    is full and the caller decides how to degrade.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int = 4,
+        max_depth: int = 1000,
+        max_attempts: int = 3,
+        base_delay: float = 0.5
+    ):
+        self.name = name
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self._queue: asyncio.Queue[Tuple[str, JobFactory]] = asyncio.Queue(maxsize=max_depth)
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, label: str, factory: JobFactory) -> bool:
+        """Enqueue a job; False if the queue is at capacity"""
+        try:
+            self._queue.put_nowait((label, factory))
+        except asyncio.QueueFull:
+            queue_jobs.labels(queue=self.name, label=label, status="rejected").inc()
+            return False
+        queue_depth.labels(queue=self.name).set(self._queue.qsize())
+        return True
+
+    async def run_with_retries(self, label: str, factory: JobFactory) -> bool:
+        """Run a job with exponential backoff; True on success"""
+        for attempt in range(self.max_attempts):
+            try:
+                await factory()
+                queue_jobs.labels(queue=self.name, label=label, status="succeeded").inc()
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt + 1 == self.max_attempts:
+                    logger.error("Background job failed", queue=self.name, job=label, error=str(e))
+                    queue_jobs.labels(queue=self.name, label=label, status="failed").inc()
+                    return False
+                queue_jobs.labels(queue=self.name, label=label, status="retried").inc()
+                await asyncio.sleep(self.base_delay * 2 ** attempt)
+        return False
+
+    async def _worker(self) -> None:
+        while True:
+            label, factory = await self._queue.get()
+            try:
+                await self.run_with_retries(label, factory)
+            finally:
+                self._queue.task_done()
+                queue_depth.labels(queue=self.name).set(self._queue.qsize())
+
+    async def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Drain queued jobs (up to ``timeout``) and stop the workers"""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Background queue not drained", queue=self.name, remaining=self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
@@ -0,0 +1,134 @@
+"""Versioned binary codec for stream payloads, job results and task messages"""
+
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Union
+from uuid import UUID
+
+import msgpack
+import orjson
+from prometheus_client import Counter, Histogram
+from pydantic import BaseModel
+
+try:
+    import zstandard
+except ImportError:  # compression is optional; payloads are then written uncompressed
+    zstandard = None
+
+# Metrics
+codec_payload_bytes = Histogram(
+    'codec_payload_bytes', 'Encoded payload size', ['format'],
+    buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+)
+codec_legacy_reads = Counter('codec_legacy_reads_total', 'Payloads decoded from header-less legacy JSON')
+
+# Header: MAGIC, format version, flags. 0xC1 is never emitted by msgpack and
+# cannot start UTF-8 text (or JSON), so legacy payloads are told apart by it
+MAGIC = 0xC1
+VERSION = 1
+FLAG_ZSTD = 0x01
+HEADER_SIZE = 3
+
+WRITE_FORMATS = ("msgpack", "json")
+
+
+class CodecError(ValueError):
+    """Payload is corrupt, or was written by a newer codec version"""
+
+
+def _default(obj: Any) -> Any:
+    """Types msgpack/orjson do not handle natively, as their JSON forms"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (UUID, Decimal)):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Cannot encode {type(obj).__name__}")
+
+
+class Codec:
+    """msgpack behind a small header, zstd-compressed from
+    ``compress_threshold`` bytes (0 = never).
+
+    Readers accept every version up to their own plus header-less JSON, so a
+    rolling upgrade first deploys readers with ``write_format="json"`` (the
+    old wire format) and switches writers to msgpack once all are upgraded.
+    Values come back as plain JSON types: datetimes and UUIDs as strings,
+    tuples as lists.
+    """
+
+    def __init__(self, write_format: str = "msgpack", compress_threshold: int = 1024, level: int = 3):
+        if write_format not in WRITE_FORMATS:
+            raise ValueError(f"Unknown codec write format: {write_format}")
+        self.write_format = write_format
+        self.compress_threshold = compress_threshold if zstandard is not None else 0
+        self.level = level
+        # zstd contexts are reusable but not thread-safe
+        self._local = threading.local()
+
+    def _compressor(self) -> "zstandard.ZstdCompressor":
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor
+
+    def _decompressor(self) -> "zstandard.ZstdDecompressor":
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        return decompressor
+
+    def encode(self, obj: Any) -> bytes:
+        if self.write_format == "json":
+            data = orjson.dumps(obj, default=_default)
+            codec_payload_bytes.labels(format="json").observe(len(data))
+            return data
+
+        body = msgpack.packb(obj, default=_default, use_bin_type=True)
+        flags = 0
+        if self.compress_threshold and len(body) >= self.compress_threshold:
+            compressed = self._compressor().compress(body)
+            if len(compressed) < len(body):
+                body, flags = compressed, FLAG_ZSTD
+        data = bytes((MAGIC, VERSION, flags)) + body
+        codec_payload_bytes.labels(format="msgpack+zstd" if flags else "msgpack").observe(len(data))
+        return data
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Bytes, or a str read through a ``surrogateescape`` client"""
+        if isinstance(data, str):
+            data = data.encode("utf-8", "surrogateescape")
+        if not data or data[0] != MAGIC:
+            codec_legacy_reads.inc()
+            return orjson.loads(data)
+        if len(data) < HEADER_SIZE:
+            raise CodecError("Truncated payload header")
+
+        version, flags = data[1], data[2]
+        if version > VERSION:
+            raise CodecError(f"Payload format v{version} is newer than this reader (v{VERSION})")
+        body = memoryview(data)[HEADER_SIZE:]
+        try:
+            if flags & FLAG_ZSTD:
+                if zstandard is None:
+                    raise CodecError("Payload is zstd-compressed but zstandard is not installed")
+                body = self._decompressor().decompress(body)
+            return msgpack.unpackb(body, raw=False)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Corrupt payload: {e}") from e
+
+    @staticmethod
+    def is_encoded(data: Union[bytes, str]) -> bool:
+        """Whether ``data`` carries the codec header (rather than legacy JSON)"""
+        if isinstance(data, str):
+            return data[:1] == "\udcc1"
+        return data[:1] == bytes((MAGIC,))
\ No newline at end of file
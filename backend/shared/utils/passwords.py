@@ -0,0 +1,86 @@
+"""Password hashing off the event loop"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import bcrypt
+from prometheus_client import Counter, Gauge, Histogram
+
+from .logger import get_logger
+
+logger = get_logger()
+
+# Metrics
+hash_latency = Histogram(
+    'password_hash_seconds', 'Password hash/verify latency including queueing', ['op'],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1, 2, 5, 10)
+)
+hash_cpu = Counter('password_hash_cpu_seconds_total', 'Hashing CPU time run on the pool instead of the event loop', ['op'])
+hash_pending = Gauge('password_hash_pending', 'Hash/verify calls queued or running')
+hash_rejected = Counter('password_hash_rejected_total', 'Hash/verify calls refused because the pool was saturated', ['op'])
+
+T = TypeVar("T")
+
+
+class HasherBusy(Exception):
+    """Too many hash/verify calls pending; the caller should shed the request"""
+
+
+class PasswordHasher:
+    """bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so threads give real parallelism and the event
+    loop keeps serving other requests. At most ``max_pending`` calls may be
+    queued or running; beyond that ``hash``/``verify`` raise HasherBusy
+    instead of letting a flood of sign-ups queue for minutes.
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 32):
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._pending = 0
+
+    async def _run(self, op: str, fn: Callable[[], T]) -> T:
+        if self._pending >= self.max_pending:
+            hash_rejected.labels(op=op).inc()
+            raise HasherBusy(f"{self._pending} password operations pending")
+
+        def timed() -> T:
+            started = time.thread_time()
+            try:
+                return fn()
+            finally:
+                hash_cpu.labels(op=op).inc(time.thread_time() - started)
+
+        self._pending += 1
+        hash_pending.set(self._pending)
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._pending -= 1
+            hash_pending.set(self._pending)
+            hash_latency.labels(op=op).observe(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        rounds = self.rounds
+        return await self._run(
+            "hash",
+            lambda: bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("ascii")
+        )
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(
+            "verify",
+            lambda: bcrypt.checkpw(password.encode("utf-8"), hashed.encode("ascii"))
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def close(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""Shared Redis client that coalesces concurrent simple commands into pipelines"""
+
+import asyncio
+import time
+from typing import Any, Collection, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+from redis import asyncio as aioredis
+
+# Metrics
+pipeline_size = Histogram(
+    'redis_autobatch_pipeline_commands', 'Commands per auto-batched pipeline',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+roundtrip_latency = Histogram(
+    'redis_autobatch_roundtrip_seconds', 'Auto-batched pipeline round-trip time',
+    buckets=(0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+)
+batched_commands = Counter('redis_autobatch_commands_total', 'Commands sent through the auto-batcher', ['command'])
+
+# Non-blocking commands that are worth coalescing; blocking reads,
+# scripts and transactions always go straight to the client
+BATCHED_COMMANDS = frozenset({"xadd", "incr", "incrby", "hincrby", "get", "expire"})
+
+# (command, args, kwargs, future)
+_Call = Tuple[str, tuple, dict, asyncio.Future]
+
+
+class AutoBatchingRedis:
+    """Wraps a pooled client; batched commands issued within ``window``
+    seconds of each other (by default, in the same event-loop iteration) go
+    out as one non-transactional pipeline, and everything else passes
+    straight through to the client.
+
+    Each caller still gets its own result (or exception), and a caller's
+    commands stay in order because it awaits each one. A batch is sent
+    early once it reaches ``max_batch`` commands.
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        window: float = 0.0,
+        max_batch: int = 512,
+        commands: Collection[str] = BATCHED_COMMANDS
+    ):
+        self.client = redis
+        self.window = window
+        self.max_batch = max_batch
+        self.commands = frozenset(commands)
+        self._pending: List[_Call] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._flushing = set()
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self.commands:
+            return lambda *args, **kwargs: self._enqueue(name, args, kwargs)
+        return getattr(self.client, name)
+
+    def _enqueue(self, command: str, args: tuple, kwargs: dict) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((command, args, kwargs, future))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            if self.window > 0:
+                self._timer = loop.call_later(self.window, self.flush)
+            else:
+                self._timer = loop.call_soon(self.flush)
+        return future
+
+    def flush(self) -> None:
+        """Send what is pending now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        calls, self._pending = self._pending, []
+        if calls:
+            task = asyncio.get_running_loop().create_task(self._execute(calls))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _execute(self, calls: List[_Call]) -> None:
+        for command, *_ in calls:
+            batched_commands.labels(command=command).inc()
+        pipeline_size.observe(len(calls))
+        started = time.perf_counter()
+        try:
+            if len(calls) == 1:
+                # Nothing to coalesce: skip the pipeline machinery
+                command, args, kwargs, _ = calls[0]
+                try:
+                    results = [await getattr(self.client, command)(*args, **kwargs)]
+                except aioredis.ResponseError as e:
+                    results = [e]
+            else:
+                pipe = self.client.pipeline(transaction=False)
+                for command, args, kwargs, _ in calls:
+                    getattr(pipe, command)(*args, **kwargs)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            for *_, future in calls:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            roundtrip_latency.observe(time.perf_counter() - started)
+        for (*_, future), result in zip(calls, results):
+            if future.done():
+                continue  # caller gave up
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Send anything pending, then close the pool"""
+        self.flush()
+        if self._flushing:
+            await asyncio.wait(self._flushing)
+        await self.client.close()
+
+    close = aclose
\ No newline at end of file
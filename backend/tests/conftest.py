@@ -0,0 +1,51 @@
+"""Shared test fixtures and Redis fakes"""
+
+import fakeredis.aioredis
+import pytest
+
+
+class FakePipeline:
+    """Queues any command by name; its FakeRedis answers them on execute"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args))
+
+    async def execute(self, raise_on_error=True):
+        return self.redis.execute(self.commands)
+
+
+class FakeRedis:
+    """Records every executed pipeline as a list of (command, args).
+
+    For asserting how commands are batched; ``reply`` answers each command
+    (1 unless overridden). Tests that need real command semantics use the
+    ``redis`` fixture instead.
+    """
+
+    def __init__(self):
+        self.executed = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def execute(self, commands):
+        self.executed.append(commands)
+        return [self.reply(name, args) for name, args in commands]
+
+    def reply(self, name, args):
+        return 1
+
+
+@pytest.fixture
+def redis():
+    """In-memory Redis that reads back like the shared stream client
+    (decode_responses with surrogateescape).
+
+    Use it inside a single asyncio.run: the client binds to the first event
+    loop that uses it.
+    """
+    return fakeredis.aioredis.FakeRedis(decode_responses=True, encoding_errors="surrogateescape")
@@ -0,0 +1,69 @@
+"""Admission control tests: adaptive limit, bounded queue and fast rejection"""
+
+import asyncio
+
+import pytest
+
+from shared.middleware.admission import AdmissionController, AdmissionRejected, GradientLimit
+
+
+def test_gradient_limit_follows_downstream_latency():
+    limit = GradientLimit(initial=16, window_size=5)
+    for _ in range(5):
+        limit.observe(1.0, inflight=16)
+    assert limit.limit > 16  # healthy and busy: grows
+
+    grown = limit.limit
+    for _ in range(5):
+        limit.observe(1.0, inflight=1)
+    assert limit.limit == grown  # idle samples never raise it
+
+    for _ in range(20):
+        limit.observe(4.0, inflight=int(limit.limit))
+    assert limit.limit < 16  # latency 4x the baseline: shrinks
+    assert limit.baseline == 1.0
+
+
+def test_excess_requests_queue_then_get_429_or_503():
+    async def scenario():
+        controller = AdmissionController(limit=GradientLimit(initial=2), max_queue=1, max_wait=0.05)
+        await controller.acquire()
+        await controller.acquire()
+        waiting = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.queued == 1
+
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire()
+        controller.release()  # the queued request takes this slot
+        await waiting
+        assert controller.inflight == 2 and controller.queued == 0
+
+        with pytest.raises(AdmissionRejected) as timed_out:
+            await controller.acquire()
+        return full.value, timed_out.value, controller
+
+    full, timed_out, controller = asyncio.run(scenario())
+    assert full.status_code == 429 and int(full.headers["Retry-After"]) >= 1
+    assert timed_out.status_code == 503 and controller.queued == 0
+
+
+def test_failures_back_off_and_cancelled_waiters_do_not_leak_slots():
+    async def scenario():
+        controller = AdmissionController(limit=GradientLimit(initial=10), max_queue=10, max_wait=5)
+        with pytest.raises(RuntimeError):
+            async with controller.slot():
+                raise RuntimeError("LLM timeout")
+        assert controller.limit == 9 and controller.inflight == 0
+
+        held = [await controller.acquire() for _ in range(9)]
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        for _ in held:
+            controller.release()
+        return controller
+
+    controller = asyncio.run(scenario())
+    assert controller.inflight == 0 and controller.queued == 0
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""Alert dispatcher digest, dedup and retry tests"""
+
+import asyncio
+
+from services.alert_service import AlertChannel, AlertDispatcher
+
+
+class RecordingChannel(AlertChannel):
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.digests = []
+
+    async def send(self, digest):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("channel down")
+        self.digests.append(digest)
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.acked = []
+        self.dead = []
+
+    async def xack(self, stream, group, *ids):
+        self.acked.extend(ids)
+
+    async def xadd(self, stream, fields, **kwargs):
+        self.dead.append(fields)
+
+
+def entry(user, story, severity="high", channels="email"):
+    return {"user_id": user, "story_id": story, "event_id": f"e-{story}", "severity": severity, "channels": channels}
+
+
+def test_alerts_group_into_digests_per_user_and_channel():
+    dispatcher = AlertDispatcher(RecordingRedis(), {"email": RecordingChannel(), "in_app": RecordingChannel()})
+    dispatcher.add("1-0", entry("alice", "s1", "medium", "email,in_app"))
+    dispatcher.add("2-0", entry("alice", "s2", "high"))
+    dispatcher.add("3-0", entry("alice", "s1", "low"))  # repeat about s1, lower severity
+    dispatcher.add("4-0", entry("bob", "s1", "critical"))
+
+    # The critical alert's short window closes bob's digest first
+    opened = min(d.opened_at for d in dispatcher._open.values())
+    assert [(d.user_id, d.channel) for d in dispatcher.due(now=opened + 1)] == [("bob", "email")]
+
+    digests = {(d.user_id, d.channel): d for d in dispatcher.due(flush_all=True)}
+    email = digests[("alice", "email")]
+    assert list(email.alerts) == ["s1", "s2"]
+    assert email.alerts["s1"]["severity"] == "medium" and email.repeats["s1"] == 1
+    assert email.severity == "high"
+    assert list(digests[("alice", "in_app")].alerts) == ["s1"]
+
+
+def test_failed_digests_retry_then_settle():
+    async def scenario():
+        redis = RecordingRedis()
+        flaky = RecordingChannel(failures=1)
+        dispatcher = AlertDispatcher(redis, {"email": flaky}, retry_base=0.01, max_attempts=2)
+        dispatcher.add("1-0", entry("alice", "s1"))
+        digest = dispatcher.due(flush_all=True)[0]
+
+        await dispatcher._send(digest)
+        assert not flaky.digests and not redis.acked and dispatcher._retries
+        await asyncio.sleep(0.02)
+        await dispatcher._send(dispatcher.due()[0])
+        assert flaky.digests == [digest] and redis.acked == ["1-0"]
+
+        # Delivered stories are not re-sent unless the severity rises
+        assert dispatcher.add("2-0", entry("alice", "s1", "medium")) == ["2-0"]
+        assert dispatcher.add("3-0", entry("alice", "s1", "critical")) == []
+
+    asyncio.run(scenario())
+
+
+class PendingRedis(RecordingRedis):
+    """alerts:dispatch entries pending in the group, returned by XAUTOCLAIM"""
+
+    def __init__(self, pending):
+        super().__init__()
+        self.pending = pending
+
+    async def xautoclaim(self, stream, group, consumer, min_idle_time, start_id, count):
+        return ["0-0", self.pending, []]
+
+
+def test_reclaim_folds_in_orphaned_entries_but_not_held_ones():
+    async def scenario():
+        redis = PendingRedis([
+            ("1-0", entry("alice", "s1")),   # held by an open digest here
+            ("2-0", entry("bob", "s2")),     # left behind by a dead dispatcher
+            ("3-0", None),                   # trimmed while pending
+        ])
+        dispatcher = AlertDispatcher(redis, {"email": RecordingChannel()})
+        dispatcher.add("1-0", entry("alice", "s1"))
+
+        assert await dispatcher.reclaim() == 1
+        assert redis.acked == ["3-0"]
+        digests = {d.user_id: d for d in dispatcher.due(flush_all=True)}
+        assert digests["alice"].message_ids == ["1-0"] and digests["bob"].message_ids == ["2-0"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,114 @@
+"""Alert feed index tests"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+
+from services.alert_service import AlertFeed, decode_feed_cursor, encode_feed_cursor
+from services.alert_service.feed import READ_CHUNK_BITS, alert_score, merge_heads, read_position
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+
+
+async def index_alerts(feed, count):
+    """Index ``count`` alerts a second apart, alternating severities; returns
+    their event IDs newest first"""
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    event_ids = []
+    for i in range(count):
+        event = EventModel(source="news", content={"title": f"alert {i}"}, timestamp=start + timedelta(seconds=i))
+        severity = ("high", "critical")[i % 2]
+        await feed.add(event, AnalysisResult(confidence_score=0.9, severity=severity))
+        event_ids.append(str(event.id))
+    return event_ids[::-1]
+
+
+def ids(alerts):
+    return [orjson.loads(alert)["id"] for alert in alerts]
+
+
+def test_scores_are_unique_and_time_ordered():
+    now = datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+    same_ms = [alert_score(now, seq) for seq in (41, 42, 43)]
+    assert len(set(same_ms)) == 3
+    assert alert_score(now + timedelta(milliseconds=1), 1) > max(same_ms)
+    # Exact as a Redis double
+    assert float(same_ms[0]) == same_ms[0]
+
+
+def test_cursor_round_trip_and_merge():
+    assert decode_feed_cursor(encode_feed_cursor(1709294400000042)) == 1709294400000042
+    with pytest.raises(ValueError):
+        decode_feed_cursor("%%%")
+
+    high = [("7", 7000.0), ("3", 3000.0)]
+    critical = [("9", 9000.0), ("5", 5000.0), ("1", 1000.0)]
+    assert [seq for _, seq in merge_heads([high, critical])] == [9, 7, 5, 3, 1]
+
+
+def test_read_positions_split_into_containers():
+    assert read_position(5) == (0, 5)
+    assert read_position(READ_CHUNK_BITS + 5) == (1, 5)
+
+
+def test_pages_follow_cursors_across_severities(redis):
+    async def scenario():
+        feed = AlertFeed(redis)
+        newest_first = await index_alerts(feed, 7)
+
+        pages, cursor = [], None
+        while True:
+            alerts, cursor = await feed.latest("alice", 3, cursor=cursor)
+            pages.append(ids(alerts))
+            if cursor is None:
+                break
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert sum(pages, []) == newest_first
+
+        # Filtering by severity keeps the order within it
+        alerts, _ = await feed.latest("alice", 10, severities=["critical"])
+        assert ids(alerts) == newest_first[1::2]
+
+    asyncio.run(scenario())
+
+
+def test_unread_pages_read_further_until_they_fill(redis):
+    async def scenario():
+        feed = AlertFeed(redis)
+        newest_first = await index_alerts(feed, 20)
+        for event_id in newest_first[:15]:
+            assert await feed.mark_read("alice", event_id)
+
+        # Windows of 4 and 8 are all read; the third round reaches the unread tail
+        alerts, cursor = await feed.latest("alice", 2, unread_only=True)
+        assert ids(alerts) == newest_first[15:17]
+        alerts, cursor = await feed.latest("alice", 2, cursor=cursor, unread_only=True)
+        assert ids(alerts) == newest_first[17:19]
+
+        # Out of rounds: an empty page whose cursor resumes after the read alerts
+        limited = AlertFeed(feed.redis, max_rounds=2)
+        alerts, cursor = await limited.latest("alice", 2, unread_only=True)
+        assert alerts == [] and cursor is not None
+        alerts, _ = await limited.latest("alice", 2, cursor=cursor, unread_only=True)
+        assert ids(alerts) == newest_first[15:17]
+
+    asyncio.run(scenario())
+
+
+def test_marked_alerts_drop_out_of_the_users_unread_feed(redis):
+    async def scenario():
+        feed = AlertFeed(redis)
+        newest_first = await index_alerts(feed, 3)
+
+        assert await feed.mark_read("alice", newest_first[1])
+        assert not await feed.mark_read("alice", "not-indexed")
+
+        alerts, cursor = await feed.latest("alice", 10, unread_only=True)
+        assert ids(alerts) == [newest_first[0], newest_first[2]] and cursor is None
+        # Read state is per user
+        alerts, _ = await feed.latest("bob", 10, unread_only=True)
+        assert ids(alerts) == newest_first
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+"""Analysis worker tests: retries stay pending, jobs fail once exhausted"""
+
+import asyncio
+
+import pytest
+
+from config.redis import RedisConfig, RedisStreamManager
+from services.analysis_worker import JobStore, event_message
+from services.analysis_worker.worker import AnalysisWorker
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+
+
+class FlakyPipeline:
+    def __init__(self, failures):
+        self.failures = failures
+
+    async def run(self, event, local_only=False):
+        if self.failures:
+            self.failures -= 1
+            raise TimeoutError("LLM overloaded")
+        return AnalysisResult(event_id=str(event.id), confidence_score=0.5, severity="medium")
+
+
+class RecordingJobs(JobStore):
+    def __init__(self):
+        super().__init__(redis=None)
+        self.updates = []
+
+    async def _update(self, job_id, **fields):
+        self.updates.append((job_id, fields["status"]))
+
+
+def worker(pipeline, jobs):
+    return AnalysisWorker(pipeline, RedisStreamManager(RedisConfig()), jobs, consumer_name="w")
+
+
+def test_failed_analysis_stays_pending_until_deliveries_run_out():
+    jobs = RecordingJobs()
+    analysis_worker = worker(FlakyPipeline(failures=2), jobs)
+    fields = event_message(EventModel(source="news", content={"title": "halt"}), job_id="job-1")
+
+    async def scenario():
+        # Raising leaves the entry pending for the consumer to reclaim
+        with pytest.raises(TimeoutError):
+            await analysis_worker._handle("events:raw", "1-0", fields)
+        assert jobs.updates == [("job-1", "running")]
+
+        # Out of deliveries: only now is the job failed
+        await analysis_worker._dead_letter("events:raw", "1-0", fields)
+        assert jobs.updates[-1] == ("job-1", "failed")
+
+        # A later delivery that succeeds completes the job
+        analysis_worker.pipeline.failures = 0
+        await analysis_worker._handle("events:raw", "1-0", fields)
+        assert jobs.updates[-1] == ("job-1", "completed")
+
+    asyncio.run(scenario())
+
+
+def test_unparseable_entries_fail_without_retrying():
+    jobs = RecordingJobs()
+    analysis_worker = worker(FlakyPipeline(failures=0), jobs)
+    asyncio.run(analysis_worker._handle("events:raw", "1-0", {"job_id": "job-2", "event": "{not json"}))
+    assert jobs.updates == [("job-2", "failed")]
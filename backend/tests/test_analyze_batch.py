@@ -0,0 +1,92 @@
+"""Batch analyze endpoint tests: body formats, dedup, limits and the NDJSON stream"""
+
+import json
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from shared.models.analysis import AnalysisResult
+
+
+class FakePipeline:
+    """Analyzes instantly; events whose title is "boom" fail"""
+
+    def __init__(self):
+        self.analyzed = []
+
+    async def run(self, event):
+        self.analyzed.append(event.id)
+        if event.content.get("title") == "boom":
+            raise RuntimeError("LLM unavailable")
+        return AnalysisResult(event_id=str(event.id), confidence_score=0.5, severity="medium")
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    fake = FakePipeline()
+    monkeypatch.setattr(main, "analysis_pipeline", fake)
+    monkeypatch.setattr(main, "admission", None)
+    return fake
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def event(title, **fields):
+    return {"source": "news", "content": {"title": title}, **fields}
+
+
+def read_lines(response):
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    return lines[:-1], lines[-1]["summary"]
+
+
+def test_json_array_with_duplicates_invalid_items_and_failures(client, pipeline):
+    same_id = str(uuid4())
+    body = [
+        event("halt", id=same_id),
+        event("other", id=same_id),  # duplicate ID
+        event("halt"),               # duplicate (source, content)
+        {"content": {"title": "no source"}},
+        event("boom"),
+    ]
+    response = client.post("/api/v1/analyze/batch", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    results, summary = read_lines(response)
+    assert {k: summary[k] for k in ("received", "duplicates", "invalid", "succeeded", "failed")} == {
+        "received": 5, "duplicates": 2, "invalid": 1, "succeeded": 1, "failed": 1
+    }
+    assert "elapsed_ms" in summary
+    assert len(pipeline.analyzed) == 2
+
+    errors = {line["index"]: line for line in results if "error" in line}
+    assert errors[3]["error"] == "Invalid event" and errors[3]["details"]
+    assert errors[4]["error"] == "Analysis failed"
+    assert [line["event_id"] for line in results if "error" not in line] == [same_id]
+
+
+def test_ndjson_body_is_parsed_line_by_line(client, pipeline):
+    body = "\n".join(json.dumps(event(f"event {i}")) for i in range(3)) + "\n\n{not json"
+    response = client.post(
+        "/api/v1/analyze/batch", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+    results, summary = read_lines(response)
+    assert summary["received"] == 4 and summary["succeeded"] == 3 and summary["invalid"] == 1
+    assert len(results) == 4
+
+
+def test_oversized_and_malformed_batches_are_rejected(client, pipeline, monkeypatch):
+    monkeypatch.setattr(main.settings, "batch_analyze_max_events", 2)
+    response = client.post("/api/v1/analyze/batch", json=[event(f"e{i}") for i in range(3)])
+    assert response.status_code == 413
+
+    assert client.post("/api/v1/analyze/batch", json={"source": "news"}).status_code == 400
+    assert client.post(
+        "/api/v1/analyze/batch", content=b"not json", headers={"content-type": "application/json"}
+    ).status_code == 400
@@ -0,0 +1,60 @@
+"""Streaming anomaly detector tests"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from services.risk_engine import AnomalyDetector
+from shared.models.event import EventModel
+
+
+def quiet_stream(n: int = 5000, assets: int = 40, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    names = [f"A{i}" for i in rng.integers(0, assets, n)]
+    timestamps = np.cumsum(rng.exponential(0.1, n))
+    sentiments = rng.normal(0, 0.3, n)
+    sentiments[rng.random(n) < 0.2] = np.nan
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return names, timestamps, sentiments, prices
+
+
+def test_batch_update_matches_per_event_path():
+    names, timestamps, sentiments, prices = quiet_stream()
+    batched = AnomalyDetector()
+    scores, zscores = batched.update(names, timestamps, sentiments, prices)
+
+    single = AnomalyDetector()
+    for i, name in enumerate(names):
+        score, z = single._step_one(single._row(name), timestamps[i], sentiments[i], prices[i])
+        assert abs(score - scores[i]) < 1e-9
+        np.testing.assert_allclose(z, zscores[i], atol=1e-9)
+
+
+def test_quiet_stream_rarely_escalates():
+    detector = AnomalyDetector()
+    scores, _ = detector.update(*quiet_stream(n=20000))
+    assert (scores[5000:] >= detector.escalation_score).mean() < 0.03
+
+
+def test_sentiment_crash_escalates():
+    detector = AnomalyDetector()
+    rng = np.random.default_rng(5)
+    escalations = 0
+    for i in range(200):
+        event = EventModel(
+            source="twitter",
+            content={"text": "BTC update"},
+            metadata={"sentiment_score": float(rng.normal(0.1, 0.1))},
+            timestamp=datetime.fromtimestamp(i * 10, timezone.utc)
+        )
+        escalations += detector.observe(event, "BTC").escalate
+    assert escalations <= 3
+
+    panic = EventModel(
+        source="twitter",
+        content={"text": "BTC exchange insolvent"},
+        metadata={"sentiment_score": -0.95},
+        timestamp=datetime.fromtimestamp(2000, timezone.utc)
+    )
+    signal = detector.observe(panic, "BTC")
+    assert signal.escalate and signal.zscores["sentiment"] < -3
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Verified-token cache and revocation tests"""
+
+import asyncio
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from shared.middleware.auth import AuthMiddleware, TokenCache, TokenRevocations
+
+
+def test_cached_tokens_skip_verification(monkeypatch):
+    auth = AuthMiddleware("secret", cache=TokenCache())
+    token = auth.create_access_token("alice")
+    decodes = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *a, **k: decodes.append(1) or real_decode(*a, **k))
+
+    first, second = auth.decode_token(token), auth.decode_token(token)
+    assert first == second and first["sub"] == "alice" and len(decodes) == 1
+
+    # Same cache, different secret: the digest differs, so it is verified (and fails)
+    with pytest.raises(HTTPException) as error:
+        AuthMiddleware("other", cache=auth.cache).decode_token(token)
+    assert error.value.detail == "Invalid token"
+
+
+def test_cache_entries_expire_with_the_token():
+    cache = TokenCache(max_entries=2)
+    auth = AuthMiddleware("secret", cache=cache)
+    expires_at = int(time.time()) + 1
+    token = jwt.encode({"sub": "bob", "exp": expires_at}, "secret", algorithm="HS256")
+    assert auth.decode_token(token)["sub"] == "bob"
+    time.sleep(expires_at - time.time() + 0.05)
+    with pytest.raises(HTTPException) as error:
+        auth.decode_token(token)
+    assert error.value.detail == "Token expired" and len(cache) == 0
+
+    for user in ("a", "b", "c"):
+        auth.decode_token(auth.create_access_token(user))
+    assert len(cache) == 2
+
+
+def test_revocation_applies_locally_and_is_announced(redis):
+    cache = TokenCache()
+    auth = AuthMiddleware("secret", cache=cache)
+    token = auth.create_access_token("carol")
+    payload = auth.decode_token(token)
+    # Another worker that has already verified the token
+    other = TokenCache()
+    other_auth = AuthMiddleware("secret", cache=other)
+    other_auth.decode_token(token)
+
+    async def scenario():
+        revocations = TokenRevocations(redis, cache)
+        assert await revocations.revoke(payload)
+        assert await redis.zscore(revocations.key, payload["jti"]) == payload["exp"]
+        # ...catches up from the stored set when it (re)subscribes
+        await TokenRevocations(redis, other).load()
+
+    asyncio.run(scenario())
+    for middleware in (auth, other_auth):
+        with pytest.raises(HTTPException) as error:
+            middleware.decode_token(token)
+        assert error.value.detail == "Token revoked"
+
+    # ...and applies announcements as they arrive
+    fresh = other_auth.create_access_token("dave")
+    other_auth.decode_token(fresh)
+    TokenRevocations(redis, other)._apply(f"{jwt.decode(fresh, 'secret', algorithms=['HS256'])['jti']} {time.time() + 60}")
+    with pytest.raises(HTTPException):
+        other_auth.decode_token(fresh)
+
+
+def test_job_results_require_authentication():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    response = TestClient(main.app).get("/api/v1/jobs/some-job-id")
+    assert response.status_code in (401, 403)
+
+    response = TestClient(main.app).post(
+        "/api/v1/analyze?async=true", json={"source": "news", "content": {"title": "halt"}}
+    )
+    assert response.status_code == 401  # jobs need an owner
+
+
+def test_jobs_are_only_visible_to_their_submitter(monkeypatch, redis):
+    from api.v1 import jobs as jobs_api
+    from services.analysis_worker import JobStore
+    from shared.models.event import EventModel
+
+    async def scenario():
+        monkeypatch.setattr(jobs_api.stream_manager, "redis", redis)
+        job_id = await JobStore(redis).create(EventModel(source="news", content={"title": "halt"}), owner="alice")
+
+        job = await jobs_api.get_job(job_id, user_data={"sub": "alice"})
+        assert job["status"] == "queued" and "owner" not in job
+        with pytest.raises(HTTPException) as error:
+            await jobs_api.get_job(job_id, user_data={"sub": "mallory"})
+        assert error.value.status_code == 404
+
+    asyncio.run(scenario())
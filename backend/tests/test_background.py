@@ -0,0 +1,42 @@
+"""Background task queue tests: retries, backpressure and draining"""
+
+import asyncio
+
+from shared.utils.background import BackgroundTaskQueue
+
+
+def flaky(failures: int, calls: list):
+    async def job():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise ConnectionError("transient")
+    return job
+
+
+def test_run_with_retries_backs_off_then_gives_up():
+    queue = BackgroundTaskQueue("test", max_attempts=3, base_delay=0.001)
+    recovered, exhausted = [], []
+    assert asyncio.run(queue.run_with_retries("store", flaky(2, recovered)))
+    assert len(recovered) == 3
+    assert not asyncio.run(queue.run_with_retries("store", flaky(5, exhausted)))
+    assert len(exhausted) == 3  # max_attempts is the total, not per layer
+
+
+def test_submit_rejects_when_full_and_stop_drains():
+    async def scenario():
+        queue = BackgroundTaskQueue("test", workers=1, max_depth=2, base_delay=0.001)
+        done = []
+
+        async def job():
+            await asyncio.sleep(0.001)
+            done.append(1)
+
+        assert queue.submit("a", job) and queue.submit("b", job)
+        assert not queue.submit("c", job)  # full, caller degrades
+        assert queue.depth == 2
+
+        await queue.start()
+        await queue.stop(timeout=1.0)
+        assert len(done) == 2 and queue.depth == 0 and not queue._tasks
+
+    asyncio.run(scenario())
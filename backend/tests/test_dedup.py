@@ -0,0 +1,94 @@
+"""Ingest dedup tests"""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from api.v1 import events as events_api
+from config.redis import stream_manager
+from services.ingestion_service.dedup import (
+    BloomFilter,
+    EventDeduplicator,
+    NearDuplicateIndex,
+    normalize_content,
+    simhash,
+)
+from shared.models.event import EventModel
+
+
+def make_event(text: str, event_id=None) -> EventModel:
+    return EventModel(id=event_id or uuid4(), source="twitter", content={"text": text})
+
+
+def test_bloom_filter_membership():
+    bloom = BloomFilter(capacity=1000)
+    for i in range(1000):
+        bloom.add(f"id-{i}")
+    assert all(f"id-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 10
+
+
+def test_normalize_content_strips_noise():
+    assert normalize_content("RT @whale: BTC dumping!!! https://t.co/xyz") == "btc dumping"
+
+
+def test_near_duplicate_index_respects_window():
+    index = NearDuplicateIndex(window_seconds=10, max_distance=3)
+    fingerprint = simhash("binance halts all withdrawals now".split())
+    index.add(fingerprint, "a", now=0)
+    assert index.find(fingerprint ^ 0b101, now=5) == "a"
+    assert index.find(fingerprint, now=20) is None
+    assert len(index) == 0
+
+
+def test_deduplicator_detects_replays_and_reposts():
+    dedup = EventDeduplicator()
+    original = make_event("Binance halts all withdrawals amid liquidity crisis")
+
+    result = dedup.check(original)
+    assert result.kind == "new"
+    assert dedup.check(original).kind == "new"  # checking alone remembers nothing
+    dedup.record(original, result)
+    assert dedup.check(make_event("x", event_id=original.id)).kind == "exact"
+
+    repost = dedup.check(make_event("RT @news: Binance HALTS all withdrawals amid liquidity crisis! https://t.co/a"))
+    assert repost.kind == "near"
+    assert repost.canonical_id == str(original.id)
+
+    assert dedup.check(make_event("Ethereum validators restart network after outage")).kind == "new"
+
+
+def test_failed_publish_is_not_remembered_so_the_retry_publishes(monkeypatch, redis):
+    published = []
+
+    async def flaky_publish(stream_key, message):
+        if not published:
+            published.append(None)
+            raise ConnectionError("redis unavailable")
+        published.append(message["event_id"])
+        return "1-0"
+
+    monkeypatch.setattr(events_api, "deduplicator", EventDeduplicator())
+    monkeypatch.setattr(stream_manager, "publish_event", flaky_publish)
+    event = make_event("Binance halts all withdrawals amid liquidity crisis")
+
+    async def scenario():
+        monkeypatch.setattr(stream_manager, "redis", redis)
+
+        with pytest.raises(HTTPException) as error:
+            await events_api.create_event_stream(event, user_data={})
+        assert error.value.status_code == 500
+
+        assert (await events_api.create_event_stream(event, user_data={}))["status"] == "published"
+        assert published == [None, str(event.id)]
+        assert (await events_api.create_event_stream(event, user_data={}))["status"] == "duplicate"
+
+        # Duplicate counts expire with the dedup window instead of growing forever
+        key = f"{stream_manager.config.duplicate_counts_prefix}:{event.id}"
+        assert await redis.get(key) == "1"
+        assert 0 < await redis.ttl(key) <= events_api.settings.dedup_window_seconds
+
+    asyncio.run(scenario())
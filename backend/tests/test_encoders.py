@@ -0,0 +1,68 @@
+"""Encoder backend tests"""
+
+import importlib.util
+
+import numpy as np
+import pytest
+
+from services.llm_orchestrator.encoders import (
+    EncoderUnavailableError,
+    HashingEncoder,
+    ProjectedEncoder,
+    SentenceTransformerEncoder,
+    build_encoder,
+    fit_projection,
+    save_projection,
+)
+from services.llm_orchestrator.vector_store import namespace_for
+
+
+def test_hashing_encoder_is_deterministic_and_normalized():
+    encoder = HashingEncoder(dimension=128)
+    vectors = encoder.encode(["Exchange halts withdrawals", "Exchange halts withdrawals", ""])
+    assert vectors.shape == (3, 128)
+    assert np.allclose(vectors[0], vectors[1])
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[2].any()
+
+
+def test_hashing_encoder_ranks_related_text_higher():
+    encoder = HashingEncoder(dimension=512)
+    query, related, unrelated = encoder.encode([
+        "exchange halts withdrawals",
+        "withdrawals halted at exchange",
+        "miners capitulate as hashrate drops",
+    ])
+    assert query @ related > query @ unrelated
+
+
+def test_projected_encoder_reduces_dimension(tmp_path):
+    base = HashingEncoder(dimension=64)
+    sample = base.encode([f"event number {i} about btc" for i in range(40)])
+    mean, components = fit_projection(sample, 16)
+    path = str(tmp_path / "pca.npz")
+    save_projection(path, mean, components)
+
+    encoder = ProjectedEncoder(base, path)
+    assert encoder.dimension == 16
+    assert encoder.encode(["btc event"]).shape == (1, 16)
+
+
+def test_build_encoder_refuses_unavailable_model_unless_fallback_allowed(monkeypatch):
+    with pytest.raises(EncoderUnavailableError):
+        build_encoder(model="/nonexistent/model", hashing_dimension=32)
+
+    encoder = build_encoder(model="/nonexistent/model", hashing_dimension=32, allow_fallback=True)
+    assert isinstance(encoder, HashingEncoder) and encoder.fallback
+    assert encoder.dimension == 32
+    assert namespace_for(encoder) == "events-hashing-32"
+    assert namespace_for(HashingEncoder(dimension=32)) == "events"
+
+    # Hub download failures surface when the encoder is built, not on first encode
+    def fail_download(self):
+        raise OSError("hub unreachable")
+
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: object())
+    monkeypatch.setattr(SentenceTransformerEncoder, "_load", fail_download)
+    with pytest.raises(EncoderUnavailableError, match="hub unreachable"):
+        build_encoder(model="sentence-transformers/all-mpnet-base-v2")
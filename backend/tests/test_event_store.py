@@ -0,0 +1,108 @@
+"""Event store cursor, paging, availability and batched writer tests"""
+
+import asyncio
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from services.event_store import EventStore, EventWriter, decode_cursor, encode_cursor
+from shared.models.event import EventModel
+
+
+def test_cursor_round_trip():
+    timestamp, event_id = datetime(2022, 11, 8, 14, 30, 1, 123456, tzinfo=timezone.utc), uuid4()
+    assert decode_cursor(encode_cursor(timestamp, event_id)) == (timestamp, event_id)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+class RecordingStore:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, rows):
+        self.batches.append(list(rows))
+
+
+def test_writer_batches_rows_and_flushes_on_stop():
+    store = RecordingStore()
+
+    async def run():
+        writer = EventWriter(store, batch_size=10, flush_interval=0.05)
+        await writer.start()
+        events = [EventModel(source="twitter", content={"text": f"event {i}"}) for i in range(25)]
+        for event in events:
+            assert writer.add(event, asset="BTC")
+        writer.add(events[-1], asset="ETH")  # same event again within one batch: latest wins
+        await writer.stop()
+
+    asyncio.run(run())
+    sizes = [len(batch) for batch in store.batches]
+    assert sizes[:2] == [10, 10]
+    assert sum(sizes) == 25
+    assert store.batches[-1][-1]["asset"] == "ETH"
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, rows, error=None):
+        self.rows = rows
+        self.error = error
+
+    async def __aenter__(self):
+        if self.error is not None:
+            raise self.error
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query):
+        return FakeResult(self.rows)
+
+
+class FakeDatabase:
+    def __init__(self, rows=(), error=None):
+        self.engine = self
+        self.rows = list(rows)
+        self.error = error
+
+    def connect(self):
+        return FakeConnection(self.rows, self.error)
+
+
+def row(i):
+    return {"timestamp": datetime(2024, 1, 1, 0, 0, i, tzinfo=timezone.utc), "id": uuid4()}
+
+
+def test_page_cursor_comes_from_the_last_row_returned():
+    rows = [row(i) for i in (3, 2, 1)]
+    store = EventStore(FakeDatabase(rows))
+    query = store.listing_query(3)
+
+    page, cursor = asyncio.run(store.page(query, 3))
+    assert page == rows
+    assert decode_cursor(cursor) == (rows[-1]["timestamp"], rows[-1]["id"])
+
+    # A short page is the last one
+    assert asyncio.run(store.page(query, 4)) == (rows, None)
+    assert b"".join(EventStore.iter_json(rows[:1], lambda r: {"id": str(r["id"])})) == (
+        b'[{"id":"' + str(rows[0]["id"]).encode() + b'"}]'
+    )
+
+
+def test_unreachable_database_is_reported_unavailable():
+    assert asyncio.run(EventStore(FakeDatabase(rows=[row(1)])).available())
+    store = EventStore(FakeDatabase(error=ConnectionRefusedError("postgres down")))
+    assert not asyncio.run(store.available())
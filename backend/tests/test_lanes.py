@@ -0,0 +1,64 @@
+"""Urgency lane scheduling and load-shedding tests"""
+
+import asyncio
+import random
+
+from config.redis import RedisConfig, RedisStreamManager
+from services.analysis_worker import event_urgency
+from shared.models.event import EventModel
+from shared.streams import LoadShedder, StreamConsumer, WeightedRoundRobin, lane_of
+from shared.streams.lanes import DROP, FULL, LOCAL
+
+
+def test_weighted_round_robin_interleaves_and_unused_shares_move_on(redis):
+    wrr = WeightedRoundRobin({"critical": 8, "high": 4, "normal": 2, "low": 1})
+    picks = [wrr.pick(["critical", "high", "normal", "low"]) for _ in range(15)]
+    assert picks.count("critical") == 8 and picks.count("low") == 1
+    assert picks[:3] == ["critical", "high", "critical"]
+
+    async def scenario():
+        backlog = {"critical": 2, "high": 0, "normal": 100, "low": 100}
+        for stream, count in backlog.items():
+            await redis.xgroup_create(stream, "g", id="0", mkstream=True)
+            for _ in range(count):
+                await redis.xadd(stream, {"k": "v"})
+        weights = {"critical": 8, "high": 4, "normal": 2, "low": 1}
+        consumer = StreamConsumer(redis, list(weights), "g", handler=None, weights=weights)
+        dispatched = {}
+        consumer.dispatch = lambda stream, messages: dispatched.update({stream: dispatched.get(stream, 0) + len(messages)})
+        received = await consumer._read_weighted(list(weights), 30)
+        return received, dispatched
+
+    received, dispatched = asyncio.run(scenario())
+    # Critical gets all it has; its and high's unused slots go to normal and low 2:1
+    assert received == 30
+    assert dispatched == {"critical": 2, "normal": 19, "low": 9}
+
+
+def test_shedder_degrades_then_samples_sheddable_lanes_only():
+    shedder = LoadShedder({"low": (30, 120)}, sample_rate=0.0, rng=random.Random(1))
+    assert shedder.decide("low", 5) == FULL
+    assert shedder.decide("low", 60) == LOCAL
+    assert shedder.decide("low", 600) == DROP
+    # Jobs someone is waiting on are degraded, never dropped
+    assert shedder.decide("low", 600, required=True) == LOCAL
+    assert shedder.decide("critical", 3600) == FULL
+
+
+def test_events_route_to_lanes_and_critical_lane_is_not_trimmed():
+    def event(text, source="twitter", **metadata):
+        return EventModel(source=source, content={"text": text}, metadata=metadata)
+
+    assert event_urgency(event("Exchange halts withdrawals after hack")) == "critical"
+    assert event_urgency(event("ETH upgrade date set", source="news")) == "high"
+    assert event_urgency(event("gm", relevance_score=0.1)) == "low"
+    assert event_urgency(event("gm", urgency="critical")) == "critical"
+    assert event_urgency(event("BTC looks strong")) == "normal"
+
+    manager = RedisStreamManager(RedisConfig(event_partitions=4, stream_max_len=100))
+    stream = manager.event_stream_for("BTC", "critical")
+    assert stream.startswith("events:raw:critical:") and lane_of("events:raw", stream) == "critical"
+    assert lane_of("events:raw", manager.event_stream_for("BTC")) == "normal"
+    assert len(manager.event_streams) == 16
+    assert manager.max_len_for(stream) is None
+    assert manager.max_len_for(manager.event_stream_for("BTC", "low")) == 100
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""Market data ring buffer and rolling stats tests"""
+
+import asyncio
+import json
+
+import numpy as np
+
+from services.market_data import AssetSeries, MarketDataService, ReplayFeed, RingBuffer
+
+
+def test_ring_buffer_matches_numpy_window():
+    rng = np.random.default_rng(7)
+    values = rng.normal(100, 5, size=1000)
+    buffer = RingBuffer(64)
+    for value in values:
+        buffer.push(value)
+
+    window = values[-64:]
+    np.testing.assert_allclose(buffer.view(), window)
+    assert abs(buffer.mean - window.mean()) < 1e-9
+    assert abs(buffer.std - window.std(ddof=1)) < 1e-9
+    assert buffer.oldest == window[0] and buffer.last == window[-1]
+
+
+def test_asset_series_rolling_stats():
+    rng = np.random.default_rng(11)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=500)))
+    volumes = rng.uniform(10, 20, size=500)
+    series = AssetSeries(window=100)
+    for t, (price, volume) in enumerate(zip(prices, volumes)):
+        series.push(float(t), price, volume)
+
+    stats = series.stats()
+    window = prices[-100:]
+    assert abs(stats["rolling_return"] - (window[-1] / window[0] - 1)) < 1e-9
+    assert abs(stats["volatility"] - np.diff(np.log(window)).std(ddof=1)) < 1e-9
+    assert abs(stats["drawdown"] - (window[-1] / window.max() - 1)) < 1e-9
+    expected_z = (volumes[-1] - volumes[-100:].mean()) / volumes[-100:].std(ddof=1)
+    assert abs(stats["volume_zscore"] - expected_z) < 1e-9
+
+
+def test_replay_feed_populates_snapshot(tmp_path):
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(
+        json.dumps({"timestamp": i, "asset": asset, "price": price + i, "volume": 1.0})
+        for i in range(10)
+        for asset, price in (("BTC", 45000), ("TOTAL", 1.7e12))
+    ))
+    service = MarketDataService(ReplayFeed(str(path), speed=0), window=5)
+
+    async def replay():
+        async for tick in service.feed.stream():
+            service.ingest(tick)
+
+    asyncio.run(replay())
+    snapshot = service.snapshot()
+    assert snapshot["btc_price"] == 45009
+    assert snapshot["assets"]["BTC"]["samples"] == 5
+    assert snapshot is service.snapshot()
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""Index migration tests: version registry, promote/rollback, re-embedding and dual-write"""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from services.llm_orchestrator import vector_store
+from services.llm_orchestrator.encoders import HashingEncoder
+from services.llm_orchestrator.migration import IndexMigrator, VersionRegistry, VersionSpec, apply_registry
+from shared.models.event import EventModel
+
+
+class FakeIndex:
+    """In-memory stand-in for a Pinecone index, keyed by namespace"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.namespaces = {}
+
+    def upsert(self, vectors, namespace):
+        if self.fail:
+            raise ConnectionError("index unavailable")
+        self.namespaces.setdefault(namespace, {}).update((i, (v, m)) for i, v, m in vectors)
+
+    def fetch(self, ids, namespace):
+        stored = self.namespaces.get(namespace, {})
+        return SimpleNamespace(vectors={
+            i: SimpleNamespace(metadata=stored[i][1]) for i in ids if i in stored
+        })
+
+    def query(self, vector, top_k, namespace, **kwargs):
+        stored = self.namespaces.get(namespace, {})
+        scored = sorted(stored.items(), key=lambda item: -float(np.dot(item[1][0], vector)))
+        return SimpleNamespace(matches=[
+            SimpleNamespace(id=i, score=float(np.dot(v, vector)), metadata=m) for i, (v, m) in scored[:top_k]
+        ])
+
+
+class FakePinecone:
+    def __init__(self):
+        self.indexes = {}
+
+    def init(self, **kwargs):
+        pass
+
+    def list_indexes(self):
+        return list(self.indexes)
+
+    def create_index(self, name, **kwargs):
+        self.indexes[name] = FakeIndex()
+
+    def Index(self, name):
+        return self.indexes[name]
+
+
+@pytest.fixture
+def pinecone(monkeypatch):
+    fake = FakePinecone()
+    monkeypatch.setattr(vector_store, "pinecone", fake)
+    return fake
+
+
+def spec(name, dimension):
+    return VersionSpec(name, f"events-{name}", "events", "hashing", "", hashing_dimension=dimension)
+
+
+def make_event(title):
+    return EventModel(id=uuid4(), source="news", timestamp=datetime.now(timezone.utc), content={"title": title})
+
+
+def test_registry_promote_and_rollback_switch_every_process(pinecone, redis):
+    async def scenario():
+        registry = VersionRegistry(redis)
+        with pytest.raises(ValueError):
+            await registry.rollback()  # nothing to roll back to yet
+
+        store = vector_store.EventVectorStore("events-v1", encoder=HashingEncoder(dimension=16))
+        original = store.active
+        opened = {}
+
+        await registry.set_shadow(spec("v2", 32), default_active=spec("v1", 16))
+        await apply_registry(store, registry, opened)
+        assert store.shadow.name == "v2" and store.active is original
+
+        await registry.promote(spec("v2", 32))
+        await apply_registry(store, registry, opened)
+        assert store.active.name == "v2" and store.shadow is None
+        assert (await registry.get())["previous"].name == "v1"
+
+        assert (await registry.rollback()).name == "v1"
+        await apply_registry(store, registry, opened)
+        assert store.active is original  # the previously open version is reused
+
+        await registry.rollback()
+        assert (await registry.get())["active"].name == "v2"
+
+    asyncio.run(scenario())
+
+
+def test_reembed_skips_vectors_without_source_text(pinecone, redis):
+    async def scenario():
+        store = vector_store.EventVectorStore("events-v1", encoder=HashingEncoder(dimension=16))
+        events = [make_event(f"exchange halts withdrawals {i}") for i in range(3)]
+        await store.store_events(events)
+        legacy_id = str(uuid4())
+        store.upsert_vectors([(legacy_id, [0.0] * 16, {"event_id": legacy_id, "source": "news"})])
+
+        migrator = IndexMigrator(store, VersionRegistry(redis), spec("v2", 32), sync_interval=0)
+        progress = await migrator.run([str(e.id) for e in events] + [legacy_id, str(uuid4())], min_overlap=0.0)
+        assert progress.state == "promoted"
+        assert progress.processed == 3 and progress.missing == 2
+        assert set(pinecone.indexes["events-v2"].namespaces["events"]) == {str(e.id) for e in events}
+        assert store.active.name == "v2"
+
+    asyncio.run(scenario())
+
+
+def test_failing_shadow_index_does_not_fail_live_write(pinecone):
+    async def scenario():
+        store = vector_store.EventVectorStore("events-v1", encoder=HashingEncoder(dimension=16))
+        shadow = store.open_version("v2", "events-v2", "events", HashingEncoder(dimension=32))
+        shadow.index.fail = True
+        store.set_shadow(shadow)
+
+        before = vector_store.shadow_write_errors.labels(version="v2")._value.get()
+        event = make_event("stablecoin depegs")
+        await store.store_event(event, {})
+        await store.store_events([make_event("bridge exploited")])
+        assert str(event.id) in pinecone.indexes["events-v1"].namespaces["events"]
+        assert vector_store.shadow_write_errors.labels(version="v2")._value.get() == before + 2
+
+    asyncio.run(scenario())
+
+
+def test_migration_with_nothing_reembedded_is_never_promoted(pinecone, redis):
+    async def scenario():
+        store = vector_store.EventVectorStore("events-v1", encoder=HashingEncoder(dimension=16))
+        legacy_id = str(uuid4())
+        store.upsert_vectors([(legacy_id, [0.0] * 16, {"event_id": legacy_id, "source": "news"})])
+
+        registry = VersionRegistry(redis)
+        migrator = IndexMigrator(store, registry, spec("v2", 32), sync_interval=0)
+        progress = await migrator.run([legacy_id], min_overlap=0.0)
+        assert progress.state == "verification_failed" and progress.processed == 0
+        assert store.active.name == "v1" and (await registry.get())["active"].name == "v1"
+
+        # No measurable overlap is a failure too, not a perfect score
+        assert await migrator.verify([]) is None
+
+    asyncio.run(scenario())
+
+
+def test_default_version_records_the_fallback_namespace():
+    fallback = HashingEncoder(dimension=16)
+    fallback.fallback = True
+    recorded = VersionSpec.from_settings(fallback)
+    assert recorded.namespace == vector_store.namespace_for(fallback) != vector_store.DEFAULT_NAMESPACE
+    assert recorded.encoder_backend == "hashing"
@@ -0,0 +1,60 @@
+"""Stream partitioning and keyed ordering tests"""
+
+import asyncio
+import random
+
+from shared.streams import StreamConsumer, assign_partitions, partition_of, partition_streams, stream_for
+
+
+def test_keys_map_to_stable_partitions():
+    assert partition_streams("events:raw", 1) == ["events:raw"]
+    assert partition_streams("events:raw", 3) == ["events:raw:0", "events:raw:1", "events:raw:2"]
+    assert stream_for("events:raw", "BTC", 1) == "events:raw"
+    # crc32, so the same on every process and release
+    assert partition_of("BTC", 16) == partition_of("BTC", 16) == 3176990918 % 16
+
+    counts = [0] * 8
+    for i in range(8000):
+        counts[partition_of(f"asset-{i}", 8)] += 1
+    assert min(counts) > 800
+
+
+def test_rendezvous_moves_only_what_it_must():
+    workers = [f"worker-{i}" for i in range(4)]
+    before = assign_partitions(workers, 64)
+    assert set(before.values()) == set(workers)
+    assert assign_partitions(list(reversed(workers)), 64) == before
+
+    after_join = assign_partitions(workers + ["worker-4"], 64)
+    moved = [p for p in before if before[p] != after_join[p]]
+    assert moved and all(after_join[p] == "worker-4" for p in moved)
+
+    after_leave = assign_partitions(workers[1:], 64)
+    assert all(after_leave[p] == before[p] for p in before if before[p] != "worker-0")
+
+
+def test_same_key_entries_run_in_order_others_concurrently():
+    handled = []
+    running = 0
+    overlap = 0
+
+    async def handler(stream, message_id, fields):
+        nonlocal running, overlap
+        running += 1
+        overlap = max(overlap, running)
+        await asyncio.sleep(random.random() / 200)
+        handled.append((fields["key"], int(message_id.split("-")[1])))
+        running -= 1
+
+    async def scenario():
+        consumer = StreamConsumer(None, ["s"], "g", handler, order_key=lambda fields: fields.get("key"))
+        consumer.dispatch("s", [(f"1-{i}", {"key": f"A{i % 3}"}) for i in range(30)])
+        await asyncio.gather(*consumer._tasks)
+        assert not consumer._tails
+
+    random.seed(0)
+    asyncio.run(scenario())
+    for key in ("A0", "A1", "A2"):
+        sequence = [seq for k, seq in handled if k == key]
+        assert sequence == sorted(sequence) and len(sequence) == 10
+    assert overlap == 3
\ No newline at end of file
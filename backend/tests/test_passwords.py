@@ -0,0 +1,53 @@
+"""Password hashing pool tests"""
+
+import asyncio
+import time
+
+from shared.utils.passwords import HasherBusy, PasswordHasher
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(rounds=4)
+
+    async def scenario():
+        hashed = await hasher.hash("correct horse")
+        assert hashed.startswith("$2b$04$")
+        assert await hasher.verify("correct horse", hashed)
+        assert not await hasher.verify("wrong horse", hashed)
+
+    asyncio.run(scenario())
+    hasher.close()
+
+
+def test_event_loop_keeps_running_while_hashing():
+    hasher = PasswordHasher(rounds=10, workers=1)
+
+    async def scenario():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await hasher.hash("password")
+        task.cancel()
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        assert len(ticks) > 3 and max(gaps) < 0.05
+
+    asyncio.run(scenario())
+    hasher.close()
+
+
+def test_saturated_pool_sheds_calls():
+    hasher = PasswordHasher(rounds=8, workers=1, max_pending=2)
+
+    async def scenario():
+        results = await asyncio.gather(*(hasher.hash("password") for _ in range(4)), return_exceptions=True)
+        assert sum(isinstance(r, HasherBusy) for r in results) == 2
+        assert hasher.pending == 0
+        await hasher.hash("password")  # capacity is back
+
+    asyncio.run(scenario())
+    hasher.close()
\ No newline at end of file
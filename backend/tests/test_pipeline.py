@@ -0,0 +1,44 @@
+"""Analysis pipeline tests: cached results match fresh ones"""
+
+import asyncio
+
+import numpy as np
+import orjson
+
+from services.llm_orchestrator.orchestrator import LLMOrchestrator
+from services.llm_orchestrator.pipeline import AnalysisPipeline
+from services.llm_orchestrator.stories import StoryClusterer
+from shared.models.event import EventModel
+
+
+class FakeVectorStore:
+    def embed_event(self, event):
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    async def find_similar_events(self, event, embedding=None):
+        return []
+
+    async def store_event(self, event, analysis):
+        pass
+
+
+def test_cache_hit_has_the_same_shape_as_a_miss(monkeypatch, redis):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    orchestrator = LLMOrchestrator()
+
+    async def agent(*args, **kwargs):
+        return {"confidence_score": 0.8, "severity": "high", "risk_factors": ["liquidity"]}
+
+    for name in ("_primary_analysis", "_sentiment_analysis", "_historical_comparison", "_market_impact_analysis"):
+        monkeypatch.setattr(orchestrator, name, agent)
+
+    pipeline = AnalysisPipeline(orchestrator, FakeVectorStore(), StoryClusterer(), redis)
+    event = EventModel(source="news", content={"title": "Exchange halts withdrawals"})
+
+    async def scenario():
+        fresh = await pipeline.run(event)
+        return fresh, await pipeline.cached_result(event)
+
+    fresh, cached = asyncio.run(scenario())
+    assert fresh.reasoning["story_id"] and fresh.reasoning["story_trigger"] == "open"
+    assert orjson.loads(cached) == orjson.loads(orjson.dumps(fresh.model_dump()))
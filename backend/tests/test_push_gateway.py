@@ -0,0 +1,57 @@
+"""Push gateway fan-out and backpressure tests"""
+
+import asyncio
+
+from services.push_gateway import DISCONNECT, PushHub, Subscriber
+
+
+def test_channel_filtering_and_coalescing():
+    async def scenario():
+        hub = PushHub(redis=None)
+        everything = await hub.subscribe(["events:analyzed"])
+        critical = await hub.subscribe(["alerts:critical"])
+        for i, severity in enumerate(["low", "critical", "high", "critical"]):
+            hub.publish(f"1700000000000-{i}", {"event_id": str(i), "severity": severity})
+
+        frames, dropped = await everything.next_batch()
+        assert [frame[0] for frame in frames] == [f"1700000000000-{i}" for i in range(4)]
+        frames, _ = await critical.next_batch()
+        assert [frame[0] for frame in frames] == ["1700000000000-1", "1700000000000-3"]
+        assert frames[0][2] == b'{"event_id":"1","severity":"critical"}'
+
+        hub.unsubscribe(critical)
+        hub.publish("1700000000001-0", {"severity": "critical"})
+        assert hub.subscribers() == {everything}
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_drop_policies():
+    async def scenario():
+        oldest = Subscriber(["events:analyzed"], max_pending=3)
+        strict = Subscriber(["events:analyzed"], max_pending=3, drop_policy=DISCONNECT)
+        for i in range(5):
+            frame = (f"1-{i}", "events:analyzed", b"{}")
+            oldest.offer(frame)
+            strict.offer(frame)
+
+        frames, dropped = await oldest.next_batch()
+        assert [frame[0] for frame in frames] == ["1-2", "1-3", "1-4"] and dropped == 2
+        assert strict.closed and strict.overflowed
+
+    asyncio.run(scenario())
+
+
+def test_resume_backlog_skips_live_duplicates():
+    async def scenario():
+        subscriber = Subscriber(["events:analyzed"])
+        # Live messages arrive while the backlog is being read
+        subscriber.offer(("5-0", "events:analyzed", b"{}"))
+        subscriber.offer(("6-0", "events:analyzed", b"{}"))
+        subscriber.prepend_backlog([(f"{i}-0", "events:analyzed", b"{}") for i in (3, 4, 5)])
+        subscriber.offer(("5-0", "events:analyzed", b"{}"))
+
+        frames, _ = await subscriber.next_batch()
+        assert [frame[0] for frame in frames] == ["3-0", "4-0", "5-0", "6-0"]
+
+    asyncio.run(scenario())
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""Rate limiter tests: local pre-check, client keys and ASGI tiers"""
+
+import asyncio
+
+from shared.middleware.auth import AuthMiddleware, TokenCache
+from shared.middleware.rate_limit import RateLimiter, RateLimitMiddleware, _LocalBuckets, client_key, parse_limit
+
+
+class ScriptRedis:
+    """Records GCRA script calls and answers from a fixed budget"""
+
+    def __init__(self, budget: int = 1000, fail: bool = False):
+        self.budget = budget
+        self.fail = fail
+        self.calls = []
+
+    def register_script(self, source):
+        async def script(keys, args):
+            self.calls.append(keys[0])
+            if self.fail:
+                raise ConnectionError("redis down")
+            self.budget -= 1
+            return [1, self.budget, 0] if self.budget >= 0 else [0, 0, 2_500_000]
+        return script
+
+
+def test_local_buckets_reject_without_redis_and_refund():
+    buckets = _LocalBuckets(max_clients=2)
+    assert [buckets.take("a", rate=1.0, burst=3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("a", rate=1.0, burst=3) > 0
+    buckets.refund("a", burst=3)
+    assert buckets.take("a", rate=1.0, burst=3) == 0.0
+
+    buckets.take("b", rate=1.0, burst=3)
+    buckets.take("c", rate=1.0, burst=3)
+    assert "a" not in buckets._buckets  # least recently used evicted
+
+    redis = ScriptRedis()
+    limiter = RateLimiter(redis, limits={"api": (2, 60)})
+    results = [asyncio.run(limiter.hit("api", "client")) for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, False, False]
+    assert len(redis.calls) == 2  # over-limit requests never reached Redis
+
+
+def test_shared_rejection_and_fail_open():
+    limiter = RateLimiter(ScriptRedis(budget=1), limits={"api": (10, 60)})
+    allowed, rejected = asyncio.run(limiter.hit("api", "c")), asyncio.run(limiter.hit("api", "c"))
+    assert allowed.allowed and not rejected.allowed and rejected.retry_after == 2.5
+
+    down = RateLimiter(ScriptRedis(fail=True), limits={"api": (10, 60)})
+    assert asyncio.run(down.hit("api", "c")).allowed
+    assert parse_limit("5/30") == (5, 30.0)
+
+
+def test_middleware_tiers_and_headers():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = RateLimitMiddleware(app, "redis://localhost:6379", limits={"api": (1, 60), "llm": (1, 60)})
+    middleware.limiter = RateLimiter(ScriptRedis(), limits=middleware.limits)
+    assert middleware.tier_for("/api/v1/analyze") == "llm"
+    assert middleware.tier_for("/api/v1/stream/ws") is None
+    assert middleware.tier_for("/health") is None
+
+    token = [(b"authorization", b"Bearer abc")]
+    assert client_key({"headers": token, "client": ("1.2.3.4", 1)}) == "ip:1.2.3.4"  # never verified
+    assert client_key({"headers": [], "client": ("1.2.3.4", 1)}) == "ip:1.2.3.4"
+
+    async def request(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": token, "client": ("1.2.3.4", 1)}
+        await middleware(scope, None, send)
+        return sent[0]
+
+    async def scenario():
+        first = await request("/api/v1/events")
+        assert first["status"] == 200 and (b"x-ratelimit-limit", b"1") in first["headers"]
+        second = await request("/api/v1/events")
+        assert second["status"] == 429 and dict(second["headers"])[b"retry-after"] == b"60"
+        assert (await request("/api/v1/analyze"))["status"] == 200  # separate tier
+        assert (await request("/health"))["status"] == 200
+
+    asyncio.run(scenario())
+
+
+def test_only_verified_tokens_are_keyed_by_user():
+    auth = AuthMiddleware("test-secret", cache=TokenCache())
+    valid = auth.create_access_token("alice").encode()
+    headers = lambda token: [(b"authorization", b"Bearer " + token)]
+    assert client_key({"headers": headers(valid), "client": ("1.2.3.4", 1)}, auth) == "user:alice"
+    assert client_key({"headers": headers(valid), "client": ("5.6.7.8", 1)}, auth) == "user:alice"
+    assert client_key({"headers": headers(b"garbage"), "client": ("1.2.3.4", 1)}, auth) == "ip:1.2.3.4"
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = RateLimitMiddleware(app, "redis://localhost:6379", limits={"api": (3, 60)}, auth=auth)
+    middleware.limiter = RateLimiter(ScriptRedis(), limits=middleware.limits)
+
+    async def request(token):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/api/v1/events", "headers": headers(token), "client": ("1.2.3.4", 1)}
+        await middleware(scope, None, send)
+        return sent[0]["status"]
+
+    async def scenario():
+        # A fresh made-up token per request still counts against the address
+        statuses = [await request(f"garbage-{i}".encode()) for i in range(5)]
+        assert statuses == [200, 200, 200, 429, 429]
+        # A verified user from the same address has their own limit
+        assert await request(valid) == 200
+
+    asyncio.run(scenario())
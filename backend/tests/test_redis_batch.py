@@ -0,0 +1,82 @@
+"""Auto-batching Redis client tests"""
+
+import asyncio
+
+from redis import asyncio as aioredis
+
+from shared.utils.redis_batch import AutoBatchingRedis
+from tests.conftest import FakeRedis
+
+
+class CountingRedis(FakeRedis):
+    """INCR counts per key; INCR on "text" fails like a non-integer value"""
+
+    def __init__(self):
+        super().__init__()
+        self.counts = {}
+        self.direct = []
+        self.down = False
+
+    @property
+    def pipelines(self):
+        return [len(commands) for commands in self.executed]
+
+    def execute(self, commands):
+        if self.down:
+            self.executed.append(commands)
+            raise aioredis.ConnectionError("down")
+        return super().execute(commands)
+
+    def reply(self, name, args):
+        if args[0] == "text":
+            return aioredis.ResponseError("value is not an integer")
+        self.counts[args[0]] = self.counts.get(args[0], 0) + 1
+        return self.counts[args[0]]
+
+    async def incr(self, key):
+        self.direct.append(key)
+        return self.reply("incr", (key,))
+
+    async def xreadgroup(self, *args, **kwargs):
+        return "passed through"
+
+
+def test_concurrent_calls_share_one_pipeline_and_get_their_own_replies():
+    async def scenario():
+        redis = CountingRedis()
+        client = AutoBatchingRedis(redis)
+        replies = await asyncio.gather(*[client.incr("a") for _ in range(50)], client.incr("b"))
+        alone = await client.incr("c")
+        return redis, replies, alone
+
+    redis, replies, alone = asyncio.run(scenario())
+    assert redis.pipelines == [51]
+    assert sorted(replies[:50]) == list(range(1, 51)) and replies[50] == 1
+    # A lone command skips the pipeline
+    assert alone == 1 and redis.direct == ["c"]
+
+
+def test_errors_reach_only_the_callers_they_belong_to():
+    async def scenario():
+        redis = CountingRedis()
+        client = AutoBatchingRedis(redis)
+        replies = await asyncio.gather(client.incr("a"), client.incr("text"), return_exceptions=True)
+        redis.down = True
+        failed = await asyncio.gather(client.incr("a"), client.incr("b"), return_exceptions=True)
+        return replies, failed
+
+    replies, failed = asyncio.run(scenario())
+    assert replies[0] == 1 and isinstance(replies[1], aioredis.ResponseError)
+    assert all(isinstance(reply, aioredis.ConnectionError) for reply in failed)
+
+
+def test_full_batches_go_early_and_other_commands_pass_through():
+    async def scenario():
+        redis = CountingRedis()
+        client = AutoBatchingRedis(redis, window=10.0, max_batch=4)
+        replies = await asyncio.wait_for(asyncio.gather(*[client.incr("a") for _ in range(8)]), 1)
+        return redis, replies, await client.xreadgroup("g", "c", {"s": ">"}, block=0)
+
+    redis, replies, passed = asyncio.run(scenario())
+    assert redis.pipelines == [4, 4] and sorted(replies) == list(range(1, 9))
+    assert passed == "passed through"
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""Story clustering tests: assignment, inheritance, failure retries and expiry"""
+
+import asyncio
+
+import numpy as np
+
+from services.llm_orchestrator.pipeline import AnalysisPipeline
+from services.llm_orchestrator.stories import StoryClusterer
+from shared.models.analysis import AnalysisResult
+from shared.models.event import EventModel
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def event(title="Exchange halts withdrawals"):
+    return EventModel(source="news", content={"title": title})
+
+
+def test_assign_opens_joins_and_grows_centroid_matrix():
+    clusterer = StoryClusterer(similarity_threshold=0.8, initial_capacity=1)
+    story, reason = clusterer.assign(event("BTC halts"), unit(1, 0, 0), now=0.0)
+    assert reason == "open"
+    joined, reason = clusterer.assign(event("BTC halts again"), unit(1, 0.1, 0), now=1.0)
+    assert joined is story and reason == "retry"  # never analysed yet
+    other, reason = clusterer.assign(event("ETH upgrade"), unit(0, 1, 0), now=2.0)
+    assert other is not story and reason == "open"
+
+    assert clusterer._centroids.shape[0] >= 2
+    assert np.isclose(np.linalg.norm(clusterer.centroid(story)), 1.0)
+    assert clusterer.centroid(story) @ unit(1, 0, 0) > 0.99
+
+
+def test_members_inherit_pending_analysis():
+    async def scenario():
+        clusterer = StoryClusterer()
+        story, _ = clusterer.assign(event(), unit(1, 0), now=0.0)
+        assert clusterer.begin_analysis(story)
+        pending = story.pending
+        assert not clusterer.begin_analysis(story) and story.pending is pending  # never replaced
+
+        member = event("Exchange halts all withdrawals")
+        joined, reason = clusterer.assign(member, unit(1, 0.05), now=1.0)
+        assert joined is story and reason is None
+        waiter = asyncio.create_task(clusterer.inherited_analysis(story, member))
+        await asyncio.sleep(0)
+
+        result = AnalysisResult(event_id="origin", confidence_score=0.9, severity="high", reasoning={"k": 1})
+        clusterer.finish_analysis(story, result, now=2.0)
+        inherited = await waiter
+        assert inherited.event_id == str(member.id)
+        assert inherited.reasoning["inherited_from"] == "origin" and inherited.reasoning["story_id"] == story.id
+
+    asyncio.run(scenario())
+
+
+class FailingOrchestrator:
+    def __init__(self):
+        self.calls = 0
+
+    async def analyze_event(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        raise TimeoutError("LLM overloaded")
+
+
+class FixedEmbeddingStore:
+    def embed_event(self, event):
+        return unit(1, 0, 0)
+
+    async def find_similar_events(self, event, embedding=None):
+        return []
+
+
+def test_failed_story_analysis_is_retried_by_one_member(redis):
+    async def scenario():
+        orchestrator = FailingOrchestrator()
+        clusterer = StoryClusterer(failure_retry_interval=30.0)
+        pipeline = AnalysisPipeline(orchestrator, FixedEmbeddingStore(), clusterer, redis)
+
+        results = await asyncio.gather(*(pipeline.run(event()) for _ in range(50)), return_exceptions=True)
+        assert orchestrator.calls == 1
+        assert sum(isinstance(r, TimeoutError) for r in results) == 1
+        assert all(r.reasoning["mode"] == "local" for r in results if isinstance(r, AnalysisResult))
+
+        story = next(iter(clusterer.stories.values()))
+        assert story.pending is None and story.failed_at is not None
+        assert clusterer.begin_analysis(story, retry=True, now=story.failed_at + 31)
+
+    asyncio.run(scenario())
+
+
+def test_stale_stories_expire_and_free_their_rows():
+    clusterer = StoryClusterer(half_life_seconds=10.0)
+    story, _ = clusterer.assign(event(), unit(1, 0), now=0.0)
+    later, reason = clusterer.assign(event("Unrelated"), unit(0, 1), now=1000.0)
+    assert story.id not in clusterer.stories and reason == "open"
+    assert later.row == story.row  # the expired story's row is reused
+    assert list(clusterer.stories) == [later.id]
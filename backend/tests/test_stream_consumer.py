@@ -0,0 +1,101 @@
+"""Stream consumer batching, ack and reclaim tests"""
+
+import asyncio
+
+from shared.streams import StreamConsumer
+from tests.conftest import FakeRedis
+
+
+class PendingRedis(FakeRedis):
+    """XPENDING answers from ``deliveries``"""
+
+    def __init__(self, deliveries=None):
+        super().__init__()
+        self.deliveries = deliveries or {}
+
+    def reply(self, name, args):
+        if name == "xpending_range":
+            return [{"message_id": args[2], "times_delivered": self.deliveries.get(args[2], 1)}]
+        return super().reply(name, args)
+
+
+def test_batch_size_adapts_to_backlog():
+    consumer = StreamConsumer(FakeRedis(), ["s"], "g", handler=None, min_batch=16, max_batch=64)
+    consumer._adapt(received=16, requested=16)
+    consumer._adapt(received=32, requested=32)
+    consumer._adapt(received=64, requested=64)
+    assert consumer.batch_size == 64
+    consumer._adapt(received=3, requested=64)
+    assert consumer.batch_size == 32
+    consumer._adapt(received=0, requested=32)
+    consumer._adapt(received=0, requested=16)
+    assert consumer.batch_size == 16
+
+
+def test_successes_are_acked_in_one_pipeline_and_failures_stay_pending():
+    async def handler(stream, message_id, fields):
+        if fields.get("fail"):
+            raise ValueError("boom")
+
+    async def scenario():
+        redis = FakeRedis()
+        consumer = StreamConsumer(redis, ["a", "b"], "g", handler)
+        consumer.dispatch("a", [("1-0", {}), ("1-1", {"fail": "1"}), ("1-2", {})])
+        consumer.dispatch("b", [("2-0", {})])
+        assert consumer.inflight == 4
+        await asyncio.gather(*consumer._tasks)
+        await consumer.flush_acks()
+        assert redis.executed == [[("xack", ("a", "g", "1-0", "1-2")), ("xack", ("b", "g", "2-0"))]]
+        assert consumer.inflight == 0
+
+    asyncio.run(scenario())
+
+
+def test_exhausted_entries_are_dead_lettered():
+    handled = []
+
+    async def handler(stream, message_id, fields):
+        handled.append(message_id)
+
+    async def scenario():
+        redis = PendingRedis(deliveries={"1-0": 6, "1-1": 2})
+        consumer = StreamConsumer(redis, ["s"], "g", handler, max_deliveries=5)
+        await consumer._redeliver("s", [("1-0", {"k": "v"}), ("1-1", {"k": "w"}), (None, None)])
+        await asyncio.gather(*consumer._tasks)
+
+        dead = redis.executed[1]
+        assert dead[0] == ("xadd", ("s:dead", {"k": "v", "dead_stream": "s", "dead_id": "1-0", "dead_group": "g"}))
+        assert dead[1] == ("xack", ("s", "g", "1-0"))
+        assert handled == ["1-1"]
+
+    asyncio.run(scenario())
+
+
+def test_reclaim_skips_running_entries_and_reports_dead_ones():
+    release = asyncio.Event()
+    handled, dead = [], []
+
+    async def handler(stream, message_id, fields):
+        handled.append(message_id)
+        await release.wait()
+
+    async def on_dead(stream, message_id, fields):
+        dead.append((stream, message_id, fields))
+
+    async def scenario():
+        redis = PendingRedis(deliveries={"1-0": 2, "1-2": 4})
+        consumer = StreamConsumer(redis, ["s"], "g", handler, max_deliveries=3, on_dead=on_dead)
+        consumer.dispatch("s", [("1-0", {"k": "slow"})])
+        await asyncio.sleep(0)
+
+        # 1-0 has been running past claim_idle_ms: claimed, but not run again
+        await consumer._redeliver("s", [("1-0", {"k": "slow"}), ("1-1", {"k": "v"}), ("1-2", {"k": "w"})])
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*consumer._tasks)
+
+        assert handled == ["1-0", "1-1"]
+        assert [command[1][2] for command in redis.executed[0]] == ["1-1", "1-2"]  # XPENDING checks
+        assert dead == [("s", "1-2", {"k": "w"})]
+
+    asyncio.run(scenario())
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""Alert subscription index and matcher tests"""
+
+import asyncio
+import random
+from datetime import datetime
+
+from services.alert_service import Subscription, SubscriptionIndex
+from services.alert_service.matcher import AlertMatcher
+from shared.models.event import EventFilter
+
+
+def rule(user_id, **criteria):
+    return Subscription(user_id=user_id, filter=EventFilter(**criteria))
+
+
+def test_index_matches_every_dimension():
+    index = SubscriptionIndex()
+    everything = rule("a")
+    btc_critical = rule("b", severity=["critical"], assets=["btc"])
+    confident = rule("c", severity=["high", "critical"], min_confidence=0.8)
+    news_only = rule("d", sources=["news"], assets=["ETH", "BTC"])
+    for subscription in (everything, btc_critical, confident, news_only):
+        index.add(subscription)
+
+    users = lambda **event: sorted(s.user_id for s in index.match(**event))
+    assert users(severity="critical", source="twitter", asset="BTC", confidence=0.9) == ["a", "b", "c"]
+    assert users(severity="critical", source="news", asset="BTC", confidence=0.5) == ["a", "b", "d"]
+    assert users(severity="high", source="twitter", asset=None, confidence=0.8) == ["a", "c"]
+    assert users(severity="low", source="news", asset="SOL", confidence=1.0) == ["a"]
+
+    index.remove(btc_critical.id)
+    assert users(severity="critical", source="twitter", asset="BTC", confidence=0.9) == ["a", "c"]
+    assert len(index) == 3
+
+
+def test_repeated_filter_values_share_one_bucket():
+    index = SubscriptionIndex()
+    repeated = rule("a", severity=["high", "high"], sources=["x", "x"], assets=["btc", "BTC"])
+    assert repeated.bucket_keys() == [("high", "x", "BTC")]
+
+    index.add(repeated)
+    assert [s.id for s in index.match(severity="high", source="x", asset="BTC", confidence=1.0)] == [repeated.id]
+    index.remove(repeated.id)
+    assert not index._buckets and len(index) == 0
+
+
+def test_date_windows_and_messages():
+    index = SubscriptionIndex()
+    index.add(rule("window", start_date=datetime(2024, 1, 1), end_date=datetime(2024, 2, 1)))
+    message = {"severity": "high", "source": "news", "asset": "", "confidence": "0.5"}
+
+    assert index.match_message({**message, "timestamp": "2024-01-15T00:00:00+00:00"})
+    assert not index.match_message({**message, "timestamp": "2024-03-01T00:00:00+00:00"})
+
+
+def test_index_agrees_with_a_linear_scan():
+    rng = random.Random(7)
+    severities, sources, assets = ["low", "medium", "high", "critical"], ["news", "twitter", "reddit"], ["BTC", "ETH", "SOL"]
+    rules = [
+        rule(
+            f"u{i}",
+            severity=rng.sample(severities, rng.randint(1, 2)) if rng.random() < 0.7 else None,
+            sources=rng.sample(sources, 1) if rng.random() < 0.4 else None,
+            assets=rng.sample(assets, rng.randint(1, 2)) if rng.random() < 0.6 else None,
+            min_confidence=rng.random() if rng.random() < 0.5 else None
+        )
+        for i in range(500)
+    ]
+    index = SubscriptionIndex()
+    for subscription in rules:
+        index.add(subscription)
+
+    for _ in range(200):
+        event = {
+            "severity": rng.choice(severities),
+            "source": rng.choice(sources),
+            "asset": rng.choice(assets + [None]),
+            "confidence": rng.random()
+        }
+        expected = {
+            s.id for s in rules
+            if (not s.filter.severity or event["severity"] in s.filter.severity)
+            and (not s.filter.sources or event["source"] in s.filter.sources)
+            and (not s.filter.assets or event["asset"] in s.filter.assets)
+            and (s.filter.min_confidence is None or event["confidence"] >= s.filter.min_confidence)
+        }
+        assert {s.id for s in index.match(**event)} == expected
+
+
+class FakeStore:
+    def __init__(self, rules):
+        self.rules = rules
+
+    async def version(self):
+        return 1
+
+    async def load(self):
+        return 1, self.rules
+
+
+def test_matcher_reclaims_entries_orphaned_by_a_dead_consumer(redis):
+    message = {"severity": "high", "source": "news", "asset": "BTC", "confidence": "0.9", "event_id": "e"}
+    matcher = AlertMatcher(redis, FakeStore([rule("a", severity=["high"])]), batch_size=2, claim_idle_ms=0)
+    stream, group = matcher.analyzed_stream_key, matcher.group
+
+    async def scenario():
+        await redis.xgroup_create(stream, group, id="0", mkstream=True)
+        for _ in range(6):
+            await redis.xadd(stream, message)
+        # Read by a matcher that died; one entry was trimmed while pending
+        [[_, entries]] = await redis.xreadgroup(group, "dead-matcher", {stream: ">"})
+        await redis.xdel(stream, entries[-1][0])
+
+        await matcher.refresh(force=True)
+        claimed = await matcher.reclaim()
+        pending = await redis.xpending_range(stream, group, "-", "+", 10)
+        dispatched = await redis.xrange(matcher.dispatch_stream_key)
+        return entries, claimed, pending, dispatched
+
+    entries, claimed, pending, dispatched = asyncio.run(scenario())
+    assert claimed == 5
+    assert pending == []  # acked, and the trimmed entry dropped from the group
+    assert [fields["analyzed_id"] for _, fields in dispatched] == [message_id for message_id, _ in entries[:5]]